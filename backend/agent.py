@@ -1,29 +1,23 @@
 import openai
 import anthropic
+import httpx
 import os
-import json
-from dotenv import load_dotenv
 import asyncio
+import config
 from functions.course_functions import rec_degreeworks_courses, course_info, plan_next_quarter, get_remaining_requirements
-from functions.graduation_planning import start_graduation_planning, get_graduation_plan_for_quarter, add_quarter_to_plan, finish_graduation_plan
+from functions.graduation_planning import start_graduation_planning, get_graduation_plan_for_quarter, add_quarter_to_plan, finish_graduation_plan, plan_full_graduation
 from typing import List, Dict
 from tool_defs import TOOLS
+from tool_results import encode_tool_result
+from utils.conversation_store import InMemoryConversationStore
+from utils.course_catalog import get_catalog
+from utils.tool_cache import ToolResultCache
+from utils.tool_registry import Tool, ToolRegistry, ToolArgumentError
 
-# Store conversations between sessions
-conversations = {}
+# Store conversations between sessions - bounded, history only (system prompt is added per request, not stored)
+conversations = InMemoryConversationStore()
 
-async def agent(user_message, conversation_id, completed_courses, grad_reqs):
-    load_dotenv()
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-
-    client = openai.AsyncOpenAI(api_key=openai_api_key)
-
-    if conversation_id in conversations:
-        messages = conversations[conversation_id].copy()
-    else:
-        messages = []
-
-    system_message = """You are an academic advisor helping students plan their courses.
+SYSTEM_MESSAGE = """You are an academic advisor helping students plan their courses.
 
     The student has uploaded their DegreeWorks with their completed courses and graduation requirements.
 
@@ -36,6 +30,7 @@ async def agent(user_message, conversation_id, completed_courses, grad_reqs):
     - get_graduation_plan_for_quarter: Get available courses for a quarter (with updated prerequisites from session)
     - add_quarter_to_plan: Add selected courses to graduation plan and update state
     - finish_graduation_plan: Get final graduation plan summary
+    - plan_full_graduation: Plan every quarter through graduation in one call
 
     **Course difficulty:**
     Each course includes a difficulty rating(easy, medium, hard, unknown) based on historical GPA.
@@ -49,6 +44,12 @@ async def agent(user_message, conversation_id, completed_courses, grad_reqs):
 
     **For graduation planning:**
     1. Ask: "When do you graduate?", "How many courses do you want to take per quarter?", and "Do you have any specific interests or focus areas? (e.g., AI, web development, systems,..)"
+    2. Call plan_full_graduation(graduation_quarter, user_interests, courses_per_quarter)
+        - Plans every quarter in one call, user_interests is optional, courses_per_quarter defaults to 3
+    3. Present complete plan
+
+    **Step by step graduation planning (only if the user wants to go quarter by quarter):**
+    1. Ask the same questions as above
     2. Call start_graduation_planning(graduation_quarter, user_interests, courses_per_quarter)
         - user_interests is optional (can be None if user has no preferences)
         - courses_per_quarter defaults to 3 if not specified
@@ -70,97 +71,223 @@ async def agent(user_message, conversation_id, completed_courses, grad_reqs):
     - "stats", "statistics" -> "STATS"
     """
 
-    messages.append({"role": "system", "content": system_message})
-    messages.append({"role": "user", "content": user_message})
+# Every request starts with the same tools + system message, followed by the conversation, so the
+# provider can reuse its cached prompt prefix across turns and conversations. Both are built once
+# and must not change per request
+SYSTEM_PROMPT = {"role": "system", "content": SYSTEM_MESSAGE}
+
+# Prompt token usage reported by the api, cached_tokens is the part served from the provider's prefix cache
+usage_stats = {"completions": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+# Shared by all conversations in this worker, students with identical audits hit the same entries
+tool_cache = ToolResultCache(config.TOOL_CACHE_SIZE)
+
+# Tool dispatch - handler, argument validation (generated from the tool_defs schemas), caching,
+# session ordering, timeout and progress text per tool
+tool_registry = ToolRegistry(cache=tool_cache, get_catalog=get_catalog, workers=config.TOOL_WORKERS)
+TOOL_SCHEMAS = {tool["function"]["name"]: tool for tool in TOOLS}
+
+def register_tool(name, handler, **options):
+    tool_registry.register(Tool(TOOL_SCHEMAS[name], handler, **options))
+
+register_tool("rec_degreeworks_courses", rec_degreeworks_courses, uses_audit=True, cache="audit")
+register_tool("course_info", course_info, cache="args",
+              start_message=lambda args: f"Looking up {args['department']} {args['course_number']}")
+register_tool("plan_next_quarter", plan_next_quarter, uses_audit=True, cache="audit")
+register_tool("get_remaining_requirements", get_remaining_requirements, uses_audit=True, cache="audit")
+register_tool("start_graduation_planning", start_graduation_planning, uses_audit=True)
+register_tool("get_graduation_plan_for_quarter", get_graduation_plan_for_quarter, session=True,
+              start_message=lambda args: f"Selecting courses for {args['quarter_name']}",
+              end_message=lambda args, result: f"Selected {result.get('num_selected', 0)} courses for {args['quarter_name']}")
+register_tool("add_quarter_to_plan", add_quarter_to_plan, session=True,
+              start_message=lambda args: f"Adding {args['quarter_name']} to plan",
+              end_message=lambda args, result: f"Planned {args['quarter_name']}")
+register_tool("finish_graduation_plan", finish_graduation_plan, session=True)
+register_tool("plan_full_graduation", plan_full_graduation, uses_audit=True, timeout=60.0,
+              start_message=lambda args: f"Planning quarters through {args['graduation_quarter']}",
+              end_message=lambda args, result: f"Planned {result.get('quarters_planned', 0)} quarters through {args['graduation_quarter']}")
+
+# Progress text shown to the user while a tool runs/after it finishes
+def tool_start_message(tool, args):
+    if tool.start_message:
+        return tool.start_message(args)
+    return f"Running {tool.name}"
+
+def tool_end_message(tool, args, result):
+    if isinstance(result, dict) and "error" in result:
+        return f"{tool.name} failed: {result['error']}"
+    if tool.end_message:
+        return tool.end_message(args, result)
+    return f"Finished {tool.name}"
+
+# Run all tool calls from one model response, returns results in the same order as tool_calls
+# Calls on the same graduation session run one after another in the order the model gave them,
+# every other call (and each session's chain) runs concurrently on the registry's tool threads
+# Unknown tools and bad arguments are returned to the model as error results
+# progress(event) is called with tool_start/tool_end events as each call starts and finishes,
+# tool_end events include the call's duration_ms
+async def run_tool_calls(tool_calls, completed_courses, grad_reqs, progress=None):
+    results = [None] * len(tool_calls)
+    chains = {}
+    for i, tool_call in enumerate(tool_calls):
+        try:
+            tool, args = tool_registry.parse(tool_call["function"]["name"], tool_call["function"]["arguments"])
+        except ToolArgumentError as e:
+            results[i] = {"error": f"Invalid call to {tool_call['function']['name']}: {e}"}
+            continue
+        if tool.session:
+            key = ("session", args["session_id"])
+        else:
+            key = ("call", i)
+        chains.setdefault(key, []).append((i, tool, args))
+
+    async def run_chain(chain):
+        for i, tool, args in chain:
+            if progress:
+                progress({"type": "tool_start", "tool": tool.name, "message": tool_start_message(tool, args)})
+            results[i], elapsed = await tool_registry.call(tool, args, completed_courses, grad_reqs)
+            if progress:
+                progress({"type": "tool_end", "tool": tool.name, "message": tool_end_message(tool, args, results[i]),
+                          "duration_ms": round(elapsed, 1)})
+
+    await asyncio.gather(*(run_chain(chain) for chain in chains.values()))
+    return results
+
+# Build OpenAI client with a pooled keep-alive http client, created once per process and shared by requests
+def create_openai_client():
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=config.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.OPENAI_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(config.OPENAI_TIMEOUT, connect=config.OPENAI_CONNECT_TIMEOUT)
+    )
+    return openai.AsyncOpenAI(
+        api_key=config.OPENAI_API_KEY,
+        base_url=config.OPENAI_BASE_URL,
+        max_retries=config.OPENAI_MAX_RETRIES,
+        http_client=http_client
+    )
+
+_default_client = None
+
+def record_usage(usage):
+    usage_stats["completions"] += 1
+    usage_stats["prompt_tokens"] += usage.prompt_tokens
+    usage_stats["completion_tokens"] += usage.completion_tokens
+    details = usage.prompt_tokens_details
+    if details and details.cached_tokens:
+        usage_stats["cached_tokens"] += details.cached_tokens
+
+def usage_metrics():
+    prompt_tokens = usage_stats["prompt_tokens"]
+    return {
+        **usage_stats,
+        "cached_ratio": usage_stats["cached_tokens"] / prompt_tokens if prompt_tokens else 0.0
+    }
+
+# Shared client for callers outside the FastAPI app (scripts), the app passes its own from lifespan
+def get_default_client():
+    global _default_client
+    if _default_client is None:
+        _default_client = create_openai_client()
+    return _default_client
+
+# Runs the agent loop, yields events as they happen:
+#   {"type": "token", "content": str}                      - streamed text from the model
+#   {"type": "tool_start" / "tool_end", "tool", "message"} - tool progress
+#   {"type": "done", "response": str}                       - final answer, always last
+async def agent_events(user_message, conversation_id, completed_courses, grad_reqs, client=None):
+    if client is None:
+        client = get_default_client()
+
+    history = conversations.get(conversation_id)
+    messages = history + [{"role": "user", "content": user_message}]
 
     # Loop until agent stops calling tools, eliminates filler messages while multi quarter planning
     max_iters = 15
     for iteration in range(max_iters):
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
+        # Static prefix (tools, system prompt) first, history + this turn appended after it
+        stream = await client.chat.completions.create(
+            model=config.OPENAI_MODEL,
+            messages=[SYSTEM_PROMPT] + messages,
             tools=TOOLS,
-            tool_choice="auto"
+            tool_choice="auto",
+            stream=True,
+            stream_options={"include_usage": True}
         )
 
-        assistant_message = response.choices[0].message
-        
+        # Rebuild message from stream - text is forwarded as it arrives, tool call fragments are joined by index
+        content = []
+        tool_calls = {}
+        async for chunk in stream:
+            if chunk.usage:
+                record_usage(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                yield {"type": "token", "content": delta.content}
+            for tc in delta.tool_calls or []:
+                call = tool_calls.setdefault(tc.index, {
+                    "id": None,
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""}
+                })
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function and tc.function.name:
+                    call["function"]["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call["function"]["arguments"] += tc.function.arguments
+
         # if agent wants to call tool
-        if assistant_message.tool_calls:
+        if tool_calls:
+            tool_calls = [tool_calls[i] for i in sorted(tool_calls)]
             # Add tool calls to messages
             messages.append({
                 "role": "assistant",
-                "content": None,
-                "tool_calls": [{
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments
-                    }
-                } for tc in assistant_message.tool_calls]})
-            
-            # Execute all tool calls
-            for tool_call in assistant_message.tool_calls:
-                tool_name = tool_call.function.name
-                function_args = tool_call.function.arguments
-                data = json.loads(function_args)
-
-                # execute tool
-                if tool_name == "rec_degreeworks_courses":
-                    result = await rec_degreeworks_courses(completed_courses=completed_courses, grad_reqs=grad_reqs)
-                elif tool_name == "course_info":
-                    result = await course_info(**data)
-                elif tool_name == "plan_next_quarter":
-                    result = await plan_next_quarter(
-                        completed_courses=completed_courses,
-                        grad_reqs=grad_reqs,
-                        preferred_num_courses=data.get("preferred_num_courses", 4)
-                    )
-                elif tool_name == "get_remaining_requirements":
-                    result = await get_remaining_requirements(completed_courses=completed_courses, grad_reqs=grad_reqs)
-                elif tool_name == "start_graduation_planning":
-                    result = await start_graduation_planning(
-                        graduation_quarter=data.get("graduation_quarter"),
-                        completed_courses=completed_courses,
-                        grad_reqs=grad_reqs,
-                        user_interests=data.get("user_interests"),
-                        courses_per_quarter=data.get("courses_per_quarter", 3)
-                    )
-                elif tool_name == "get_graduation_plan_for_quarter":
-                    result = await get_graduation_plan_for_quarter(
-                        session_id=data.get("session_id"),
-                        quarter_name=data.get("quarter_name")
-                    )
-                elif tool_name == "add_quarter_to_plan":
-                    result = await add_quarter_to_plan(
-                        session_id=data.get("session_id"),
-                        quarter_name=data.get("quarter_name"),
-                        selected_courses=data.get("selected_courses", [])
-                    )
-                elif tool_name == "finish_graduation_plan":
-                    result = await finish_graduation_plan(session_id=data.get("session_id"))
-                else:
-                    result = {"error": f"unknown function {tool_name}"}
-
-                # Add tool result to messages
+                "content": "".join(content) or None,
+                "tool_calls": tool_calls
+            })
+
+            # Execute tool calls - independent calls run concurrently, results added in original order
+            # progress events are forwarded while the calls run
+            events = asyncio.Queue()
+            task = asyncio.create_task(run_tool_calls(tool_calls, completed_courses, grad_reqs, events.put_nowait))
+            task.add_done_callback(lambda _: events.put_nowait(None))
+            while (event := await events.get()) is not None:
+                yield event
+            results = task.result()
+
+            for tool_call, result in zip(tool_calls, results):
+                # Add tool result to messages, trimmed per tool (see tool_results.py)
                 messages.append({
                     "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": json.dumps(result)
+                    "tool_call_id": tool_call["id"],
+                    "content": encode_tool_result(tool_call["function"]["name"], result)
                 })
 
             continue
         
         else:
             # no more tool calls - return final message
-            final_content = assistant_message.content
+            final_content = "".join(content)
             messages.append({"role": "assistant", "content": final_content})
-            conversations[conversation_id] = messages
-            return final_content
+            conversations.save(conversation_id, messages)
+            yield {"type": "done", "response": final_content}
+            return
     
     # If max iters hit
-    return "Graduation plpanning issude. Please try again."
+    yield {"type": "done", "response": "Graduation plpanning issude. Please try again."}
+
+# Runs agent loop to completion and returns the final response
+async def agent(user_message, conversation_id, completed_courses, grad_reqs, client=None):
+    async for event in agent_events(user_message, conversation_id, completed_courses, grad_reqs, client):
+        if event["type"] == "done":
+            return event["response"]
 
 if __name__ == "__main__":
-    asyncio.run(agent())
\ No newline at end of file
+    asyncio.run(agent())
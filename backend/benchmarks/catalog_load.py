@@ -0,0 +1,85 @@
+# Catalog startup time and memory, courses.json loader vs compiled catalog (utils/catalog_file.py)
+# Each load runs in a fresh process, RSS is split into anonymous (private) and file-backed (shared page cache)
+# Private memory is measured after one typical request and again after every course has been looked up
+# (a long running worker whose requests have touched the whole catalog)
+# Runs on the real catalog and on a synthetic one with the departments copied SCALE times
+# Run from backend/: python benchmarks/catalog_load.py
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.catalog_file import build_catalog_file, compiled_path
+from utils.course_catalog import COURSES_PATH, catalog_version
+
+SCALE = 40
+
+CHILD = """
+import json, sys, time
+sys.path.append({backend!r})
+
+def rss():
+    fields = dict(line.split(":", 1) for line in open("/proc/self/status"))
+    return int(fields["RssAnon"].split()[0]), int(fields["RssFile"].split()[0])
+
+from utils.course_catalog import CourseCatalog
+anon, file = rss()
+start = time.perf_counter()
+catalog = CourseCatalog.load({path!r}, compiled={compiled!r})
+elapsed = time.perf_counter() - start
+# Typical request - a few course lookups + an eligibility check
+catalog.get_course(next(iter(catalog.by_code)))
+catalog.eligible_codes(catalog.completed_mask(list(catalog.by_code)[:50]))
+anon_after, file_after = rss()
+for department in catalog.department_codes:
+    for course in catalog.department_courses(department):
+        course["description"]
+anon_warm, _ = rss()
+print(json.dumps({{"ms": elapsed * 1000, "anon": anon_after - anon, "file": file_after - file, "warm": anon_warm - anon,
+                  "type": type(catalog.by_code).__name__}}))
+"""
+
+def measure(path, compiled):
+    code = CHILD.format(backend=str(Path(__file__).parent.parent), path=str(path), compiled=compiled)
+    runs = [json.loads(subprocess.check_output([sys.executable, "-c", code])) for _ in range(3)]
+    return min(runs, key=lambda r: r["ms"])
+
+def scaled_catalog(raw, scale):
+    data = json.loads(raw)
+    courses = {}
+    for copy in range(scale):
+        for department, department_courses in data["courses"].items():
+            name = f"{department}{copy}" if copy else department
+            courses[name] = [{**c, "code": name + c["code"][len(department):]} for c in department_courses]
+    return json.dumps({"courses": courses}, indent=4).encode()
+
+def compare(label, path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    build_catalog_file(json.loads(raw), compiled_path(path), catalog_version(raw), os.stat(path))
+
+    from_json = measure(path, compiled=False)
+    from_file = measure(path, compiled=True)
+    assert from_file["type"] == "LazyCourses"
+    print(f"{label}: courses.json {len(raw) // 1024} KiB, compiled {os.path.getsize(compiled_path(path)) // 1024} KiB")
+    for name, result in (("json loader", from_json), ("compiled", from_file)):
+        print(f"  {name:12} {result['ms']:7.1f} ms   private {result['anon']:6d} KiB   shared file {result['file']:5d} KiB"
+              f"   private after every course {result['warm']:6d} KiB")
+
+if __name__ == "__main__":
+    tmp = tempfile.mkdtemp()
+    with open(COURSES_PATH, "rb") as f:
+        raw = f.read()
+
+    real = Path(tmp) / "courses.json"
+    real.write_bytes(raw)
+    compare("current catalog", real)
+
+    scaled = Path(tmp) / "scaled" / "courses.json"
+    scaled.parent.mkdir()
+    scaled.write_bytes(scaled_catalog(raw, SCALE))
+    compare(f"catalog x{SCALE}", scaled)
@@ -0,0 +1,59 @@
+# /chat request size + validation, full completed_courses/required payload every turn vs audit_id
+# Also runs upload -> chat with audit_id end to end against a local fake completion server
+# Run from backend/: python benchmarks/chat_payload.py
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tests.fake_openai import start_fake_server
+
+RUNS = 2000
+
+def per_call_ms(fn):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        fn()
+    return (time.perf_counter() - start) / RUNS * 1000
+
+if __name__ == "__main__":
+    server, base_url = start_fake_server()
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "fake"
+
+    from fastapi.testclient import TestClient
+    from benchmarks.synthetic_audit import make_audit_pdf
+    from utils.course_catalog import get_catalog
+    from utils.parse_degreeworks import parse_degreeworks
+    import main
+
+    pdf = make_audit_pdf(get_catalog(), num_pages=4)
+    audit = parse_degreeworks(pdf)
+
+    with TestClient(main.app) as client:
+        upload = client.post("/uploadFile/", files={"file": ("audit.pdf", pdf, "application/pdf")}).json()
+        assert upload["success"]
+
+        chat = client.post("/chat", json={"message": "hi", "audit_id": upload["audit_id"]})
+        assert chat.status_code == 200, chat.text
+        missing = client.post("/chat", json={"message": "hi", "audit_id": "expired"})
+        assert missing.status_code == 404
+
+        stored = main.app.state.audit_profiles.get(upload["audit_id"])
+        assert stored.requirements == audit.requirements
+
+    full_body = json.dumps({"message": "What should I take next quarter?", "user_id": "1", "conversation_id": "1",
+                            "completed_courses": audit.completed_courses, "required": audit.requirements})
+    id_body = json.dumps({"message": "What should I take next quarter?", "user_id": "1", "conversation_id": "1",
+                          "audit_id": upload["audit_id"]})
+
+    full_ms = per_call_ms(lambda: main.ChatMessage.model_validate_json(full_body))
+    id_ms = per_call_ms(lambda: main.ChatMessage.model_validate_json(id_body))
+
+    print(f"upload response: {len(json.dumps(upload))} bytes "
+          f"(full requirement objects would be {len(json.dumps({**upload, 'requirements': audit.requirements}))})")
+    print(f"/chat body with completed_courses + required: {len(full_body):7d} bytes, validate {full_ms:.3f} ms")
+    print(f"/chat body with audit_id:                     {len(id_body):7d} bytes, validate {id_ms:.3f} ms")
@@ -0,0 +1,37 @@
+# parse_courses_completed on a large synthetic transcript, current single scan version vs the previous
+# three-regex version (randomized check that both return identical output is in tests/test_parse_degreeworks.py)
+# Run from backend/: python benchmarks/completed_courses_parse.py
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tests.completed_courses_reference import parse_courses_completed_reference
+from utils.parse_degreeworks import parse_courses_completed
+
+# Large transcript - mostly completed course lines, lots of repeated courses
+def large_transcript(num_lines=20000):
+    rng = random.Random(1)
+    lines = []
+    for _ in range(num_lines):
+        dept = rng.choice(["COMPSCI", "I&CSCI", "IN4MATX", "MATH", "STATS"])
+        lines.append(f"{dept} {rng.randint(1, 199)} Course Title {rng.choice(['A', 'B+', 'C'])} "
+                     f"{rng.choice(['FALL', 'WINTER', 'SPRING'])} {rng.randint(2020, 2025)} 4")
+    return "\n".join(lines)
+
+def best_of(fn, runs=3):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+if __name__ == "__main__":
+    text = large_transcript()
+    reference = best_of(lambda: parse_courses_completed_reference(text))
+    current = best_of(lambda: parse_courses_completed(text))
+    print(f"20000 line transcript, previous version: {reference:.1f} ms")
+    print(f"20000 line transcript, single scan:      {current:.1f} ms")
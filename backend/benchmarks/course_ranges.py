@@ -0,0 +1,56 @@
+# Range lookups ("COMPSCI 121:130") on a synthetic university sized catalog, linear department scan vs bisect index
+# Run from backend/: python benchmarks/course_ranges.py
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.course_catalog import CourseCatalog
+
+DEPARTMENTS = 150
+COURSES_PER_DEPARTMENT = 400
+LOOKUPS = 20000
+
+def synthetic_catalog(seed=0):
+    rng = random.Random(seed)
+    courses = {}
+    for d in range(DEPARTMENTS):
+        department = f"DEPT{d}"
+        numbers = rng.sample(range(1, 300), COURSES_PER_DEPARTMENT // 2) * 2
+        courses[department] = [
+            {"code": f"{department}{n}{suffix}", "course_number": n, "prerequisites": "", "prereq_tree": {}}
+            for n, suffix in zip(numbers, [""] * (len(numbers) // 2) + ["A"] * (len(numbers) // 2))
+        ]
+    return CourseCatalog({"courses": courses})
+
+# Previous courses_in_range - filter every course in the department
+def linear_range(catalog, department, low, high):
+    return [c for c in catalog.department_courses(department) if low <= c["course_number"] <= high]
+
+if __name__ == "__main__":
+    catalog = synthetic_catalog()
+    rng = random.Random(1)
+    queries = []
+    for _ in range(LOOKUPS):
+        low = rng.randint(1, 290)
+        queries.append((f"DEPT{rng.randrange(DEPARTMENTS)}", low, low + rng.randint(0, 10)))
+
+    for department, low, high in queries[:500]:
+        expected = sorted(c["code"] for c in linear_range(catalog, department, low, high))
+        assert sorted(c["code"] for c in catalog.courses_in_range(department, low, high)) == expected
+
+    start = time.perf_counter()
+    for query in queries:
+        linear_range(catalog, *query)
+    linear = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for query in queries:
+        catalog.courses_in_range(*query)
+    indexed = (time.perf_counter() - start) * 1000
+
+    print(f"{len(catalog)} courses, {LOOKUPS} range lookups")
+    print(f"linear department scan: {linear:.1f} ms")
+    print(f"bisect index:           {indexed:.1f} ms")
@@ -0,0 +1,107 @@
+# Catalog fetch against a local fake anteaterapi, sequential requests.get per course vs async fetch_catalog
+# Also checks retries on transient 503s, resuming from the checkpoint after a failed run and
+# incremental refresh only fetching grades for changed/stale courses
+# Run from backend/: python benchmarks/fetch_catalog.py
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tests.fake_anteater import start_fake_anteater
+from utils.fetch_courses import DEPARTMENTS, FetchError, difficulty_from_grades, fetch_catalog, transform_course
+
+COURSES_PER_DEPARTMENT = 100
+LATENCY = 0.02
+
+# Previous fetch loop - one request at a time, new connection per request (without the 0.1s sleep)
+def fetch_sequential(url):
+    all_courses = {}
+    for department, key in DEPARTMENTS.items():
+        dep_data = requests.get(f"{url}courses", params={"department": department}).json()
+        all_courses[key] = []
+        for api_course in dep_data["data"]:
+            grade_data = requests.get(f"{url}grades/aggregateByCourse",
+                                      params={"department": department, "courseNumber": api_course["courseNumber"]}).json()
+            all_courses[key].append(transform_course(api_course, difficulty_from_grades(grade_data, department, api_course)))
+    return {"courses": all_courses}
+
+def fetch(url, checkpoint_path, **kwargs):
+    courses_dict, meta = asyncio.run(
+        fetch_catalog(url=url, checkpoint_path=checkpoint_path, rate=0, backoff_base=0.01, **kwargs)
+    )
+    return courses_dict
+
+def grade_requests(server):
+    return server.state["requests"].get("/v2/rest/grades/aggregateByCourse", 0)
+
+if __name__ == "__main__":
+    tmp = tempfile.mkdtemp()
+    server, url = start_fake_anteater(COURSES_PER_DEPARTMENT, latency=LATENCY)
+
+    start = time.perf_counter()
+    expected = fetch_sequential(url)
+    sequential = time.perf_counter() - start
+    sequential_connections = len(server.state["connections"])
+
+    server.state["connections"].clear()
+    start = time.perf_counter()
+    result = fetch(url, os.path.join(tmp, "clean.jsonl"))
+    concurrent = time.perf_counter() - start
+    assert result == expected
+
+    print(f"{3 * COURSES_PER_DEPARTMENT} courses, {LATENCY * 1000:.0f} ms server latency")
+    print(f"sequential requests.get: {sequential:.2f} s, {sequential_connections} connections")
+    print(f"async fetch_catalog:     {concurrent:.2f} s, {len(server.state['connections'])} connections")
+
+    # Every grade request fails twice before succeeding, retries should hide it
+    flaky, flaky_url = start_fake_anteater(COURSES_PER_DEPARTMENT, failures_per_course=2)
+    assert fetch(flaky_url, os.path.join(tmp, "flaky.jsonl")) == expected
+    print("transient 503s: retried, result matches")
+
+    # Some courses fail every attempt, run fails but keeps the checkpoint, rerun only fetches those
+    broken, broken_url = start_fake_anteater(COURSES_PER_DEPARTMENT, fail_numbers=range(1, 11))
+    checkpoint = os.path.join(tmp, "resume.jsonl")
+    try:
+        fetch(broken_url, checkpoint, max_retries=1)
+        raise AssertionError("expected FetchError")
+    except FetchError as e:
+        print(f"hard failures: {e}")
+
+    broken.state["fail_numbers"].clear()
+    first_run = grade_requests(broken)
+    assert fetch(broken_url, checkpoint) == expected
+    refetched = grade_requests(broken) - first_run
+    assert refetched == 3 * 10, refetched
+    print(f"resume: {refetched} grade requests on rerun, result matches")
+
+    # Incremental refresh - 5 courses per department change, 1 department's grade data is stale
+    nightly, nightly_url = start_fake_anteater(COURSES_PER_DEPARTMENT, latency=LATENCY)
+    start = time.perf_counter()
+    previous = asyncio.run(fetch_catalog(url=nightly_url, checkpoint_path=os.path.join(tmp, "n1.jsonl"), rate=0))
+    full = time.perf_counter() - start
+    full_requests = grade_requests(nightly)
+
+    catalog, meta = previous
+    for code, entry in meta.items():
+        if code.startswith("IN4MATX"):
+            entry["fetched_at"] -= 30 * 24 * 60 * 60
+    nightly.state["revised_numbers"].update(range(1, 6))
+
+    start = time.perf_counter()
+    refreshed, _ = asyncio.run(fetch_catalog(url=nightly_url, checkpoint_path=os.path.join(tmp, "n2.jsonl"),
+                                             rate=0, previous=previous))
+    incremental = time.perf_counter() - start
+    incremental_requests = grade_requests(nightly) - full_requests
+
+    expected_requests = 2 * 5 + COURSES_PER_DEPARTMENT
+    assert incremental_requests == expected_requests, incremental_requests
+    assert refreshed["courses"]["COMPSCI"][0]["name"].endswith("(revised)")
+    assert refreshed["courses"]["COMPSCI"][5:] == catalog["courses"]["COMPSCI"][5:]
+    print(f"full refresh:        {full:.2f} s, {full_requests} grade requests")
+    print(f"incremental refresh: {incremental:.2f} s, {incremental_requests} grade requests")
@@ -0,0 +1,43 @@
+# /chat completion latency against a local fake server, new client per request vs shared pooled client
+# Run from backend/: python benchmarks/openai_client_latency.py
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tests.fake_openai import start_fake_server
+
+NUM_REQUESTS = 200
+
+async def run(make_client, close_each):
+    import agent
+
+    client = None if close_each else make_client()
+    start = time.perf_counter()
+    for i in range(NUM_REQUESTS):
+        if close_each:
+            client = make_client()
+        await agent.agent("hi", f"bench-{i}", [], {}, client=client)
+        if close_each:
+            await client.close()
+    elapsed = time.perf_counter() - start
+    if not close_each:
+        await client.close()
+    return elapsed / NUM_REQUESTS * 1000
+
+if __name__ == "__main__":
+    server, base_url = start_fake_server()
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+    import agent
+    import openai
+
+    per_request = asyncio.run(run(lambda: openai.AsyncOpenAI(api_key="fake", base_url=base_url), close_each=True))
+    shared = asyncio.run(run(agent.create_openai_client, close_each=False))
+    print(f"new client per request: {per_request:.2f} ms per /chat turn")
+    print(f"shared pooled client:   {shared:.2f} ms per /chat turn")
+    server.shutdown()
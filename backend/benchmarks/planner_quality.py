@@ -0,0 +1,55 @@
+# Plan quality + runtime, requirement cover planner vs greedy smart_course_selection
+# Run from backend/: python benchmarks/planner_quality.py
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.course_catalog import get_catalog
+from functions.graduation_planning import GraduationSession, plan_full_graduation
+
+NUM_AUDITS = 30
+LOWER_DIV = ["I&CSCI31", "I&CSCI32", "I&CSCI33", "I&CSCI45C", "I&CSCI46", "I&CSCI51", "I&CSCI53",
+             "I&CSCI6B", "I&CSCI6D", "I&CSCI6N", "I&CSCI139W", "MATH2B", "STATS67"]
+
+# Random audits with overlapping requirement groups, lower division done
+def make_audits(catalog):
+    rng = random.Random(0)
+    codes = list(catalog.by_code)
+    audits = []
+    for _ in range(NUM_AUDITS):
+        grad_reqs = {
+            f"req_{i}": {
+                "num_needed": rng.randint(1, 4),
+                "courses": [catalog.get_course(c) for c in rng.sample(codes, rng.randint(3, 25))]
+            } for i in range(8)
+        }
+        audits.append((LOWER_DIV + rng.sample(codes, rng.randint(0, 20)), grad_reqs))
+    return audits
+
+def run(audits):
+    stats = {"courses": 0, "quarters": 0, "complete": 0, "seconds": 0.0}
+    for completed, grad_reqs in audits:
+        start = time.perf_counter()
+        summary = plan_full_graduation("Spring 2028", completed, grad_reqs, "machine learning", 4)
+        stats["seconds"] += time.perf_counter() - start
+        stats["courses"] += summary["total_courses"]
+        stats["quarters"] += summary["quarters_planned"]
+        stats["complete"] += not summary["requirements_remaining"]
+    return stats
+
+def report(name, stats):
+    print(f"{name:>8}: {stats['complete']}/{NUM_AUDITS} audits fully covered, "
+          f"{stats['courses']} courses, {stats['quarters']} quarters, "
+          f"{stats['seconds'] / NUM_AUDITS * 1000:.1f} ms per plan")
+
+if __name__ == "__main__":
+    audits = make_audits(get_catalog())
+
+    report("cover", run(audits))
+
+    # No cover plan -> select_quarter_courses falls back to smart_course_selection every quarter
+    GraduationSession.plan_requirement_cover = lambda self, quarter_name: None
+    report("greedy", run(audits))
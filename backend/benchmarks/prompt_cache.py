@@ -0,0 +1,149 @@
+# Prompt prefix cache hits over a multi-turn conversation against the local fake completion server
+# Old layout (history, system prompt, latest turn) vs agent's layout (system prompt first, history after)
+# Then a conversation where every turn calls tools, history re-truncated on every save (previous
+# compact_history) vs append-only history compacted in blocks
+# The fake server reports cached_tokens for repeated prefixes and only charges prefill latency for uncached tokens
+# Run from backend/: python benchmarks/prompt_cache.py
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tests.fake_openai import start_fake_server
+from benchmarks.synthetic_audit import make_audit_pdf
+
+TURNS = 8
+PREFILL_LATENCY = 0.02      # seconds per 1000 uncached prompt tokens
+QUESTIONS = ["What should I take next quarter?", "Tell me about COMPSCI 161", "Is that one hard?",
+             "What about machine learning courses?", "Which requirements are left?", "Plan my graduation",
+             "Can I graduate by Spring 2027?", "Thanks!"]
+
+# Previous agent layout - system message moved to just before the latest user message each turn
+async def old_layout(client, model):
+    from agent import SYSTEM_MESSAGE
+    from tool_defs import TOOLS
+
+    history = []
+    prompt = cached = 0
+    start = time.perf_counter()
+    for question in QUESTIONS[:TURNS]:
+        messages = history + [{"role": "system", "content": SYSTEM_MESSAGE}, {"role": "user", "content": question}]
+        response = await client.chat.completions.create(model=model, messages=messages, tools=TOOLS, tool_choice="auto")
+        prompt += response.usage.prompt_tokens
+        cached += response.usage.prompt_tokens_details.cached_tokens
+        history += [{"role": "user", "content": question},
+                    {"role": "assistant", "content": response.choices[0].message.content}]
+    return (time.perf_counter() - start) / TURNS * 1000, prompt, cached
+
+async def new_layout(client):
+    import agent
+
+    start = time.perf_counter()
+    for question in QUESTIONS[:TURNS]:
+        await agent.agent(question, "prompt-cache-bench", [], {}, client=client)
+    elapsed = (time.perf_counter() - start) / TURNS * 1000
+    return elapsed, agent.usage_stats["prompt_tokens"], agent.usage_stats["cached_tokens"]
+
+TOOL_TURNS = 16
+# Tool calls the fake model makes for each question of the tool using conversation
+TOOL_QUESTIONS = [
+    ("Which requirements are left?", [("get_remaining_requirements", {})]),
+    ("What should I take next quarter?", [("plan_next_quarter", {"preferred_num_courses": 4})]),
+    ("Tell me about COMPSCI 161", [("course_info", {"course_number": "161", "department": "COMPSCI"})]),
+    ("And COMPSCI 171?", [("course_info", {"course_number": "171", "department": "COMPSCI"})]),
+]
+
+# Previous compact_history - tool results before the latest turn truncated again on every save
+def recompact_every_turn(messages, max_messages, max_tokens, tool_result_chars, compact_ratio=None):
+    from utils.conversation_store import estimate_tokens, turn_starts
+
+    starts = turn_starts(messages)
+    last_turn = starts[-1] if starts else 0
+    compacted = []
+    for i, message in enumerate(messages):
+        content = message.get("content")
+        if i < last_turn and message["role"] == "tool" and content and len(content) > tool_result_chars:
+            message = {**message, "content": content[:tool_result_chars] + "...(truncated)"}
+        compacted.append(message)
+
+    tokens = sum(estimate_tokens(m) for m in compacted)
+    start = 0
+    for turn_start in starts[1:]:
+        if len(compacted) - start <= max_messages and tokens <= max_tokens:
+            break
+        tokens -= sum(estimate_tokens(m) for m in compacted[start:turn_start])
+        start = turn_start
+    return compacted[start:]
+
+def scripted_tool_calls(body):
+    question = body["messages"][-1]["content"]
+    return dict(TOOL_QUESTIONS).get(question)
+
+async def tool_conversation(client, conversation_id, completed, grad_reqs):
+    import agent
+
+    before = dict(agent.usage_stats)
+    start = time.perf_counter()
+    for turn in range(TOOL_TURNS):
+        question = TOOL_QUESTIONS[turn % len(TOOL_QUESTIONS)][0]
+        await agent.agent(question, conversation_id, completed, grad_reqs, client=client)
+    elapsed = (time.perf_counter() - start) / TOOL_TURNS * 1000
+    prompt = agent.usage_stats["prompt_tokens"] - before["prompt_tokens"]
+    cached = agent.usage_stats["cached_tokens"] - before["cached_tokens"]
+    return elapsed, prompt, cached
+
+async def compare_compaction(base_url):
+    import config
+    import openai
+    import utils.conversation_store as conversation_store
+    from utils.course_catalog import get_catalog
+    from utils.parse_degreeworks import parse_degreeworks
+
+    audit = parse_degreeworks(make_audit_pdf(get_catalog(), num_pages=2))
+    client = openai.AsyncOpenAI(api_key="fake", base_url=base_url)
+    await client.chat.completions.create(model=config.OPENAI_MODEL, messages=[{"role": "user", "content": "hi"}])
+
+    append_only = conversation_store.compact_history
+    conversation_store.compact_history = recompact_every_turn
+    old = await tool_conversation(client, "tools-recompact", audit.completed_courses, audit.requirements)
+    conversation_store.compact_history = append_only
+    new = await tool_conversation(client, "tools-append-only", audit.completed_courses, audit.requirements)
+    await client.close()
+    return old, new
+
+if __name__ == "__main__":
+    old_server, old_url = start_fake_server(prefill_latency=PREFILL_LATENCY)
+    new_server, new_url = start_fake_server(prefill_latency=PREFILL_LATENCY)
+    os.environ["OPENAI_API_KEY"] = "fake"
+
+    import config
+    import openai
+    import agent
+
+    async def main():
+        old_client = openai.AsyncOpenAI(api_key="fake", base_url=old_url)
+        new_client = openai.AsyncOpenAI(api_key="fake", base_url=new_url)
+        # First request on a client pays for connection setup, keep it out of the timings
+        for client in (old_client, new_client):
+            await client.chat.completions.create(model=config.OPENAI_MODEL, messages=[{"role": "user", "content": "hi"}])
+        old = await old_layout(old_client, config.OPENAI_MODEL)
+        new = await new_layout(new_client)
+        await old_client.close()
+        await new_client.close()
+        return old, new
+
+    old, new = asyncio.run(main())
+    print(f"{TURNS} turn conversation, {PREFILL_LATENCY * 1000:.0f} ms prefill per 1000 uncached tokens")
+    for name, (ms, prompt, cached) in (("system prompt before latest turn", old), ("static prefix first", new)):
+        print(f"  {name:33} {ms:6.1f} ms/turn   prompt {prompt:6d} tokens   cached {cached:6d} ({cached / prompt:.0%})"
+              f"   uncached {prompt - cached:6d}")
+
+    tool_server, tool_url = start_fake_server(prefill_latency=PREFILL_LATENCY, tool_calls=scripted_tool_calls)
+    old, new = asyncio.run(compare_compaction(tool_url))
+    print(f"{TOOL_TURNS} turn conversation calling a tool every turn")
+    for name, (ms, prompt, cached) in (("history re-truncated every turn", old), ("append-only, block compaction", new)):
+        print(f"  {name:33} {ms:6.1f} ms/turn   prompt {prompt:6d} tokens   cached {cached:6d} ({cached / prompt:.0%})"
+              f"   uncached {prompt - cached:6d}")
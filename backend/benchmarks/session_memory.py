@@ -0,0 +1,69 @@
+# Memory per graduation session, old dict-copy sessions vs code based sessions
+# Run from backend/: python benchmarks/session_memory.py
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.course_catalog import get_catalog
+from functions.graduation_planning import GraduationSession
+
+NUM_SESSIONS = 200
+
+# Session state as it was stored before - two shallow copies of every requirement course list,
+# holding the course dicts parsed from the /chat request body
+class DictCopySession:
+
+    def __init__(self, original_completed, original_grad_reqs):
+        self.original_completed = original_completed.copy()
+        self.original_grad_reqs = {
+            k: {"num_needed": v["num_needed"], "courses": v["courses"].copy()}
+            for k, v in original_grad_reqs.items()
+        }
+        self.current_completed = original_completed.copy()
+        self.current_grad_reqs = {
+            k: {"num_needed": v["num_needed"], "courses": v["courses"].copy()}
+            for k, v in original_grad_reqs.items()
+        }
+
+# Requirements payload like the frontend sends, ~10 groups of catalog courses
+def make_payload(catalog, rng):
+    codes = list(catalog.by_code)
+    grad_reqs = {
+        f"req_{i}": {
+            "num_needed": rng.randint(1, 4),
+            "courses": [catalog.get_course(c) for c in rng.sample(codes, rng.randint(3, 40))]
+        } for i in range(10)
+    }
+    completed = rng.sample(codes, 30)
+    # Round trip through json so each session gets its own course dicts, as with request bodies
+    return json.loads(json.dumps(completed)), json.loads(json.dumps(grad_reqs))
+
+def measure(make_session):
+    catalog = get_catalog()
+    rng = random.Random(0)
+
+    # Payloads are traced too, whatever a session keeps alive from the request body counts against it
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    payloads = [make_payload(catalog, rng) for _ in range(NUM_SESSIONS)]
+    sessions = []
+    for completed, grad_reqs in payloads:
+        sessions.append(make_session(completed, grad_reqs))
+    # Request bodies are gone once the session is created
+    payloads.clear()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / NUM_SESSIONS
+
+if __name__ == "__main__":
+    get_catalog()
+    old = measure(lambda completed, grad_reqs: DictCopySession(completed, grad_reqs))
+    new = measure(lambda completed, grad_reqs: GraduationSession(completed, grad_reqs, "Spring 2027", ["Winter 2026"]))
+    print(f"dict copy session: {old / 1024:.1f} KiB per session")
+    print(f"code based session: {new / 1024:.1f} KiB per session")
@@ -0,0 +1,61 @@
+# Builds synthetic DegreeWorks-like pdfs for parser benchmarks
+# Writes a minimal pdf by hand (one Helvetica text stream per page) so no pdf writing library is needed
+import random
+
+TERMS = ["FALL", "WINTER", "SPRING"]
+GRADES = ["A", "A-", "B+", "B", "B-", "C+", "C"]
+
+# Lines a DegreeWorks audit page has - completed courses with grade + term, and still needed requirements
+def audit_lines(catalog, rng, lines_per_page):
+    codes = list(catalog.by_code)
+    lines = []
+    for _ in range(lines_per_page - 3):
+        course = catalog.get_course(rng.choice(codes))
+        number = course["code"][len(department_of(catalog, course["code"])):]
+        lines.append(f"{department_of(catalog, course['code'])} {number} {course['name'][:30]} "
+                     f"{rng.choice(GRADES)} {rng.choice(TERMS)} {rng.randint(2021, 2025)} 4")
+    lines.append(f"Still needed: {rng.randint(1, 3)} Classes in COMPSCI {rng.randint(111, 130)}:{rng.randint(131, 180)} or 161 or 171")
+    lines.append("Still needed: 1 Class in I&CSCI 45C or 46")
+    lines.append(f"Still needed: 2 Classes in IN4MATX {rng.randint(100, 120)}:{rng.randint(121, 150)}")
+    return lines
+
+def department_of(catalog, code):
+    for department in catalog.department_codes:
+        if code.startswith(department):
+            return department
+    return ""
+
+def escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+# pdf bytes with one page per list of lines
+def make_pdf(pages):
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pages_id = 2 + 2 * len(pages)
+    page_ids = []
+    for lines in pages:
+        ops = ["BT /F1 8 Tf 10 TL 30 780 Td"] + [f"({escape(line)}) Tj T*" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_id, content_id))
+        page_ids.append(len(objects))
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    return out
+
+# Synthetic audit pdf bytes
+def make_audit_pdf(catalog, num_pages=8, lines_per_page=60, seed=0):
+    rng = random.Random(seed)
+    return make_pdf([audit_lines(catalog, rng, lines_per_page) for _ in range(num_pages)])
@@ -0,0 +1,60 @@
+# Repeated deterministic tool calls through the agent's tool registry, with and without its result cache
+# Also checks cached results match fresh ones and that a catalog reload invalidates the cache
+# Run from backend/: python benchmarks/tool_cache.py
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import agent
+import utils.course_catalog as course_catalog
+from benchmarks.synthetic_audit import make_audit_pdf
+from utils.parse_degreeworks import parse_degreeworks
+
+ROUNDS = 50
+CALLS = [
+    ("get_remaining_requirements", {}),
+    ("plan_next_quarter", {"preferred_num_courses": 4}),
+    ("rec_degreeworks_courses", {}),
+    ("course_info", {"course_number": "161", "department": "COMPSCI"}),
+]
+
+async def execute(name, data, completed, grad_reqs):
+    tool, args = agent.tool_registry.parse(name, json.dumps(data))
+    result, _ = await agent.tool_registry.call(tool, args, completed, grad_reqs)
+    return result
+
+async def run(completed, grad_reqs):
+    start = time.perf_counter()
+    results = []
+    for _ in range(ROUNDS):
+        results = [await execute(name, data, completed, grad_reqs) for name, data in CALLS]
+    return (time.perf_counter() - start) / (ROUNDS * len(CALLS)) * 1000, results
+
+if __name__ == "__main__":
+    catalog = course_catalog.get_catalog()
+    audit = parse_degreeworks(make_audit_pdf(catalog, num_pages=4))
+    completed, grad_reqs = audit.completed_courses, audit.requirements
+
+    agent.tool_registry.cache = None
+    uncached_ms, expected = asyncio.run(run(completed, grad_reqs))
+    agent.tool_registry.cache = agent.tool_cache
+    cached_ms, results = asyncio.run(run(completed, grad_reqs))
+    assert json.dumps(results) == json.dumps(expected)
+
+    # Same audit with completed courses in another order hits the same entries
+    asyncio.run(run(list(reversed(completed)), grad_reqs))
+    print(f"uncached: {uncached_ms:.3f} ms per call")
+    print(f"cached:   {cached_ms:.3f} ms per call")
+    print(f"stats:    {agent.tool_cache.metrics()}")
+
+    # Reloaded catalog (new version) drops every entry
+    course_catalog._catalog = course_catalog.CourseCatalog.load(compiled=False)
+    course_catalog._catalog.version = "reloaded"
+    asyncio.run(execute(*CALLS[0], completed, grad_reqs))
+    metrics = agent.tool_cache.metrics()
+    assert metrics["invalidations"] == 1 and metrics["entries"] == 1
+    print(f"after reload: {metrics['entries']} entry, {metrics['invalidations']} invalidation")
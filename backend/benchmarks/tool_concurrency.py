@@ -0,0 +1,102 @@
+# One multi-tool turn (full graduation plan + the lookups the model usually asks for alongside it), handlers
+# called one after another on the event loop vs run_tool_calls on the registry's tool threads
+# Reports when each result is ready and the longest the event loop was blocked (other requests, SSE streams)
+# Tools are pure python so the GIL still serializes their CPU time, the gain is in latency to each result
+# and loop responsiveness rather than total CPU
+# Run from backend/: python benchmarks/tool_concurrency.py
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import agent
+from benchmarks.synthetic_audit import make_audit_pdf
+from utils.course_catalog import get_catalog
+from utils.parse_degreeworks import parse_degreeworks
+
+ROUNDS = 5
+CALLS = [
+    ("plan_full_graduation", {"graduation_quarter": "Spring 2028", "user_interests": "machine learning", "courses_per_quarter": 4}),
+    ("get_remaining_requirements", {}),
+    ("rec_degreeworks_courses", {}),
+    ("plan_next_quarter", {"preferred_num_courses": 4}),
+    ("course_info", {"course_number": "161", "department": "COMPSCI"}),
+    ("course_info", {"course_number": "171", "department": "COMPSCI"}),
+]
+
+# Longest gap between ticks of a 1 ms timer while the turn runs
+async def measure_stall(turn):
+    stall = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    ready = await turn(start)
+    total = time.perf_counter() - start
+    running = False
+    await tick
+    return total, ready, stall
+
+# Old dispatch - async handlers without awaits, so gather ran them one after another on the loop
+async def inline_turn(completed, grad_reqs):
+    async def turn(start):
+        ready = []
+        for name, data in CALLS:
+            tool, args = agent.tool_registry.parse(name, json.dumps(data))
+            if tool.uses_audit:
+                args = {**args, "completed_courses": completed, "grad_reqs": grad_reqs}
+            tool.handler(**args)
+            ready.append(time.perf_counter() - start)
+        return ready
+    return await measure_stall(turn)
+
+async def threaded_turn(completed, grad_reqs):
+    tool_calls = [{"function": {"name": name, "arguments": json.dumps(data)}} for name, data in CALLS]
+
+    async def turn(start):
+        ready = []
+        await agent.run_tool_calls(tool_calls, completed, grad_reqs,
+                                   lambda event: event["type"] == "tool_end" and ready.append(time.perf_counter() - start))
+        return ready
+    return await measure_stall(turn)
+
+def run(turn, completed, grad_reqs):
+    totals, mean_ready, stalls = [], [], []
+    for _ in range(ROUNDS):
+        total, ready, stall = asyncio.run(turn(completed, grad_reqs))
+        totals.append(total)
+        mean_ready.append(sum(ready) / len(ready))
+        stalls.append(stall)
+    return min(totals) * 1000, min(mean_ready) * 1000, min(stalls) * 1000
+
+if __name__ == "__main__":
+    catalog = get_catalog()
+    audit = parse_degreeworks(make_audit_pdf(catalog, num_pages=2))
+    completed = ["I&CSCI31", "I&CSCI32", "I&CSCI33", "I&CSCI45C", "I&CSCI46", "I&CSCI6B", "I&CSCI6D", "I&CSCI51",
+                 "MATH2A", "MATH2B", "STATS67", "IN4MATX43"]
+    grad_reqs = {
+        "req_upper": {"num_needed": 8, "courses": catalog.courses_in_range("COMPSCI", 100, 199)},
+        "req_inf": {"num_needed": 3, "courses": catalog.courses_in_range("IN4MATX", 100, 199)},
+        **audit.requirements
+    }
+    # Every call actually runs
+    agent.tool_registry.cache = None
+
+    print(f"{len(CALLS)} tool calls in one turn, best of {ROUNDS}")
+    print(f"{'':10} {'turn':>10} {'mean result ready':>18} {'max loop stall':>15}")
+    for name, turn in (("inline", inline_turn), ("threaded", threaded_turn)):
+        total, ready, stall = run(turn, completed, grad_reqs)
+        print(f"{name:10} {total:8.1f}ms {ready:16.1f}ms {stall:13.1f}ms")
@@ -0,0 +1,111 @@
+# Tool registry checks - argument validation/coercion, bad calls returned as error results, timeouts,
+# per call timing in tool_end events - and the cost of parsing + validating one call
+# Run from backend/: python benchmarks/tool_dispatch.py
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import agent
+from tool_defs import TOOLS
+from utils.tool_registry import Tool, ToolRegistry, ToolArgumentError
+
+ROUNDS = 20000
+
+def call(name, args):
+    return {"function": {"name": name, "arguments": args if isinstance(args, str) else json.dumps(args)}}
+
+def expect_error(name, arguments, text):
+    try:
+        agent.tool_registry.parse(name, arguments)
+    except ToolArgumentError as e:
+        assert text in str(e), str(e)
+        return
+    raise AssertionError(f"{name} {arguments} was accepted")
+
+def check_validation():
+    registry = agent.tool_registry
+    assert len(registry.tools) == len(TOOLS)
+
+    _, args = registry.parse("course_info", '{"course_number": 161, "department": "COMPSCI"}')
+    assert args == {"course_number": "161", "department": "COMPSCI"}
+    _, args = registry.parse("plan_next_quarter", "{}")
+    assert args == {"preferred_num_courses": 3}
+    _, args = registry.parse("plan_next_quarter", '{"preferred_num_courses": "5", "extra": 1}')
+    assert args == {"preferred_num_courses": 5}
+    # Audit comes from the request even if the model sends one
+    _, args = registry.parse("rec_degreeworks_courses", '{"completed_courses": ["COMPSCI161"]}')
+    assert args == {}
+
+    expect_error("no_such_tool", "{}", "unknown function")
+    expect_error("course_info", '{"course_number": "161"', "not valid json")
+    expect_error("course_info", '{"course_number": "161"}', "missing required argument department")
+    expect_error("add_quarter_to_plan", '{"session_id": "a", "quarter_name": "Fall 2026", "selected_courses": "x"}',
+                 "selected_courses: expected a list")
+    print("validation: ok")
+
+async def check_run_tool_calls():
+    events = []
+    calls = [
+        call("course_info", {"course_number": "161", "department": "COMPSCI"}),
+        call("course_info", {"department": "COMPSCI"}),
+        call("finish_graduation_plan", {"session_id": "missing"}),
+    ]
+    results = await agent.run_tool_calls(calls, [], {}, events.append)
+    assert "error" not in results[0]
+    assert results[1]["error"].startswith("Invalid call to course_info")
+    assert results[2] == {"error": "Session not found"}
+    ends = [e for e in events if e["type"] == "tool_end"]
+    assert len(ends) == 2 and all("duration_ms" in e for e in ends)
+    print("run_tool_calls: ok")
+
+async def check_timeout():
+    # CPU bound / blocking handler, runs on a tool thread so the timeout can fire while it is still running
+    def slow():
+        time.sleep(0.5)
+        return {}
+
+    async def slow_async():
+        await asyncio.sleep(1)
+        return {}
+
+    def broken():
+        raise RuntimeError("boom")
+
+    schema = lambda name: {"type": "function", "function": {"name": name, "parameters": {"type": "object", "properties": {}}}}
+    registry = ToolRegistry()
+    slow_tool = registry.register(Tool(schema("slow"), slow, timeout=0.05))
+    slow_async_tool = registry.register(Tool(schema("slow_async"), slow_async, timeout=0.05))
+    broken_tool = registry.register(Tool(schema("broken"), broken))
+    for tool in (slow_tool, slow_async_tool):
+        result, elapsed = await registry.call(tool, {}, [], {})
+        assert "timed out" in result["error"] and elapsed < 200, (result, elapsed)
+    result, _ = await registry.call(broken_tool, {}, [], {})
+    assert result == {"error": "broken failed: boom"}
+    metrics = registry.metrics()
+    assert metrics["slow"]["timeouts"] == 1 and metrics["broken"]["errors"] == 1
+    print("timeouts/errors: ok")
+
+def time_parse():
+    calls = [
+        ("course_info", '{"course_number": "161", "department": "COMPSCI"}'),
+        ("add_quarter_to_plan", json.dumps({
+            "session_id": "abcd1234", "quarter_name": "Fall 2026",
+            "selected_courses": [{"code": f"COMPSCI{n}", "name": "x", "credits": 4} for n in range(4)]
+        })),
+    ]
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for name, arguments in calls:
+            agent.tool_registry.parse(name, arguments)
+    print(f"parse + validate: {(time.perf_counter() - start) / (ROUNDS * len(calls)) * 1e6:.2f} us per call")
+
+if __name__ == "__main__":
+    check_validation()
+    asyncio.run(check_run_tool_calls())
+    asyncio.run(check_timeout())
+    time_parse()
+    print(json.dumps(agent.tool_registry.metrics()["course_info"]))
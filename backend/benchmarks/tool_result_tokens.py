@@ -0,0 +1,54 @@
+# Prompt tokens per tool result, json.dumps of the raw result vs encode_tool_result projection
+# Tokens are estimated at ~4 chars per token (same estimate as conversation_store, no tokenizer installed)
+# Run from backend/: python benchmarks/tool_result_tokens.py
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic_audit import make_audit_pdf
+from utils.course_catalog import get_catalog
+from utils.parse_degreeworks import parse_degreeworks
+from functions.course_functions import rec_degreeworks_courses, course_info, plan_next_quarter, get_remaining_requirements
+from functions.graduation_planning import (start_graduation_planning, get_graduation_plan_for_quarter,
+                                           plan_full_graduation)
+from tool_results import encode_tool_result
+
+def tokens(text):
+    return len(text) // 4
+
+def tool_results(completed, grad_reqs):
+    started = start_graduation_planning("Spring 2027", completed, grad_reqs, "machine learning", 4)
+    return {
+        "rec_degreeworks_courses": rec_degreeworks_courses(completed, grad_reqs),
+        "plan_next_quarter": plan_next_quarter(completed, grad_reqs, 4),
+        "get_graduation_plan_for_quarter": get_graduation_plan_for_quarter(started["session_id"], "Winter 2026"),
+        "get_remaining_requirements": get_remaining_requirements(completed, grad_reqs),
+        "course_info": course_info("161", "COMPSCI"),
+        "plan_full_graduation": plan_full_graduation("Spring 2027", completed, grad_reqs, "machine learning", 4),
+    }
+
+if __name__ == "__main__":
+    catalog = get_catalog()
+    audit = parse_degreeworks(make_audit_pdf(catalog, num_pages=2))
+    # Early in a degree - intro sequence done, most upper division courses still open
+    completed = ["I&CSCI31", "I&CSCI32", "I&CSCI33", "I&CSCI45C", "I&CSCI46", "I&CSCI6B", "I&CSCI6D", "I&CSCI51",
+                 "MATH2A", "MATH2B", "STATS67", "IN4MATX43"]
+    grad_reqs = {
+        "req_upper": {"num_needed": 8, "courses": catalog.courses_in_range("COMPSCI", 100, 199)},
+        "req_inf": {"num_needed": 3, "courses": catalog.courses_in_range("IN4MATX", 100, 199)},
+        "req_ics": {"num_needed": 2, "courses": catalog.courses_in_range("I&CSCI", 1, 199)},
+        **audit.requirements
+    }
+
+    results = tool_results(completed, grad_reqs)
+    print(f"{'tool':34} {'before':>8} {'after':>8}")
+    total_before = total_after = 0
+    for tool_name, result in results.items():
+        before = tokens(json.dumps(result))
+        after = tokens(encode_tool_result(tool_name, result))
+        total_before += before
+        total_after += after
+        print(f"{tool_name:34} {before:8d} {after:8d}")
+    print(f"{'total':34} {total_before:8d} {total_after:8d}")
@@ -0,0 +1,44 @@
+import os
+from dotenv import load_dotenv
+
+# Config is read once at startup, import this module before anything that reads env vars
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None     # override for local/fake completion servers
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Connection pool + timeouts for the shared OpenAI client
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+# DegreeWorks upload parsing runs in a process pool so pdf extraction doesnt block the event loop
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "2"))
+UPLOAD_MAX_PENDING = int(os.getenv("UPLOAD_MAX_PENDING", "8"))     # queued uploads beyond busy workers before 429
+UPLOAD_TIMEOUT = float(os.getenv("UPLOAD_TIMEOUT", "30"))          # seconds per upload
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))     # request body, checked before it is received
+
+# Parsed audit cache, AUDIT_CACHE_DIR enables on-disk persistence
+AUDIT_CACHE_SIZE = int(os.getenv("AUDIT_CACHE_SIZE", "256"))
+AUDIT_CACHE_DIR = os.getenv("AUDIT_CACHE_DIR") or None
+
+# Graduation sessions + uploaded audits, "memory" (per worker) or "sqlite" (one db file shared by all workers)
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "graduation_sessions.db")
+
+# Uploaded audits are kept server side under an audit_id for /chat, same backend as graduation sessions
+# (SESSION_STORE). With more than one worker use SESSION_STORE=sqlite, with the in memory store a /chat landing
+# on another worker than the upload has to resend the audit (the frontend does this on 404)
+AUDIT_PROFILE_TTL = float(os.getenv("AUDIT_PROFILE_TTL", str(7 * 24 * 60 * 60)))
+# uvicorn --workers default, only used to warn about per worker stores
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Results of deterministic tools (requirements, next quarter options, course info) cached per worker
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+
+# Threads running tool handlers, independent tool calls in one model response run concurrently on these
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "4"))
@@ -12,50 +12,56 @@ from collections import defaultdict
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.parse_degreeworks import extract_courses_needed, extract_courses_completed
+from utils.course_catalog import get_catalog
+from utils.prereqs import normalize_course_id
 
 CURRENT_YEAR=2026
 NEXT_QUARTER='2026 Winter'
 
 # Returns list of courses that user can take based on prereqs + is required for graduation
-async def rec_degreeworks_courses(completed_courses=None, grad_reqs=None, major="Computer Science"):
+def rec_degreeworks_courses(completed_courses=None, grad_reqs=None, major="Computer Science"):
     course_recs = []
+    catalog = get_catalog()
+    completed_mask = catalog.completed_mask(completed_courses or [])
     # Loop through course requirements
     for req_id, req_data in grad_reqs.items():
         courses = req_data["courses"]
         for course in courses:
-            if check_prereq(course, completed_courses):
+            if check_prereq(course, completed_courses, catalog, completed_mask):
                 course_recs.append([course['code'], course['name'], course['description']])
     return course_recs
 
 # Return the name, code, credits, description, prerequisites, difficulty, and offerings this year for a course in input
-async def course_info(course_number, department):
-    with open('data/courses.json', 'r') as f:
-        data = json.load(f)
-    # Loop through courses in department and find matching course, return info
-    for course in data["courses"][department]:
-        if course["code"] == f"{department}{course_number}":
-            relevant_offerings = [
-                quarter for quarter in course["offered_quarters"] 
-                if int(quarter.split()[0]) >= CURRENT_YEAR
-            ]
-            return {
-                "name": course["name"],
-                "code": course["code"],
-                "credits": course["credits"],
-                "description": course["description"],
-                "prerequisites": course["prerequisites"],
-                "difficulty": course.get("difficulty", "unknown"),
-                "offered_quarters": relevant_offerings
-            }
+def course_info(course_number, department):
+    course = get_catalog().get_by_number(department, course_number)
+    if course:
+        relevant_offerings = [
+            quarter for quarter in course["offered_quarters"] 
+            if int(quarter.split()[0]) >= CURRENT_YEAR
+        ]
+        return {
+            "name": course["name"],
+            "code": course["code"],
+            "credits": course["credits"],
+            "description": course["description"],
+            "prerequisites": course["prerequisites"],
+            "difficulty": course.get("difficulty", "unknown"),
+            "offered_quarters": relevant_offerings
+        }
     return {
         "error": f"Course {department}{course_number} not found"
     }
 
 # Returns all courses user can take next quarter based on prereqs and offerings
 # let ai decide from those recs for smarter recommendations
-async def plan_next_quarter(completed_courses=None, grad_reqs=None, preferred_num_courses=3, single_q_planning=True):
+# eligible_codes - optional precomputed set of codes with prereqs met (graduation sessions keep this updated)
+def plan_next_quarter(completed_courses=None, grad_reqs=None, preferred_num_courses=3, single_q_planning=True, eligible_codes=None):
     seen_codes = set()
     all_possible_courses = []
+    completed_set = set(completed_courses)
+    if eligible_codes is None:
+        catalog = get_catalog()
+        completed_mask = catalog.completed_mask(completed_set)
 
     for req_id, req_data in grad_reqs.items():
         num_needed = req_data["num_needed"]
@@ -66,13 +72,17 @@ async def plan_next_quarter(completed_courses=None, grad_reqs=None, preferred_nu
             if single_q_planning:
                 offering_valid = NEXT_QUARTER in course['offered_quarters'] # single quarter plannign checks if it is offered
             else:
-                # Multi quarter graduation planning checks if offered recently, because offerings are not updated fullt on api
-                offering_valid = any('2025' in q or '2026' in q for q in course['offered_quarters'])
+                offering_valid = offered_recently(course)
+
+            if eligible_codes is not None:
+                prereqs_met = course['code'] in eligible_codes
+            else:
+                prereqs_met = check_prereq(course, completed_courses, catalog, completed_mask)
 
             # If course is valid
             if (course['code'] not in seen_codes and
-                course['code'] not in completed_courses and
-                check_prereq(course, completed_courses) and
+                course['code'] not in completed_set and
+                prereqs_met and
                 offering_valid):
 
                 course_summary = {
@@ -99,7 +109,7 @@ async def plan_next_quarter(completed_courses=None, grad_reqs=None, preferred_nu
     }
     
 # Return the remaining requirements a user needs to graduate
-async def get_remaining_requirements(completed_courses=None, grad_reqs=None):
+def get_remaining_requirements(completed_courses=None, grad_reqs=None):
     requirements_breakdown = {}
 
     for req_id, req_data in grad_reqs.items():
@@ -125,16 +135,27 @@ async def get_remaining_requirements(completed_courses=None, grad_reqs=None):
 # HELPER FUNCTIONS
 
 # Checks if user can take given course based on prereqs
-# Input is course object
-def check_prereq(course, completed_courses=None):
+# Input is course object. Pass catalog + completed_mask (catalog.completed_mask) when checking many
+# courses so the compiled prereq tree is used instead of walking the json tree
+def check_prereq(course, completed_courses=None, catalog=None, completed_mask=None):
     if completed_courses is None:
         completed_courses = []
 
     if not course["prerequisites"]:
         return True
 
+    if catalog is not None and completed_mask is not None:
+        met = catalog.prereqs_met(course["code"], completed_mask)
+        if met is not None:
+            return met
+
+    # Course not in catalog - walk raw tree
     return check_prereq_tree(course["prereq_tree"], completed_courses)
 
+# Multi quarter graduation planning checks if offered recently, because offerings are not updated fullt on api
+def offered_recently(course):
+    return any('2025' in q or '2026' in q for q in course['offered_quarters'])
+
 # Recursive function to check if compelted courses satisfies prereq tree for a course
 def check_prereq_tree(prereq_tree, completed_courses=None):
     if not prereq_tree:
@@ -155,6 +176,3 @@ def check_prereq_tree(prereq_tree, completed_courses=None):
     # Exams return false here, should be handled in project though
     return False
 
-# Normalize course id's to remove spaces to match course codes
-def normalize_course_id(course_id):
-    return course_id.replace(' ', '').upper()
@@ -0,0 +1,189 @@
+import time
+from math import ceil
+
+# Max seconds spent searching for a smaller course cover before using the best found so far
+PLANNER_TIME_BUDGET = 0.2
+
+# Requirement covering planner used by graduation planning
+# 1. Find the smallest set of courses that covers every requirement group's num_needed (a course counts
+#    toward every group it is in, same as update_requirements) with branch and bound
+# 2. Schedule that set into quarters, courses_per_quarter at a time, respecting prereq order
+# Only covers that can actually be scheduled before graduation are accepted
+
+class PlannerTimeout(Exception):
+    pass
+
+# Courses from candidates whose prereqs can eventually be met by completed + other candidates
+def reachable_courses(candidates, completed, eligible):
+    taken = set(completed)
+    remaining = set(candidates)
+    while True:
+        unlocked = set(eligible(remaining, taken))
+        if not unlocked:
+            return set(candidates) - remaining
+        taken |= unlocked
+        remaining -= unlocked
+
+# Longest chain of courses in selected that depend on each course, schedule these first
+def chain_depths(selected, unlocks):
+    selected = set(selected)
+    depths = {}
+
+    def depth(code, visiting):
+        if code in depths:
+            return depths[code]
+        visiting.add(code)
+        best = 0
+        for dependent in unlocks(code) & selected:
+            if dependent not in visiting:
+                best = max(best, depth(dependent, visiting))
+        visiting.discard(code)
+        depths[code] = best + 1
+        return depths[code]
+
+    for code in selected:
+        depth(code, set())
+    return depths
+
+# Place selected courses into quarters, returns (list of code lists per quarter, codes that didnt fit)
+def schedule_courses(selected, completed, quarters, courses_per_quarter, eligible, unlocks, scores):
+    depths = chain_depths(selected, unlocks)
+    taken = set(completed)
+    remaining = set(selected)
+    plan = []
+
+    for _ in quarters:
+        if not remaining:
+            break
+        ready = eligible(remaining, taken)
+        ready.sort(key=lambda code: (-depths[code], -scores.get(code, 0), code))
+        chosen = ready[:courses_per_quarter]
+        plan.append(chosen)
+        taken.update(chosen)
+        remaining.difference_update(chosen)
+
+    return plan, remaining
+
+# Greedy cover - repeatedly take the course counting toward the most unsatisfied groups
+def greedy_cover(needs, group_courses, course_groups, scores):
+    needs = dict(needs)
+    selected = []
+    chosen = set()
+    while any(n > 0 for n in needs.values()):
+        best = None
+        best_key = None
+        for group, need in needs.items():
+            if need <= 0:
+                continue
+            for code in group_courses[group]:
+                if code in chosen:
+                    continue
+                key = (sum(1 for g in course_groups[code] if needs[g] > 0), scores.get(code, 0))
+                if best_key is None or key > best_key:
+                    best, best_key = code, key
+        if best is None:
+            return None
+        selected.append(best)
+        chosen.add(best)
+        for group in course_groups[best]:
+            needs[group] -= 1
+    return selected
+
+# Smallest set of courses covering all needs that feasible() accepts, searched within time_budget
+# Branches on the most constrained unsatisfied group, lower bound is max(largest need, total need / best coverage)
+# where best coverage is over every open candidate of every unsatisfied group, so the bound never overestimates
+def min_course_cover(needs, group_courses, course_groups, scores, feasible, time_budget=PLANNER_TIME_BUDGET):
+    deadline = time.perf_counter() + time_budget
+    best = [None]
+
+    incumbent = greedy_cover(needs, group_courses, course_groups, scores)
+    if incumbent is not None and feasible(incumbent):
+        best[0] = incumbent
+
+    nodes = [0]
+
+    def search(selected, chosen, needs, excluded):
+        nodes[0] += 1
+        if nodes[0] % 256 == 0 and time.perf_counter() > deadline:
+            raise PlannerTimeout()
+
+        unsatisfied = {g: n for g, n in needs.items() if n > 0}
+        if not unsatisfied:
+            if (best[0] is None or len(selected) < len(best[0])) and feasible(selected):
+                best[0] = list(selected)
+            return
+
+        # Pick group with least slack between open candidates and courses still needed
+        branch_group = None
+        branch_courses = None
+        max_coverage = 0
+        for group, need in unsatisfied.items():
+            open_courses = [c for c in group_courses[group] if c not in chosen and c not in excluded]
+            if len(open_courses) < need:
+                return
+            if branch_courses is None or len(open_courses) - need < len(branch_courses) - unsatisfied[branch_group]:
+                branch_group, branch_courses = group, open_courses
+            for c in open_courses:
+                max_coverage = max(max_coverage, sum(1 for g in course_groups[c] if needs[g] > 0))
+
+        bound = len(selected) + max(max(unsatisfied.values()), ceil(sum(unsatisfied.values()) / max_coverage))
+        if best[0] is not None and bound >= len(best[0]):
+            return
+
+        branch_courses.sort(key=lambda c: (-sum(1 for g in course_groups[c] if needs[g] > 0), -scores.get(c, 0), c))
+
+        # Include branch_courses[i] while excluding branch_courses[:i]
+        need = unsatisfied[branch_group]
+        newly_excluded = set()
+        for i, code in enumerate(branch_courses):
+            if len(branch_courses) - i < need:
+                break
+            next_needs = dict(needs)
+            for group in course_groups[code]:
+                next_needs[group] -= 1
+            selected.append(code)
+            chosen.add(code)
+            search(selected, chosen, next_needs, excluded | newly_excluded)
+            selected.pop()
+            chosen.discard(code)
+            newly_excluded.add(code)
+
+    try:
+        search([], set(), dict(needs), set())
+    except PlannerTimeout:
+        pass
+
+    return best[0]
+
+# Full requirement covering plan from current state
+# requirements: req_id -> (num_needed, course codes), candidates: codes that can be planned (not completed, offered)
+# eligible(codes, taken_codes) -> list of codes whose prereqs taken_codes meets, called once per scheduling
+# step so it can build its completed mask once, unlocks(code) -> set of codes whose prereqs mention code
+# Returns list of code lists per quarter, or None if no cover fits before graduation
+def plan_requirement_cover(requirements, candidates, completed, quarters, courses_per_quarter, eligible, unlocks,
+                           scores=None, time_budget=PLANNER_TIME_BUDGET):
+    scores = scores or {}
+    candidates = reachable_courses(candidates, completed, eligible)
+
+    needs = {}
+    group_courses = {}
+    course_groups = {}
+    for req_id, (num_needed, codes) in requirements.items():
+        group_courses[req_id] = []
+        for code in dict.fromkeys(codes):
+            if code in candidates:
+                group_courses[req_id].append(code)
+                course_groups.setdefault(code, []).append(req_id)
+        # Groups that can't be fully covered are covered as far as possible, they stay remaining in the session
+        needs[req_id] = min(num_needed, len(group_courses[req_id]))
+
+    def feasible(selected):
+        plan, left = schedule_courses(selected, completed, quarters, courses_per_quarter, eligible, unlocks, scores)
+        return not left
+
+    cover = min_course_cover(needs, group_courses, course_groups, scores, feasible, time_budget)
+    if cover is None:
+        return None
+
+    plan, _ = schedule_courses(cover, completed, quarters, courses_per_quarter, eligible, unlocks, scores)
+    return plan
@@ -1,51 +1,170 @@
 import uuid
+from types import MappingProxyType
 from collections import defaultdict
 from typing import List, Dict, Any
-from functions.course_functions import plan_next_quarter
+from functions.course_functions import plan_next_quarter, check_prereq, check_prereq_tree, offered_recently
+from functions.course_planner import plan_requirement_cover
+from utils.course_catalog import get_catalog
+from utils.session_store import create_session_store
 
-graduation_sessions = {}
+FIRST_PLANNING_QUARTER = "Winter 2026"
+MAX_PLANNING_QUARTERS = 24
+
+# Fields kept for courses added to a plan, rest of course object (description, prereqs) is dropped
+PLANNED_COURSE_FIELDS = ("code", "name", "credits", "difficulty", "satisfies_requirement")
+
+# Requirement group in a session - course codes only, course objects are looked up in the shared catalog
+class RequirementGroup:
+    __slots__ = ("num_needed", "codes")
+
+    def __init__(self, num_needed, codes):
+        self.num_needed = num_needed
+        self.codes = tuple(codes)
 
 # Graduation planning continually calls quarter plan function while keeping track of classes added/remaining requirements
 # saves state for graduation planning
 class GraduationSession:
 
     def __init__(self, original_completed, original_grad_reqs, graduation_quarter, quarters_to_plan, user_interests=None, courses_per_quarter=3):
-        self.original_completed = original_completed.copy()
-        # Deep copy
-        self.original_grad_reqs = {
-            k: {
-                "num_needed": v["num_needed"],
-                "courses": v["courses"].copy()
-            } for k, v in original_grad_reqs.items()
-        }
+        self.original_completed = tuple(original_completed)
+        # Only courses missing from the catalog keep their full object
+        self.extra_courses = {}
+        catalog = get_catalog()
+        groups = {}
+        for req_id, req_data in original_grad_reqs.items():
+            codes = []
+            for course in req_data["courses"]:
+                if course["code"] not in catalog:
+                    self.extra_courses[course["code"]] = course
+                codes.append(course["code"])
+            groups[req_id] = RequirementGroup(req_data["num_needed"], codes)
+
+        # Original snapshot is read only, current groups share its code tuples until a quarter is added
+        self.original_requirements = MappingProxyType(groups)
+        self.requirements = dict(groups)
         self.graduation_quarter = graduation_quarter
         self.planned_quarters = []
-        self.current_completed = original_completed.copy()
-        self.current_grad_reqs = {
-            k: {
-                "num_needed": v["num_needed"],
-                "courses": v["courses"].copy()
-            } for k, v in original_grad_reqs.items()
-        }
-        self.next_quarter = "Winter 2026"
+        self.current_completed = list(original_completed)
+        self.next_quarter = FIRST_PLANNING_QUARTER
         self.quarters_to_plan = quarters_to_plan
         self.user_interests = user_interests
         self.courses_per_quarter = courses_per_quarter
 
+        self.refresh_eligible()
+
+    # Course object for code from catalog (or extra_courses), None if it no longer exists
+    def course(self, code):
+        course = self.catalog.get_course(code)
+        if course is None:
+            course = self.extra_courses.get(code)
+        return course
+
+    # grad_reqs in the dict form the course functions take, courses reference shared catalog objects
+    def grad_reqs_view(self, requirements):
+        view = {}
+        for req_id, group in requirements.items():
+            courses = []
+            for code in group.codes:
+                course = self.course(code)
+                if course is not None:
+                    courses.append(course)
+            view[req_id] = {"num_needed": group.num_needed, "courses": courses}
+        return view
+
+    @property
+    def original_grad_reqs(self):
+        return self.grad_reqs_view(self.original_requirements)
+
+    @property
+    def current_grad_reqs(self):
+        return self.grad_reqs_view(self.requirements)
+
+    # Eligible set of requirement courses with prereqs met, updated incrementally in add_quarter
+    # Catalog is pinned so completed mask stays valid if courses.json is reloaded mid session
+    def refresh_eligible(self):
+        self.catalog = get_catalog()
+        self.completed_mask = self.catalog.completed_mask(self.current_completed)
+        self.eligible = set()
+        self.pending = set()    # requirement courses in catalog with prereqs not met yet
+        self.unindexed = {}     # requirement courses missing from catalog, code -> course (checked with raw tree)
+
+        for group in self.requirements.values():
+            for code in group.codes:
+                course = self.course(code)
+                if course is None:
+                    continue
+                if check_prereq(course, self.current_completed, self.catalog, self.completed_mask):
+                    self.eligible.add(code)
+                elif code in self.catalog:
+                    self.pending.add(code)
+                else:
+                    self.unindexed[code] = course
+
+    # Recheck only courses whose prereq trees mention newly completed courses
+    def update_eligible(self, new_codes):
+        self.completed_mask |= self.catalog.completed_mask(new_codes)
+
+        for code in self.catalog.unlocked_by(new_codes) & self.pending:
+            if self.catalog.prereqs_met(code, self.completed_mask):
+                self.pending.discard(code)
+                self.eligible.add(code)
+
+        for code, course in list(self.unindexed.items()):
+            if not course["prerequisites"] or check_prereq_tree(course["prereq_tree"], self.current_completed):
+                self.eligible.add(code)
+                del self.unindexed[code]
 
     # update class instance completed/grad reqs after a quarter is planned
     def add_quarter(self, quarter_name, courses):
         self.planned_quarters.append({
             "quarter": quarter_name,
-            "courses": courses
+            "courses": [{k: c[k] for k in PLANNED_COURSE_FIELDS if k in c} for c in courses]
         })
         
         # update completed courses
-        for course in courses:
-            self.current_completed.append(course["code"])
+        new_codes = [course["code"] for course in courses]
+        self.current_completed.extend(new_codes)
         
         # update grad requirements
-        self.current_grad_reqs = update_requirements(self.current_grad_reqs, courses)
+        self.requirements = update_requirements(self.requirements, new_codes)
+        self.update_eligible(new_codes)
+
+    # Quarters left to plan starting at quarter_name
+    def remaining_quarters(self, quarter_name):
+        if quarter_name in self.quarters_to_plan:
+            return self.quarters_to_plan[self.quarters_to_plan.index(quarter_name):]
+        return [quarter_name]
+
+    # Smallest set of courses covering remaining requirements, scheduled from quarter_name to graduation
+    # Returns list of code lists per quarter, None if no cover fits
+    def plan_requirement_cover(self, quarter_name):
+        catalog = self.catalog
+        completed = set(self.current_completed)
+        candidates = set()
+        scores = {}
+        for group in self.requirements.values():
+            for code in group.codes:
+                course = self.course(code)
+                if course is None or code in completed or code in candidates or not offered_recently(course):
+                    continue
+                candidates.add(code)
+                scores[code] = calculate_interest_score(course, self.user_interests)
+
+        # One completed mask per call, not per course
+        def eligible(codes, taken):
+            mask = catalog.completed_mask(taken)
+            return [code for code in codes if check_prereq(self.course(code), taken, catalog, mask)]
+
+        return plan_requirement_cover(
+            {req_id: (group.num_needed, group.codes) for req_id, group in self.requirements.items()},
+            candidates,
+            completed,
+            self.remaining_quarters(quarter_name),
+            self.courses_per_quarter,
+            eligible,
+            lambda code: catalog.unlocks.get(code, set()),
+            scores
+        )
 
     # Returns complete graduation plan summary
     def get_summary(self):
@@ -58,9 +177,52 @@ class GraduationSession:
             "total_courses": total_courses,
             "total_units": total_units,
             "plan": self.planned_quarters,
-            "requirements_remaining": len(self.current_grad_reqs) > 0
+            "requirements_remaining": len(self.requirements) > 0
+        }
+
+    # Compact json-able form for session stores
+    def to_dict(self):
+        return {
+            "original_completed": list(self.original_completed),
+            "original_requirements": compact_requirements(self.original_requirements),
+            "extra_courses": self.extra_courses,
+            "graduation_quarter": self.graduation_quarter,
+            "planned_quarters": self.planned_quarters,
+            "current_completed": self.current_completed,
+            "requirements": compact_requirements(self.requirements),
+            "next_quarter": self.next_quarter,
+            "quarters_to_plan": self.quarters_to_plan,
+            "user_interests": self.user_interests,
+            "courses_per_quarter": self.courses_per_quarter
         }
 
+    # Rebuild session from to_dict output
+    @classmethod
+    def from_dict(cls, data):
+        session = cls.__new__(cls)
+        session.original_completed = tuple(data["original_completed"])
+        session.original_requirements = MappingProxyType(expand_requirements(data["original_requirements"]))
+        session.extra_courses = data["extra_courses"]
+        session.graduation_quarter = data["graduation_quarter"]
+        session.planned_quarters = data["planned_quarters"]
+        session.current_completed = data["current_completed"]
+        session.requirements = expand_requirements(data["requirements"])
+        session.next_quarter = data["next_quarter"]
+        session.quarters_to_plan = data["quarters_to_plan"]
+        session.user_interests = data["user_interests"]
+        session.courses_per_quarter = data["courses_per_quarter"]
+        session.refresh_eligible()
+        return session
+
+# req_id -> [num_needed, [codes]]
+def compact_requirements(requirements):
+    return {req_id: [group.num_needed, list(group.codes)] for req_id, group in requirements.items()}
+
+def expand_requirements(requirements):
+    return {req_id: RequirementGroup(num_needed, codes) for req_id, (num_needed, codes) in requirements.items()}
+
+graduation_sessions = create_session_store(GraduationSession.to_dict, GraduationSession.from_dict)
+
 # Takes in quarter name, returns next quarter
 def get_next_quarter(curr_quarter):
     parts = curr_quarter.split()
@@ -74,55 +236,54 @@ def get_next_quarter(curr_quarter):
         return f"Fall {year}"
     return None
 
-# returns updated grad_reqs after planning courses for graduation
-def update_requirements(grad_reqs, planned_courses):
+# returns updated requirement groups after planning courses for graduation
+def update_requirements(requirements, planned_codes):
     updated_reqs = {}
-    planned_codes = [course["code"] for course in planned_courses]
-
-    # each item in form req_id:{num_needed, courses}
-    for req_id, req_data in grad_reqs.items():
-        num_needed = req_data["num_needed"]
-        courses = req_data["courses"]
+    planned_codes = set(planned_codes)
 
+    for req_id, group in requirements.items():
         # remove planned courses
-        remaining = [c for c in courses if c["code"] not in planned_codes]
+        remaining = [code for code in group.codes if code not in planned_codes]
 
         # update num required
-        num_satisfied = len([c for c in courses if c["code"] in planned_codes])
-        new_required = num_needed - num_satisfied
+        num_satisfied = len(group.codes) - len(remaining)
+        new_required = group.num_needed - num_satisfied
 
-        # keep updated requirement in dict if still needed
+        # keep updated requirement if still needed, untouched groups are reused as is
         if new_required > 0 and remaining:
-            updated_reqs[req_id] = {
-                "num_needed": new_required,
-                "courses": remaining
-            }
+            updated_reqs[req_id] = group if num_satisfied == 0 else RequirementGroup(new_required, remaining)
 
     return updated_reqs
  
-# Initialize grad planning session - create session id + class instance
-# Returns dict with session id and planning info
-async def start_graduation_planning(graduation_quarter, completed_courses, grad_reqs, user_interests=None, courses_per_quarter=3):
-    session_id = str(uuid.uuid4())[:8]
-
-    curr_quarter = "Winter 2026"
-    quarters_until = 0
+# List of quarters from first planning quarter through graduation quarter
+# Empty if graduation quarter is invalid, in the past or more than MAX_PLANNING_QUARTERS away
+def get_quarters_to_plan(graduation_quarter):
+    curr_quarter = FIRST_PLANNING_QUARTER
     quarters_to_plan = []
 
     while curr_quarter != graduation_quarter:
-        quarters_until += 1
+        if curr_quarter is None or len(quarters_to_plan) >= MAX_PLANNING_QUARTERS:
+            return []
         quarters_to_plan.append(curr_quarter)
         curr_quarter = get_next_quarter(curr_quarter)
 
     quarters_to_plan.append(graduation_quarter)
-    quarters_until += 1
+    return quarters_to_plan
+
+# Initialize grad planning session - create session id + class instance
+# Returns dict with session id and planning info
+def start_graduation_planning(graduation_quarter, completed_courses, grad_reqs, user_interests=None, courses_per_quarter=3):
+    session_id = str(uuid.uuid4())[:8]
+
+    quarters_to_plan = get_quarters_to_plan(graduation_quarter)
+    quarters_until = len(quarters_to_plan)
 
     if quarters_until <= 0:
         return {"error": f"Graduation quarter is invalid or in the past"}
 
     # Create graduation session
     session = GraduationSession(completed_courses, grad_reqs, graduation_quarter, quarters_to_plan, user_interests, courses_per_quarter)
-    graduation_sessions[session_id] = session
+    graduation_sessions.save(session_id, session)
 
     return {
         "session_id": session_id,
@@ -134,12 +295,11 @@ async def start_graduation_planning(graduation_quarter, completed_courses, grad_
     }
 
 # Call quarter plan function with the updated completed courses/grad reqs
-async def add_quarter_to_plan(session_id, quarter_name, selected_courses):
-    if session_id not in graduation_sessions:
+def add_quarter_to_plan(session_id, quarter_name, selected_courses):
+    session = graduation_sessions.get(session_id)
+    if session is None:
         return {"error": "Session not found"}
     
-    session = graduation_sessions[session_id]
-    
     # Error/duplicate validation
     already_planned = [
         c["code"] for q in session.planned_quarters for c in q["courses"]
@@ -152,12 +312,14 @@ async def add_quarter_to_plan(session_id, quarter_name, selected_courses):
     session.add_quarter(quarter_name, selected_courses)
     
     # bool for if grad requirements satisfied
-    requirements_met = len(session.current_grad_reqs) == 0
+    requirements_met = len(session.requirements) == 0
     
     if quarter_name == session.graduation_quarter:
         session.next_quarter = None
     else:
         session.next_quarter = get_next_quarter(quarter_name)
+
+    graduation_sessions.save(session_id, session)
     
     return {
         "quarter_added": quarter_name,
@@ -170,31 +332,44 @@ async def add_quarter_to_plan(session_id, quarter_name, selected_courses):
     }
 
 # Select courses based on requirement groups
-async def get_graduation_plan_for_quarter(session_id, quarter_name):
-    if session_id not in graduation_sessions:
+def get_graduation_plan_for_quarter(session_id, quarter_name):
+    session = graduation_sessions.get(session_id)
+    if session is None:
         return {"error": "Session not found"}
 
-    session = graduation_sessions[session_id]
+    return select_quarter_courses(session, quarter_name)
 
+# Auto-select courses for next quarter from session state
+def select_quarter_courses(session, quarter_name):
     courses_needed = session.courses_per_quarter
+    grad_reqs = session.current_grad_reqs
 
     # Returns all possible courses user can take
-    all_available = await plan_next_quarter(
+    all_available = plan_next_quarter(
         completed_courses=session.current_completed,
-        grad_reqs=session.current_grad_reqs,
+        grad_reqs=grad_reqs,
         preferred_num_courses=courses_needed,
-        single_q_planning=False
+        single_q_planning=False,
+        eligible_codes=session.eligible
     )
 
     if "error" in all_available:
         return all_available
 
-    selected_courses = smart_course_selection(
-        all_available["available_courses"],
-        session.current_grad_reqs,
-        courses_needed,
-        user_interests=session.user_interests
-    )
+    # First quarter of the smallest requirement cover, greedy selection if no cover fits before graduation
+    selected_courses = []
+    cover_plan = session.plan_requirement_cover(quarter_name)
+    if cover_plan:
+        available_by_code = {c["code"]: c for c in all_available["available_courses"]}
+        selected_courses = [available_by_code[code] for code in cover_plan[0] if code in available_by_code]
+
+    if not selected_courses:
+        selected_courses = smart_course_selection(
+            all_available["available_courses"],
+            grad_reqs,
+            courses_needed,
+            user_interests=session.user_interests
+        )
 
     return {
         "selected_courses": selected_courses,
@@ -229,6 +404,7 @@ def calculate_interest_score(course, user_interests):
 # Select courses based on requirement groups, prioritize satisfying all requirements
 def smart_course_selection(available_courses, grad_reqs, num_courses, user_interests=None):
     selected = []
+    selected_codes = set()
 
     # Group courses by requirement id
     courses_by_requirement = {}
@@ -276,7 +452,7 @@ def smart_course_selection(available_courses, grad_reqs, num_courses, user_inter
         # Get courses from requirement that aren't selected yet
         req_courses = [
             c for c in courses_by_requirement[req_id]
-            if c["code"] not in [s["code"] for s in selected]
+            if c["code"] not in selected_codes
         ]
 
         # Select up to num_needed courses from this requirement or until limit is reached
@@ -284,13 +460,14 @@ def smart_course_selection(available_courses, grad_reqs, num_courses, user_inter
             if len(selected) >= num_courses:
                 break
             selected.append(req_courses[i])
+            selected_codes.add(req_courses[i]["code"])
             requirements_tracker[req_id]["num_selected"] += 1
 
     # Fill remaining slots with highest priority unsatisfied requirements while courses still needed - shouldnt be used often
     while len(selected) < num_courses:
         remaining = [
             c for c in available_courses
-            if c["code"] not in [s["code"] for s in selected]
+            if c["code"] not in selected_codes
         ]
         if not remaining:
             break
@@ -308,6 +485,7 @@ def smart_course_selection(available_courses, grad_reqs, num_courses, user_inter
             req_courses = [c for c in remaining if c.get("satisfies_requirement") == req_id]
             if req_courses:
                 selected.append(req_courses[0])
+                selected_codes.add(req_courses[0]["code"])
                 requirements_tracker[req_id]["num_selected"] += 1
                 added = True
                 break
@@ -320,13 +498,40 @@ def smart_course_selection(available_courses, grad_reqs, num_courses, user_inter
     return selected
 
 # get final summary of grad plan
-async def finish_graduation_plan(session_id):
-    if session_id not in graduation_sessions:
+def finish_graduation_plan(session_id):
+    session = graduation_sessions.get(session_id)
+    if session is None:
         return {"error": "Session not found"}
-    
-    session = graduation_sessions[session_id]
     summary = session.get_summary()
     
-    del graduation_sessions[session_id]
+    graduation_sessions.delete(session_id)
     
-    return summary
\ No newline at end of file
+    return summary
+
+# Plan every quarter through graduation in one call, same selection as get_graduation_plan_for_quarter +
+# add_quarter_to_plan per quarter but run server side without a model round trip per quarter
+def plan_full_graduation(graduation_quarter, completed_courses, grad_reqs, user_interests=None, courses_per_quarter=3):
+    quarters_to_plan = get_quarters_to_plan(graduation_quarter)
+    if not quarters_to_plan:
+        return {"error": f"Graduation quarter is invalid or in the past"}
+
+    session = GraduationSession(completed_courses, grad_reqs, graduation_quarter, quarters_to_plan, user_interests, courses_per_quarter)
+
+    for quarter_name in quarters_to_plan:
+        # Stop once all requirements are planned
+        if not session.requirements:
+            break
+
+        selection = select_quarter_courses(session, quarter_name)
+        if "error" in selection or not selection["selected_courses"]:
+            # Nothing eligible this quarter, eligibility only changes when courses are added so later quarters are empty too
+            break
+
+        session.add_quarter(quarter_name, selection["selected_courses"])
+
+    summary = session.get_summary()
+    if summary["requirements_remaining"]:
+        summary["message"] = f"Planned {summary['quarters_planned']} quarters but some requirements cannot be completed by {graduation_quarter}."
+    else:
+        summary["message"] = f"Planned {summary['quarters_planned']} quarters, all requirements completed by {graduation_quarter}."
+    return summary
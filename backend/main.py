@@ -1,12 +1,49 @@
-from fastapi import FastAPI, HTTPException, UploadFile
+import config
+from fastapi import FastAPI, HTTPException, UploadFile, Request
 from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
-from utils.parse_degreeworks import extract_courses_needed, extract_courses_completed
-import os
-from dotenv import load_dotenv
-from agent import agent
+from fastapi.responses import StreamingResponse
+from starlette.formparsers import MultiPartParser
+import json
+from utils.parse_degreeworks import parse_degreeworks
+from utils.course_catalog import get_catalog
+from utils.parse_pool import ParsePool, ParsePoolFull
+from utils.audit_cache import AuditCache
+from utils.audit_profiles import create_audit_profile_store, compact_requirements, expand_audit, expand_requirements, new_audit_id
+from utils.session_store import InMemorySessionStore, SessionTooLarge
+from utils.request_limits import BodySizeLimitMiddleware
+from contextlib import asynccontextmanager
+import asyncio
+from agent import agent, agent_events, create_openai_client, tool_cache, tool_registry, usage_metrics
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load course catalog once at startup so first request doesnt pay for it
+    get_catalog()
+    # One OpenAI client per worker so connections/TLS sessions are reused across requests
+    # Without an api key the app still serves uploads, /chat fails when it tries to build a client
+    app.state.openai_client = create_openai_client() if config.OPENAI_API_KEY else None
+    # DegreeWorks pdfs are parsed in worker processes, bounded so a burst of uploads gets 429s instead of piling up
+    app.state.parse_pool = ParsePool(config.UPLOAD_WORKERS, config.UPLOAD_MAX_PENDING, config.UPLOAD_TIMEOUT)
+    # Re-uploads of the same pdf are served from cache
+    app.state.audit_cache = AuditCache(config.AUDIT_CACHE_SIZE, config.AUDIT_CACHE_DIR)
+    # Parsed audits by audit_id, /chat looks them up instead of receiving requirements every turn
+    app.state.audit_profiles = create_audit_profile_store(ttl=config.AUDIT_PROFILE_TTL)
+    if config.WEB_CONCURRENCY > 1 and isinstance(app.state.audit_profiles, InMemorySessionStore):
+        print(f"SESSION_STORE=memory with {config.WEB_CONCURRENCY} workers - audits and graduation sessions are per worker, "
+              "use SESSION_STORE=sqlite so every worker sees them")
+    yield
+    if app.state.openai_client is not None:
+        await app.state.openai_client.close()
+    app.state.parse_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+# Upload bodies are capped before they are received (see BodySizeLimitMiddleware), so multipart parsing can keep
+# the whole file in memory - Starlette spools file parts over 1 MB to a temp file on disk by default
+# Added before CORS so CORS headers are also on its 413 responses
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=config.UPLOAD_MAX_BYTES, paths=["/uploadFile/"])
+MultiPartParser.spool_max_size = config.UPLOAD_MAX_BYTES
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,52 +53,115 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# audit_id from /uploadFile/ replaces completed_courses/required, which are still accepted when no audit_id is sent
+# or together with it to restore an audit this worker doesn't have (required courses may be course objects or codes)
 class ChatMessage(BaseModel):
     message: str
     user_id: str = "default_user"
     conversation_id: str = "default"
-    completed_courses: list[str]
+    audit_id: str | None = None
+    completed_courses: list[str] = Field(default_factory=list)
     required: dict = Field(default_factory=dict)
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "openai_configured": bool(os.getenv("OPENAI_API_KEY"))}
-
-@app.post("/uploadFile/")
-async def upload_file(file: UploadFile):
-    try:
-        upload_dir = "uploads"
-        file_path = f"./{upload_dir}/{file.filename}"
+    return {"status": "healthy", "openai_configured": bool(config.OPENAI_API_KEY)}
 
-        os.makedirs(upload_dir, exist_ok=True)
+# Upload parse pool queue wait/parse time, audit/tool cache hit/miss stats, per tool call timing, OpenAI prompt/cached tokens
+@app.get("/metrics")
+def metrics(request: Request):
+    return {
+        "uploads": request.app.state.parse_pool.metrics(),
+        "audit_cache": request.app.state.audit_cache.metrics(),
+        "tool_cache": tool_cache.metrics(),
+        "tools": tool_registry.metrics(),
+        "openai_usage": usage_metrics()
+    }
 
-        with open(file_path, 'wb') as buffer:
-            buffer.write(await file.read())
+@app.post("/uploadFile/")
+async def upload_file(file: UploadFile, request: Request):
+    # Body is already capped at UPLOAD_MAX_BYTES and held in memory, nothing is written to disk
+    pdf_bytes = await file.read()
 
-        completed_courses = extract_courses_completed(str(file_path))
-        courses_required = extract_courses_needed(str(file_path))
+    catalog = get_catalog()
+    audit_cache = request.app.state.audit_cache
+    cache_key = audit_cache.key(pdf_bytes, catalog.version)
 
-        os.remove(file_path) 
+    try:
+        audit = audit_cache.get(cache_key, catalog)
+        if audit is None:
+            audit = await request.app.state.parse_pool.run(parse_degreeworks, pdf_bytes)
+            audit_cache.put(cache_key, audit, catalog)
 
+    except ParsePoolFull:
+        raise HTTPException(status_code=429, detail="Too many uploads are being processed, please try again shortly")
+    except asyncio.TimeoutError:
+        return {"success": False, "error": "Timed out parsing DegreeWorks pdf"}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+    audit_id = new_audit_id()
+    try:
+        request.app.state.audit_profiles.save(audit_id, audit)
+    except SessionTooLarge:
+        return {"success": False, "error": "DegreeWorks audit has too many requirements to store"}
+
+    # Requirements reference catalog courses by code, full course objects stay on the server
     return {
         "success": True,
-        "completed_courses": completed_courses,
-        "requirements": courses_required
+        "audit_id": audit_id,
+        "completed_courses": audit.completed_courses,
+        "requirements": compact_requirements(audit.requirements, catalog)
     }
 
+# (completed_courses, grad_reqs) for a chat request, from the stored audit when audit_id is given
+# A stored audit can be missing because it expired or because it was uploaded to another worker using the
+# in memory store - then the audit sent with the request is used and stored under audit_id again, 404 if none was sent
+def resolve_audit(chat_message, request):
+    if not chat_message.audit_id:
+        return chat_message.completed_courses, expand_requirements(chat_message.required, get_catalog())
+
+    audit_profiles = request.app.state.audit_profiles
+    audit = audit_profiles.get(chat_message.audit_id)
+    if audit is None:
+        if not chat_message.completed_courses and not chat_message.required:
+            raise HTTPException(status_code=404, detail="DegreeWorks audit not found or expired, send it with the request or upload it again")
+        audit = expand_audit({"completed_courses": chat_message.completed_courses, "requirements": chat_message.required},
+                             get_catalog())
+        try:
+            audit_profiles.save(chat_message.audit_id, audit)
+        except SessionTooLarge:
+            raise HTTPException(status_code=413, detail="DegreeWorks audit sent with the request is too large")
+    return audit.completed_courses, audit.requirements
+
 @app.post("/chat")
-async def chat_endpoint(chat_message: ChatMessage):
+async def chat_endpoint(chat_message: ChatMessage, request: Request):
     # Get user message
     message = chat_message.message
-    completed_courses = chat_message.completed_courses
-    grad_reqs = chat_message.required
+    completed_courses, grad_reqs = resolve_audit(chat_message, request)
     # Call agent
-    agent_response = await agent(message, chat_message.conversation_id, completed_courses, grad_reqs)
+    agent_response = await agent(message, chat_message.conversation_id, completed_courses, grad_reqs,
+                                 client=request.app.state.openai_client)
     # Return response
     return {"response": agent_response}
+
+# Same as /chat but streams server-sent events (token, tool_start, tool_end, done) while the agent runs
+@app.post("/chat/stream")
+async def chat_stream_endpoint(chat_message: ChatMessage, request: Request):
+    # Resolved before streaming starts so a missing audit is a plain 404
+    completed_courses, grad_reqs = resolve_audit(chat_message, request)
+
+    async def event_stream():
+        try:
+            async for event in agent_events(chat_message.message, chat_message.conversation_id,
+                                            completed_courses, grad_reqs,
+                                            client=request.app.state.openai_client):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
    
 if __name__ == "__main__":
     import uvicorn
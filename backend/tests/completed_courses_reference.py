@@ -0,0 +1,42 @@
+import re
+
+# Previous three-regex parse_courses_completed, reference for tests/test_parse_degreeworks.py and
+# benchmarks/completed_courses_parse.py
+def parse_courses_completed_reference(text):
+    completed = []
+
+    grade_pattern = r'\b([A-D][+-]?|F|IP|T)\b'
+    term_pattern = r'(FALL|WINTER|SPRING|SS)'
+
+    lines = text.split('\n')
+    for line in lines:
+        has_grade = re.search(grade_pattern, line)
+        has_term = re.search(term_pattern, line)
+
+        if has_grade and has_term:
+            if line.strip().startswith('(T)'):
+                continue
+
+            course_pattern = r'([A-Za-z&]+)\s+([H]?\d+[A-Za-z]?)(?:,\s*(\d+[A-Za-z]?))?'
+            matches = re.findall(course_pattern, line)
+
+            for match in matches:
+                dept = match[0].upper().replace(' ', '')
+                num1 = match[1].upper().replace(' ', '')
+
+                code_with_space = f"{match[0]} {match[1]}"
+                if f"(T){code_with_space}" in line:
+                    continue
+
+                if dept.replace('&', '').isalpha() and (num1[0].isdigit() or num1[0] == 'H') and len(dept) > 1:
+                    code = dept + num1
+                    if code not in completed:
+                        completed.append(code)
+
+                if match[2]:
+                    num2 = match[2].upper().replace(' ', '')
+                    code2 = dept + num2
+                    if code2 not in completed:
+                        completed.append(code2)
+
+    return completed
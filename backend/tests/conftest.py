@@ -0,0 +1,27 @@
+# Tests run from backend/ (python -m pytest), modules import each other as top level packages
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+from tests.fake_openai import start_fake_server
+
+# Starts fake completion servers, config points the OpenAI client at the last one
+@pytest.fixture
+def fake_openai(monkeypatch):
+    servers = []
+
+    def start(**options):
+        server, base_url = start_fake_server(**options)
+        servers.append(server)
+        monkeypatch.setattr(config, "OPENAI_API_KEY", "fake")
+        monkeypatch.setattr(config, "OPENAI_BASE_URL", base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,101 @@
+# Local stand-in for the anteaterapi courses + grades endpoints, used by tests/test_fetch_courses.py and benchmarks/fetch_catalog.py
+# Serves synthetic departments, optionally failing some grade requests with 503 (or 404 for missing_numbers)
+# and department requests with 404 (missing_departments)
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class FakeAnteaterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"     # keep-alive so pooled clients can reuse connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        time.sleep(state["latency"])
+
+        with state["lock"]:
+            state["requests"][url.path] = state["requests"].get(url.path, 0) + 1
+            state["connections"].add(self.client_address)
+
+        if url.path.endswith("/courses"):
+            department = params["department"]
+            if department in state["missing_departments"]:
+                self.send_json(404, {"error": "not found"})
+                return
+            body = {"data": [
+                fake_course(department, n, revised=n in state["revised_numbers"])
+                for n in range(1, state["courses_per_department"] + 1)
+            ]}
+        elif url.path.endswith("/grades/aggregateByCourse"):
+            number = int(params["courseNumber"])
+            with state["lock"]:
+                key = (params["department"], number)
+                state["attempts"][key] = state["attempts"].get(key, 0) + 1
+                attempts = state["attempts"][key]
+            # Transient failures - first failures_per_course attempts fail
+            # Hard failures - course numbers in fail_numbers fail until removed
+            if attempts <= state["failures_per_course"] or number in state["fail_numbers"]:
+                self.send_json(503, {"error": "unavailable"})
+                return
+            # Non-retryable failures - course numbers in missing_numbers get a 404
+            if number in state["missing_numbers"]:
+                self.send_json(404, {"error": "not found"})
+                return
+            body = {"data": [{"averageGPA": 2.5 + (number % 15) / 10}]}
+        else:
+            self.send_json(404, {"error": "not found"})
+            return
+
+        self.send_json(200, body)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+# revised courses get a different title, as if the course changed since the last fetch
+def fake_course(department, number, revised=False):
+    code = department.replace(" ", "") + str(number)
+    return {
+        "id": code,
+        "courseNumber": str(number),
+        "courseNumeric": number,
+        "title": f"{department} course {number}" + (" (revised)" if revised else ""),
+        "prerequisites": [],
+        "prerequisiteTree": {},
+        "minUnits": 4,
+        "description": f"Synthetic course {code}",
+        "terms": ["2025 Fall", "2026 Winter"],
+    }
+
+# Start server on a free port in a background thread, returns (server, base_url)
+# server.state can be changed while running (fail_numbers, missing_numbers, missing_departments, revised_numbers, ...)
+def start_fake_anteater(courses_per_department=50, latency=0.0, failures_per_course=0, fail_numbers=(),
+                        missing_numbers=(), missing_departments=()):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAnteaterHandler)
+    server.daemon_threads = True
+    server.state = {
+        "lock": threading.Lock(),
+        "latency": latency,
+        "courses_per_department": courses_per_department,
+        "failures_per_course": failures_per_course,
+        "fail_numbers": set(fail_numbers),
+        "missing_numbers": set(missing_numbers),
+        "missing_departments": set(missing_departments),
+        "revised_numbers": set(),
+        "attempts": {},
+        "requests": {},
+        "connections": set(),
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v2/rest/"
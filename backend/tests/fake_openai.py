@@ -0,0 +1,157 @@
+# Local stand-in for the OpenAI chat completions endpoint, used by benchmarks and tests
+# Answers with a short assistant message, streamed when the request asks for it. With tool_calls set,
+# tool_calls(body) is asked after each user message for a list of (tool name, arguments dict) to call
+# instead, the answer after the tool results is a plain message again
+# Emulates provider prompt prefix caching - the longest prefix of (tools, messages...) seen in an earlier
+# request counts as cached_tokens once it is at least MIN_CACHED_TOKENS, and only uncached tokens add
+# prefill_latency
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MIN_CACHED_TOKENS = 1024
+
+class FakeCompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"     # keep-alive so pooled clients can reuse connections
+    disable_nagle_algorithm = True
+    latency = 0.0
+    prefill_latency = 0.0     # seconds per 1000 uncached prompt tokens
+    prefixes = None           # hashes of prompt prefixes seen so far, shared by all requests to this server
+    tool_calls = None         # tool_calls(body) -> [(name, arguments), ...] or None
+    connections = None        # client addresses that sent requests, one per connection
+    requests = None           # request bodies in the order they arrived
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.lock:
+            self.connections.add(self.client_address)
+            self.requests.append(body)
+
+        calls = None
+        messages = body.get("messages") or [{}]
+        if self.tool_calls and messages[-1].get("role") == "user":
+            calls = [
+                {"id": f"call_{i}", "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+                for i, (name, arguments) in enumerate(self.tool_calls(body) or [])
+            ]
+
+        prompt_tokens, cached_tokens = self.prompt_usage(body)
+        time.sleep(self.latency + (prompt_tokens - cached_tokens) / 1000 * self.prefill_latency)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": 1,
+            "total_tokens": prompt_tokens + 1,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}
+        }
+
+        if body.get("stream"):
+            self.send_stream(body, usage, calls)
+            return
+
+        message = {"role": "assistant", "content": "ok"}
+        if calls:
+            message = {"role": "assistant", "content": None, "tool_calls": calls}
+
+        response = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if calls else "stop"
+            }],
+            "usage": usage
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    # (prompt tokens, cached prefix tokens) at ~4 chars per token
+    def prompt_usage(self, body):
+        parts = [json.dumps(body.get("tools"), sort_keys=True)]
+        parts += [json.dumps(m, sort_keys=True) for m in body.get("messages", [])]
+
+        digest = hashlib.sha256()
+        chars = 0
+        cached_chars = 0
+        for part in parts:
+            digest.update(part.encode())
+            chars += len(part)
+            key = digest.hexdigest()
+            with self.lock:
+                if key in self.prefixes:
+                    cached_chars = chars
+                self.prefixes.add(key)
+
+        prompt_tokens = chars // 4
+        cached_tokens = cached_chars // 4
+        return prompt_tokens, cached_tokens if cached_tokens >= MIN_CACHED_TOKENS else 0
+
+    # Answer as server-sent chat.completion.chunk events, one word per chunk, or one chunk per tool call
+    # Usage is sent in a last chunk with no choices when stream_options.include_usage is set
+    def send_stream(self, body, usage, calls=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        if calls:
+            deltas = [{"tool_calls": [{"index": i, **call}]} for i, call in enumerate(calls)]
+            finish_reason = "tool_calls"
+        else:
+            deltas = [{"content": word} for word in ["ok", " from", " fake", " server"]]
+            finish_reason = "stop"
+        for delta in deltas + [None]:
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "delta": delta or {},
+                    "finish_reason": None if delta else finish_reason
+                }]
+            }
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [],
+                "usage": usage
+            }
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+# Start server on a free port in a background thread, returns (server, base_url)
+def start_fake_server(latency=0.0, prefill_latency=0.0, tool_calls=None):
+    handler = type("Handler", (FakeCompletionHandler,), {
+        "latency": latency,
+        "prefill_latency": prefill_latency,
+        "tool_calls": staticmethod(tool_calls) if tool_calls else None,
+        "prefixes": set(),
+        "connections": set(),
+        "requests": [],
+        "lock": threading.Lock()
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
@@ -0,0 +1,41 @@
+from utils.audit_cache import AuditCache
+from utils.course_catalog import get_catalog
+from utils.parse_degreeworks import DegreeWorksAudit
+
+# As returned by the parse pool - course dicts are copies, not the catalog's objects
+def parsed_audit():
+    catalog = get_catalog()
+    return DegreeWorksAudit(["I&CSCI31"], {
+        "req_upper": {"num_needed": 2, "courses": [dict(c) for c in catalog.courses_in_range("COMPSCI", 160, 165)]}
+    })
+
+def assert_catalog_objects(audit, catalog):
+    courses = audit.requirements["req_upper"]["courses"]
+    assert courses and all(c is catalog.get_course(c["code"]) for c in courses)
+
+def test_memory_entries_hold_codes_and_expand_on_hit():
+    catalog = get_catalog()
+    cache = AuditCache(max_entries=2)
+    key = cache.key(b"pdf", catalog.version)
+    audit = parsed_audit()
+
+    cache.put(key, audit, catalog)
+
+    assert all(isinstance(c, str) for c in cache.entries[key]["requirements"]["req_upper"]["courses"])
+    cached = cache.get(key, catalog)
+    assert cached.completed_courses == audit.completed_courses
+    assert cached.requirements == audit.requirements
+    assert_catalog_objects(cached, catalog)
+
+def test_disk_entries_are_shared_by_new_caches(tmp_path):
+    catalog = get_catalog()
+    key = AuditCache.key(b"pdf", catalog.version)
+    AuditCache(directory=tmp_path).put(key, parsed_audit(), catalog)
+
+    other = AuditCache(directory=tmp_path)
+    cached = other.get(key, catalog)
+
+    assert_catalog_objects(cached, catalog)
+    assert other.metrics()["disk_hits"] == 1
+    assert other.get(key, catalog).requirements == cached.requirements
+    assert other.metrics()["hits"] == 1
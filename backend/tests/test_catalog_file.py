@@ -0,0 +1,78 @@
+import builtins
+import json
+import os
+
+import pytest
+
+from utils.catalog_file import build_catalog_file, compiled_path
+from utils.course_catalog import CourseCatalog, catalog_version
+
+def course(code, number, prerequisites=()):
+    return {"code": code, "course_number": number, "name": code, "prerequisites": list(prerequisites),
+            "credits": 4, "description": "", "offered_quarters": [], "prereq_tree": None, "difficulty": None}
+
+CATALOG = {"courses": {"COMPSCI": [course("COMPSCI161", 161), course("COMPSCI171", 171, ["COMPSCI161"])]}}
+
+def write_catalog(path, data):
+    raw = json.dumps(data).encode()
+    path.write_bytes(raw)
+    build_catalog_file(data, compiled_path(path), catalog_version(raw), os.stat(path))
+    return raw
+
+# Fail the test if courses.json itself is opened
+@pytest.fixture
+def no_json_read(monkeypatch):
+    real_open = builtins.open
+
+    def guarded_open(file, *args, **kwargs):
+        assert not str(file).endswith(".json"), f"{file} was read"
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", guarded_open)
+
+def test_fresh_compiled_catalog_loads_without_reading_json(tmp_path, no_json_read):
+    path = tmp_path / "courses.json"
+    raw = write_catalog(path, CATALOG)
+    catalog = CourseCatalog.load(path)
+
+    assert type(catalog.by_code).__name__ == "LazyCourses"
+    assert catalog.version == catalog_version(raw)
+    assert catalog.get_course("COMPSCI171")["prerequisites"] == ["COMPSCI161"]
+
+def test_changed_json_falls_back_to_json_loader(tmp_path):
+    path = tmp_path / "courses.json"
+    write_catalog(path, CATALOG)
+    changed = {"courses": {"COMPSCI": [course("COMPSCI161", 161)]}}
+    raw = json.dumps(changed).encode()
+    path.write_bytes(raw)
+
+    catalog = CourseCatalog.load(path)
+
+    assert type(catalog.by_code).__name__ != "LazyCourses"
+    assert catalog.version == catalog_version(raw)
+    assert catalog.get_course("COMPSCI171") is None
+
+def test_touched_json_with_same_contents_still_uses_compiled_catalog(tmp_path):
+    path = tmp_path / "courses.json"
+    raw = write_catalog(path, CATALOG)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    catalog = CourseCatalog.load(path)
+
+    assert type(catalog.by_code).__name__ == "LazyCourses"
+    assert catalog.version == catalog_version(raw)
+
+def test_decoded_courses_are_bounded(tmp_path):
+    path = tmp_path / "courses.json"
+    data = {"courses": {"COMPSCI": [course(f"COMPSCI{n}", n) for n in range(1, 11)]}}
+    write_catalog(path, data)
+    catalog = CourseCatalog.load(path)
+    catalog.by_code.max_decoded = 3
+
+    for code in catalog.by_code:
+        assert catalog.get_course(code) == data["courses"]["COMPSCI"][int(code[7:]) - 1]
+
+    assert list(catalog.by_code.decoded) == ["COMPSCI8", "COMPSCI9", "COMPSCI10"]
+    # Still decoded - same object until evicted
+    assert catalog.get_course("COMPSCI9") is catalog.get_course("COMPSCI9")
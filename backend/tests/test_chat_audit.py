@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from main import ChatMessage, resolve_audit
+from utils.audit_profiles import compact_requirements, create_audit_profile_store, new_audit_id
+from utils.course_catalog import get_catalog
+from utils.parse_degreeworks import DegreeWorksAudit
+
+# Request as seen by one worker with its own in memory audit store
+def worker():
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(audit_profiles=create_audit_profile_store())))
+
+def make_audit():
+    catalog = get_catalog()
+    return DegreeWorksAudit(["I&CSCI31", "I&CSCI32"], {
+        "req_upper": {"num_needed": 2, "courses": catalog.courses_in_range("COMPSCI", 160, 165)}
+    })
+
+def test_audit_id_resolves_on_upload_worker():
+    upload_worker = worker()
+    audit = make_audit()
+    audit_id = new_audit_id()
+    upload_worker.app.state.audit_profiles.save(audit_id, audit)
+
+    completed, grad_reqs = resolve_audit(ChatMessage(message="hi", audit_id=audit_id), upload_worker)
+
+    assert completed == audit.completed_courses
+    assert grad_reqs == audit.requirements
+
+def test_other_worker_restores_audit_sent_with_request():
+    audit = make_audit()
+    audit_id = new_audit_id()
+    other_worker = worker()
+
+    with pytest.raises(HTTPException) as missing:
+        resolve_audit(ChatMessage(message="hi", audit_id=audit_id), other_worker)
+    assert missing.value.status_code == 404
+
+    # Frontend retry - same audit_id plus the upload response's completed courses and compact requirements
+    retry = ChatMessage(message="hi", audit_id=audit_id, completed_courses=audit.completed_courses,
+                        required=compact_requirements(audit.requirements, get_catalog()))
+    completed, grad_reqs = resolve_audit(retry, other_worker)
+    assert completed == audit.completed_courses
+    assert grad_reqs == audit.requirements
+
+    # Stored on this worker, later messages only need the id
+    completed, _ = resolve_audit(ChatMessage(message="hi", audit_id=audit_id), other_worker)
+    assert completed == audit.completed_courses
+
+# Audits come back from the parse pool with their own copies of the course dicts, only codes are kept
+def test_stored_audit_references_catalog_courses():
+    catalog = get_catalog()
+    audit = make_audit()
+    copied = DegreeWorksAudit(audit.completed_courses, {
+        req_id: {**req, "courses": [dict(c) for c in req["courses"]]} for req_id, req in audit.requirements.items()
+    })
+    store = create_audit_profile_store()
+    store.save("a", copied)
+
+    _, stored = store.sessions["a"]
+    assert all(isinstance(c, str) for req in stored["requirements"].values() for c in req["courses"])
+    restored = store.get("a")
+    assert restored.requirements == audit.requirements
+    assert all(c is catalog.get_course(c["code"]) for req in restored.requirements.values() for c in req["courses"])
+
+def test_oversized_audit_payload_is_rejected():
+    catalog = get_catalog()
+    other_worker = worker()
+    required = {f"req_{i}": {"num_needed": 1, "courses": list(catalog.by_code)} for i in range(200)}
+
+    with pytest.raises(HTTPException) as too_large:
+        resolve_audit(ChatMessage(message="hi", audit_id=new_audit_id(), completed_courses=["I&CSCI31"],
+                                  required=required), other_worker)
+    assert too_large.value.status_code == 413
+    assert len(other_worker.app.state.audit_profiles) == 0
@@ -0,0 +1,58 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+
+# [(event name, data)] from an event stream body, checking the framing on the way
+def parse_events(body):
+    assert body.endswith("\n\n")
+    events = []
+    for block in body[:-2].split("\n\n"):
+        lines = block.split("\n")
+        assert len(lines) == 2 and lines[0].startswith("event: ") and lines[1].startswith("data: "), block
+        name, data = lines[0][len("event: "):], json.loads(lines[1][len("data: "):])
+        assert data["type"] == name
+        events.append((name, data))
+    return events
+
+# Runs the app lifespan, so the OpenAI client is built from config like in production
+def stream(message="hi"):
+    with TestClient(main.app) as client:
+        response = client.post("/chat/stream", json={"message": message, "conversation_id": f"stream-{message}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return parse_events(response.text)
+
+def test_stream_sends_tokens_then_done(fake_openai):
+    fake_openai()
+
+    events = stream()
+
+    names = [name for name, _ in events]
+    assert names[-1] == "done" and names.count("done") == 1
+    assert set(names[:-1]) == {"token"}
+    assert "".join(data["content"] for name, data in events if name == "token") == "ok from fake server"
+    assert events[-1][1]["response"] == "ok from fake server"
+
+def test_stream_sends_tool_events_before_done(fake_openai):
+    fake_openai(tool_calls=lambda body: [("course_info", {"course_number": "161", "department": "COMPSCI"})])
+
+    names = [name for name, _ in stream("what is 161?")]
+
+    assert names.index("tool_start") < names.index("tool_end") < names.index("done")
+    assert names[-1] == "done"
+
+def test_agent_exception_becomes_error_event(fake_openai, monkeypatch):
+    fake_openai()
+
+    async def failing_events(*args, **kwargs):
+        yield {"type": "token", "content": "partial"}
+        raise RuntimeError("completion failed")
+
+    monkeypatch.setattr(main, "agent_events", failing_events)
+
+    events = stream()
+
+    assert events == [("token", {"type": "token", "content": "partial"}),
+                      ("error", {"type": "error", "error": "completion failed"})]
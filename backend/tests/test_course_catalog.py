@@ -0,0 +1,38 @@
+import threading
+import time
+
+from utils import course_catalog
+from utils.course_catalog import get_catalog
+
+def test_reload_runs_off_the_calling_thread(monkeypatch):
+    current = get_catalog()
+    reloaded = object()
+    started = threading.Event()
+    finish = threading.Event()
+    calls = []
+
+    # Stands in for reading + indexing a large changed courses.json
+    def slow_reload():
+        calls.append(1)
+        started.set()
+        finish.wait(5)
+        course_catalog._catalog = reloaded
+        return True
+
+    monkeypatch.setattr(course_catalog, "reload_if_changed", slow_reload)
+    monkeypatch.setattr(course_catalog, "_last_check", 0.0)
+    monkeypatch.setattr(course_catalog, "_catalog", current)
+
+    start = time.perf_counter()
+    assert get_catalog() is current
+    assert time.perf_counter() - start < 0.1
+    assert started.wait(5)
+    # Reload in progress - callers keep getting the old catalog, no second reload starts
+    monkeypatch.setattr(course_catalog, "_last_check", 0.0)
+    assert get_catalog() is current
+
+    finish.set()
+    with course_catalog._reload_lock:
+        pass
+    assert get_catalog() is reloaded
+    assert len(calls) == 1
@@ -0,0 +1,67 @@
+import random
+from itertools import combinations
+
+from functions.course_planner import min_course_cover, plan_requirement_cover
+
+def cover_inputs(needs, courses):
+    group_courses = {group: [] for group in needs}
+    for code, groups in courses.items():
+        for group in groups:
+            group_courses[group].append(code)
+    return group_courses, {code: list(groups) for code, groups in courses.items()}
+
+def covers(selected, needs, course_groups):
+    left = dict(needs)
+    for code in selected:
+        for group in course_groups[code]:
+            left[group] -= 1
+    return all(n <= 0 for n in left.values())
+
+def brute_force_size(needs, course_groups):
+    for size in range(len(course_groups) + 1):
+        for selected in combinations(course_groups, size):
+            if covers(selected, needs, course_groups):
+                return size
+    return None
+
+# Greedy takes C (4 groups) first and needs 4 courses, the optimum skips C
+def test_cover_beats_greedy_when_best_course_is_outside_branch_group():
+    needs = {"g7": 1, "g1": 1, "g2": 1, "g3": 1, "g4": 1, "g5": 1, "g6": 1}
+    courses = {"z": ["g7"], "A": ["g1", "g2", "g3"], "B": ["g4", "g5", "g6"], "C": ["g1", "g2", "g4", "g5"]}
+    group_courses, course_groups = cover_inputs(needs, courses)
+
+    cover = min_course_cover(needs, group_courses, course_groups, {}, lambda selected: True, time_budget=5)
+
+    assert sorted(cover) == ["A", "B", "z"]
+
+def test_cover_is_minimum_on_random_instances():
+    rng = random.Random(7)
+    for _ in range(200):
+        groups = [f"g{i}" for i in range(rng.randint(1, 5))]
+        courses = {f"c{i}": rng.sample(groups, rng.randint(1, len(groups))) for i in range(rng.randint(1, 8))}
+        group_courses, course_groups = cover_inputs({g: 0 for g in groups}, courses)
+        needs = {g: rng.randint(0, len(group_courses[g])) for g in groups}
+
+        cover = min_course_cover(needs, group_courses, course_groups, {}, lambda selected: True, time_budget=5)
+
+        assert covers(cover, needs, course_groups)
+        assert len(cover) == brute_force_size(needs, course_groups)
+
+def test_plan_respects_prereq_order():
+    prereqs = {"B": {"A"}, "C": {"B"}}
+
+    def eligible(codes, taken):
+        return [code for code in codes if prereqs.get(code, set()) <= set(taken)]
+
+    def unlocks(code):
+        return {c for c, required in prereqs.items() if code in required}
+
+    plan = plan_requirement_cover(
+        {"req": (3, ["A", "B", "C"])}, {"A", "B", "C"}, set(), ["Fall", "Winter", "Spring"], 3, eligible, unlocks
+    )
+    assert plan == [["A"], ["B"], ["C"]]
+
+    # Not enough quarters for the chain
+    assert plan_requirement_cover(
+        {"req": (3, ["A", "B", "C"])}, {"A", "B", "C"}, set(), ["Fall", "Winter"], 3, eligible, unlocks
+    ) is None
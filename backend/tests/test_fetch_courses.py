@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+from tests.fake_anteater import start_fake_anteater
+from utils import fetch_courses
+from utils.catalog_file import compiled_path
+from utils.course_catalog import CourseCatalog, catalog_version
+from utils.fetch_courses import AnteaterClient, FetchError, fetch_catalog, load_checkpoint, load_previous, save_catalog
+
+COURSES_PER_DEPARTMENT = 5
+
+@pytest.fixture
+def anteater():
+    server, url = start_fake_anteater(COURSES_PER_DEPARTMENT)
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+def fetch(url, tmp_path, name="checkpoint.jsonl", **kwargs):
+    return asyncio.run(fetch_catalog(url=url, checkpoint_path=tmp_path / name, rate=0, backoff_base=0.01, **kwargs))
+
+def grade_requests(server):
+    return server.state["requests"].get("/v2/rest/grades/aggregateByCourse", 0)
+
+def test_save_catalog_rebuilds_compiled_catalog(anteater, tmp_path):
+    _, url = anteater
+    courses_dict, meta = fetch(url, tmp_path)
+    path = tmp_path / "courses.json"
+
+    assert save_catalog(courses_dict, meta, path=path, meta_path=tmp_path / "meta.json",
+                        checkpoint_path=tmp_path / "checkpoint.jsonl")
+
+    catalog = CourseCatalog.load(path)
+    assert os.path.exists(compiled_path(path))
+    assert type(catalog.by_code).__name__ == "LazyCourses"
+    assert catalog.version == catalog_version(path.read_bytes())
+    assert catalog.get_course("COMPSCI1") == courses_dict["courses"]["COMPSCI"][0]
+
+def test_failed_grade_lookup_is_fetched_again_on_next_run(anteater, tmp_path):
+    server, url = anteater
+    server.state["missing_numbers"].add(1)
+    courses_dict, meta = fetch(url, tmp_path)
+    assert courses_dict["courses"]["COMPSCI"][0]["difficulty"] is None
+    # Not in the checkpoint either, a resumed run would look it up again
+    with open(tmp_path / "checkpoint.jsonl") as f:
+        assert "COMPSCI1" not in {json.loads(line)["course"]["code"] for line in f}
+
+    server.state["missing_numbers"].clear()
+    before = grade_requests(server)
+    refreshed, _ = fetch(url, tmp_path, name="second.jsonl", previous=(courses_dict, meta))
+
+    # Only the 3 failed lookups (course 1 in each department) are repeated
+    assert grade_requests(server) - before == 3
+    assert refreshed["courses"]["COMPSCI"][0]["difficulty"] is not None
+    assert refreshed["courses"]["COMPSCI"][1:] == courses_dict["courses"]["COMPSCI"][1:]
+
+# AnteaterClient against an httpx mock transport, responses are returned (or raised) in order
+def client_with(responses, monkeypatch, max_retries=3):
+    sleeps = []
+
+    async def record_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(fetch_courses.asyncio, "sleep", record_sleep)
+    responses = iter(responses)
+
+    def handler(request):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client = httpx.AsyncClient(base_url="http://anteater/", transport=httpx.MockTransport(handler))
+    return AnteaterClient(client, rate=0, max_retries=max_retries, backoff_base=0.01), sleeps
+
+def test_get_json_retries_server_and_transport_errors(monkeypatch):
+    anteater, sleeps = client_with([
+        httpx.Response(503), httpx.ConnectError("refused"), httpx.Response(200, json={"data": [1]})
+    ], monkeypatch)
+
+    assert asyncio.run(anteater.get_json("courses")) == {"data": [1]}
+    assert len(sleeps) == 2
+
+def test_get_json_waits_for_retry_after(monkeypatch):
+    anteater, sleeps = client_with([
+        httpx.Response(429, headers={"Retry-After": "3"}), httpx.Response(200, json={})
+    ], monkeypatch)
+
+    asyncio.run(anteater.get_json("courses"))
+
+    assert sleeps == [3]
+
+def test_get_json_does_not_retry_client_errors(monkeypatch):
+    anteater, sleeps = client_with([httpx.Response(404)], monkeypatch)
+
+    assert asyncio.run(anteater.get_json("courses")) is None
+    assert sleeps == []
+
+def test_get_json_raises_when_retries_run_out(monkeypatch):
+    anteater, sleeps = client_with([httpx.Response(503)] * 3, monkeypatch, max_retries=2)
+
+    with pytest.raises(FetchError, match="failed after 3 attempts"):
+        asyncio.run(anteater.get_json("courses"))
+    assert len(sleeps) == 2
+
+def test_transient_failures_are_retried_in_full_fetch(anteater, tmp_path):
+    server, url = anteater
+    server.state["failures_per_course"] = 2
+
+    courses_dict, _ = fetch(url, tmp_path)
+
+    assert all(course["difficulty"] is not None for courses in courses_dict["courses"].values() for course in courses)
+    assert set(server.state["attempts"].values()) == {3}
+
+def test_failed_run_resumes_from_checkpoint(anteater, tmp_path):
+    server, url = anteater
+    server.state["fail_numbers"].update({1, 2})
+    with pytest.raises(FetchError):
+        fetch(url, tmp_path, max_retries=1)
+    assert len(load_checkpoint(tmp_path / "checkpoint.jsonl")) == 3 * (COURSES_PER_DEPARTMENT - 2)
+
+    server.state["fail_numbers"].clear()
+    before = grade_requests(server)
+    courses_dict, _ = fetch(url, tmp_path)
+
+    assert grade_requests(server) - before == 3 * 2
+    assert [c["code"] for c in courses_dict["courses"]["COMPSCI"]] == [f"COMPSCI{n}" for n in range(1, 6)]
+
+def test_interrupted_save_leaves_previous_catalog(anteater, tmp_path, monkeypatch):
+    _, url = anteater
+    courses_dict, meta = fetch(url, tmp_path)
+    path = tmp_path / "courses.json"
+    path.write_text('{"courses": {}}')
+
+    def crash(src, dst):
+        raise OSError("killed")
+
+    monkeypatch.setattr(fetch_courses.os, "replace", crash)
+    with pytest.raises(OSError):
+        save_catalog(courses_dict, meta, path=path, meta_path=tmp_path / "meta.json",
+                     checkpoint_path=tmp_path / "checkpoint.jsonl")
+
+    assert json.loads(path.read_text()) == {"courses": {}}
+    # Checkpoint is only removed once the catalog is saved
+    assert os.path.exists(tmp_path / "checkpoint.jsonl")
+
+def test_save_replaces_catalog_and_removes_checkpoint(anteater, tmp_path):
+    _, url = anteater
+    courses_dict, meta = fetch(url, tmp_path)
+    path = tmp_path / "courses.json"
+
+    def save():
+        previous_catalog, _ = load_previous(path, tmp_path / "meta.json")
+        return save_catalog(courses_dict, meta, path=path, meta_path=tmp_path / "meta.json",
+                            checkpoint_path=tmp_path / "checkpoint.jsonl", previous_catalog=previous_catalog)
+
+    assert save()
+    assert json.loads(path.read_text()) == courses_dict
+    assert not os.path.exists(tmp_path / "checkpoint.jsonl")
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+    # Unchanged catalog is not rewritten, a running server has nothing to reload
+    mtime = os.stat(path).st_mtime_ns
+    assert not save()
+    assert os.stat(path).st_mtime_ns == mtime
+
+def test_missing_department_fails_run_and_keeps_previous_catalog(anteater, tmp_path):
+    server, url = anteater
+    courses_dict, meta = fetch(url, tmp_path)
+    path = tmp_path / "courses.json"
+    save_catalog(courses_dict, meta, path=path, meta_path=tmp_path / "meta.json",
+                 checkpoint_path=tmp_path / "checkpoint.jsonl")
+
+    server.state["missing_departments"].add("IN4MATX")
+    with pytest.raises(FetchError, match="IN4MATX"):
+        fetch(url, tmp_path, name="second.jsonl", previous=load_previous(path, tmp_path / "meta.json"))
+
+    previous_catalog, previous_meta = load_previous(path, tmp_path / "meta.json")
+    assert previous_catalog == courses_dict and previous_meta == meta
@@ -0,0 +1,64 @@
+import asyncio
+import uuid
+
+import agent
+
+# Runs agent turns on one shared client, returns the responses
+def run_turns(messages, completed_courses=(), grad_reqs=None, events=None):
+    async def turns():
+        client = agent.create_openai_client()
+        try:
+            responses = []
+            for message in messages:
+                conversation_id = uuid.uuid4().hex
+                async for event in agent.agent_events(message, conversation_id, list(completed_courses),
+                                                      grad_reqs or {}, client=client):
+                    if events is not None:
+                        events.append(event)
+                    if event["type"] == "done":
+                        responses.append(event["response"])
+            return responses
+        finally:
+            await client.close()
+    return asyncio.run(turns())
+
+def test_shared_client_reuses_connection(fake_openai):
+    server = fake_openai()
+
+    responses = run_turns(["hi"] * 5)
+
+    assert responses == ["ok from fake server"] * 5
+    assert len(server.RequestHandlerClass.connections) == 1
+
+def test_usage_is_recorded_from_stream(fake_openai, monkeypatch):
+    fake_openai()
+    monkeypatch.setattr(agent, "usage_stats", {k: 0 for k in agent.usage_stats})
+
+    run_turns(["hi", "hello"])
+
+    metrics = agent.usage_metrics()
+    assert metrics["completions"] == 2
+    assert metrics["prompt_tokens"] > 0 and metrics["completion_tokens"] == 2
+
+def test_streamed_tool_calls_run_and_results_go_back_in_call_order(fake_openai):
+    server = fake_openai(tool_calls=lambda body: [
+        ("course_info", {"course_number": "161", "department": "COMPSCI"}),
+        ("course_info", {"course_number": "171", "department": "COMPSCI"}),
+    ])
+    events = []
+
+    responses = run_turns(["what are 161 and 171?"], events=events)
+
+    assert responses == ["ok from fake server"]
+    assert [e["tool"] for e in events if e["type"] == "tool_end"] == ["course_info", "course_info"]
+    assert "".join(e["content"] for e in events if e["type"] == "token") == "ok from fake server"
+
+    # Second completion gets the assistant tool calls + one result per call, in call order
+    requests = server.RequestHandlerClass.requests
+    assert len(requests) == 2
+    messages = requests[1]["messages"]
+    assert [m["function"]["name"] for m in messages[-3]["tool_calls"]] == ["course_info", "course_info"]
+    results = messages[-2:]
+    assert [m["role"] for m in results] == ["tool", "tool"]
+    assert [m["tool_call_id"] for m in results] == ["call_0", "call_1"]
+    assert "161" in results[0]["content"] and "171" in results[1]["content"]
@@ -0,0 +1,37 @@
+import random
+
+from tests.completed_courses_reference import parse_courses_completed_reference
+from utils.parse_degreeworks import parse_courses_completed
+
+DEPARTMENTS = ["COMPSCI", "I&C SCI", "I&CSCI", "IN4MATX", "MATH", "STATS", "WRITING", "&", "a", "ss", "Cs"]
+TOKENS = ["A", "A-", "B+", "C", "D-", "F", "IP", "T", "P", "NP", "FALL", "WINTER", "SPRING", "SS", "CLASS",
+          "(T)", "2024", "4.0", "Credits", "In-progress", ",", "or", "Fall", "H2", "Satisfied"]
+
+# Random transcript-like line mixing course codes, grades, terms and noise
+def random_line(rng):
+    parts = []
+    for _ in range(rng.randint(0, 8)):
+        kind = rng.random()
+        if kind < 0.4:
+            number = f"{rng.choice(['', 'H'])}{rng.randint(1, 199)}{rng.choice(['', 'A', 'B', 'c', 'W'])}"
+            course = f"{rng.choice(DEPARTMENTS)} {number}"
+            if rng.random() < 0.2:
+                course += f", {rng.randint(1, 199)}{rng.choice(['', 'A'])}"
+            if rng.random() < 0.15:
+                course = "(T)" + course
+            parts.append(course)
+        else:
+            parts.append(rng.choice(TOKENS))
+    line = " ".join(parts)
+    return (" " + line) if rng.random() < 0.1 else line
+
+def random_text(rng, num_lines):
+    return "\n".join(random_line(rng) for _ in range(num_lines))
+
+# Same output as the previous three-regex version on random transcripts
+def test_matches_previous_version_on_random_transcripts():
+    rng = random.Random(0)
+    for i in range(3000):
+        text = random_text(rng, rng.randint(1, 40))
+        expected = parse_courses_completed_reference(text)
+        assert parse_courses_completed(text) == expected, f"case {i} differs\n{text}"
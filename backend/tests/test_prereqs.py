@@ -0,0 +1,49 @@
+import random
+
+from functions.course_functions import check_prereq_tree
+from utils.course_catalog import get_catalog
+from utils.prereqs import CourseIndex, compile_prereq_tree, eval_prereq, normalize_course_id
+
+COURSE_IDS = ["COMPSCI 161", "COMPSCI 171", "I&C SCI 33", "I&C SCI 46", "MATH 2A", "MATH 2B", "STATS 67", "IN4MATX 43"]
+
+# Random prereq tree in the anteaterapi shape - courses, exams, empty AND/OR lists, empty nodes, nesting
+def random_tree(rng, depth=0):
+    kind = rng.random()
+    if depth >= 4 or kind < 0.35:
+        return {"prereqType": "course", "coreq": False, "courseId": rng.choice(COURSE_IDS), "minGrade": "D-"}
+    if kind < 0.42:
+        return {"prereqType": "exam", "examName": "AP CALCULUS AB", "minGrade": "4"}
+    if kind < 0.46:
+        return rng.choice([{}, None, {"AND": []}, {"OR": []}])
+    op = rng.choice(["AND", "OR"])
+    return {op: [random_tree(rng, depth + 1) for _ in range(rng.randint(1, 4))]}
+
+def random_completed(rng):
+    return {normalize_course_id(c) for c in COURSE_IDS if rng.random() < 0.5}
+
+# Compiled bitmask evaluator agrees with check_prereq_tree, the reference it replaced in eligibility checks
+def test_compiled_tree_matches_check_prereq_tree_on_random_trees():
+    rng = random.Random(0)
+    course_index = CourseIndex()
+    for i in range(20000):
+        tree = random_tree(rng)
+        node = compile_prereq_tree(tree, course_index)
+        for _ in range(3):
+            completed = random_completed(rng)
+            expected = check_prereq_tree(tree, completed)
+            assert eval_prereq(node, course_index.mask(completed)) == expected, f"tree {i} differs\n{tree}\n{completed}"
+
+def test_compiled_tree_matches_check_prereq_tree_on_catalog():
+    rng = random.Random(1)
+    catalog = get_catalog()
+    codes = list(catalog.by_code)
+    course_index = CourseIndex()
+    for code in codes:
+        course = catalog.get_course(code)
+        tree = course.get("prereq_tree")
+        node = compile_prereq_tree(tree, course_index)
+        for _ in range(5):
+            # Some of the course's own prerequisites so trees are both satisfied and not
+            completed = {c for c in course["prerequisites"] if rng.random() < 0.7}
+            completed.update(rng.sample(codes, rng.randint(0, 10)))
+            assert eval_prereq(node, course_index.mask(completed)) == check_prereq_tree(tree, completed), code
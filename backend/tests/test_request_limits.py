@@ -0,0 +1,53 @@
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+from utils.request_limits import BodySizeLimitMiddleware
+
+LIMIT = 1000
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=LIMIT, paths=["/upload"])
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile):
+        received.append(await file.read())
+        return {"size": len(received[-1])}
+
+    @app.post("/other")
+    async def other(file: UploadFile):
+        return {"size": len(await file.read())}
+
+    return TestClient(app), received
+
+def test_small_upload_passes():
+    client, received = make_client()
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 100)})
+    assert response.status_code == 200
+    assert received == [b"x" * 100]
+
+def test_content_length_over_limit_rejected_before_handler():
+    client, received = make_client()
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * (LIMIT + 1))})
+    assert response.status_code == 413
+    assert received == []
+
+# No Content-Length - the body is counted as it arrives
+def test_chunked_body_over_limit_rejected():
+    client, received = make_client()
+
+    def body():
+        yield b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.pdf\"\r\n\r\n"
+        for _ in range(10):
+            yield b"x" * 200
+        yield b"\r\n--b--\r\n"
+
+    response = client.post("/upload", content=body(), headers={"Content-Type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
+    assert received == []
+
+def test_other_paths_not_limited():
+    client, _ = make_client()
+    response = client.post("/other", files={"file": ("a.pdf", b"x" * (LIMIT * 2))})
+    assert response.status_code == 200
@@ -0,0 +1,100 @@
+import pytest
+
+import config
+from utils.conversation_store import ConversationStore, InMemoryConversationStore
+from utils.session_store import InMemorySessionStore, SessionStore, SessionTooLarge, SQLiteSessionStore, create_session_store
+
+# Store clock advanced by the test
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+def memory_store(tmp_path, clock):
+    return InMemorySessionStore(ttl=100, clock=clock)
+
+def sqlite_store(tmp_path, clock):
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"), serialize=lambda s: s, deserialize=lambda d: d, ttl=100,
+                              clock=clock)
+
+def test_stores_without_every_method_cannot_be_created():
+    class GetOnly(SessionStore):
+        def get(self, session_id):
+            return None
+
+    class NoDelete(ConversationStore):
+        def get(self, conversation_id):
+            return []
+
+        def save(self, conversation_id, messages):
+            pass
+
+    with pytest.raises(TypeError):
+        GetOnly()
+    with pytest.raises(TypeError):
+        NoDelete()
+    assert isinstance(InMemoryConversationStore(), ConversationStore)
+
+@pytest.mark.parametrize("make_store", [memory_store, sqlite_store])
+def test_reading_a_session_keeps_it_alive(make_store, tmp_path, clock):
+    store = make_store(tmp_path, clock)
+    store.save("active", {"quarter": 1})
+    store.save("abandoned", {"quarter": 1})
+
+    # Read every 60s for longer than the ttl, never saved again
+    for _ in range(5):
+        clock.now += 60
+        assert store.get("active") == {"quarter": 1}
+
+    assert store.get("abandoned") is None
+    assert "active" in store
+
+def test_sqlite_sessions_are_shared_between_connections(tmp_path, clock):
+    writer = sqlite_store(tmp_path, clock)
+    reader = sqlite_store(tmp_path, clock)
+    writer.save("a", {"quarter": 2})
+
+    assert reader.get("a") == {"quarter": 2}
+    reader.delete("a")
+    assert writer.get("a") is None
+    assert len(writer) == 0
+
+def test_backend_comes_from_config(tmp_path, monkeypatch):
+    assert isinstance(create_session_store(dict, dict), InMemorySessionStore)
+
+    monkeypatch.setattr(config, "SESSION_STORE", "sqlite")
+    monkeypatch.setattr(config, "SESSION_DB_PATH", str(tmp_path / "sessions.db"))
+    store = create_session_store(dict, dict)
+    assert isinstance(store, SQLiteSessionStore) and store.path == str(tmp_path / "sessions.db")
+
+def test_sqlite_store_keeps_most_recently_used_sessions(tmp_path, clock):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), dict, dict, ttl=100, max_sessions=3, clock=clock)
+    for name in "abcd":
+        clock.now += 1
+        store.save(name, {})
+    clock.now += 1
+    store.get("b")
+    clock.now += 1
+    store.save("e", {})
+
+    assert len(store) == 3
+    assert [name for name in "abcde" if name in store] == ["b", "d", "e"]
+
+@pytest.mark.parametrize("make_store", [
+    lambda tmp_path: InMemorySessionStore(serialize=dict, deserialize=dict, max_bytes=100),
+    lambda tmp_path: SQLiteSessionStore(str(tmp_path / "sessions.db"), dict, dict, max_bytes=100),
+])
+def test_oversized_sessions_are_rejected(make_store, tmp_path):
+    store = make_store(tmp_path)
+    store.save("small", {"courses": ["COMPSCI161"]})
+
+    with pytest.raises(SessionTooLarge):
+        store.save("large", {"courses": ["COMPSCI161"] * 50})
+    assert store.get("large") is None and store.get("small") is not None
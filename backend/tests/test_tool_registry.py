@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import agent
+from tool_defs import TOOLS
+from utils.tool_registry import Tool, ToolRegistry, ToolArgumentError
+
+def schema(name, properties=None, required=None):
+    parameters = {"type": "object", "properties": properties or {}}
+    if required:
+        parameters["required"] = required
+    return {"type": "function", "function": {"name": name, "parameters": parameters}}
+
+def test_parse_validates_and_coerces_arguments():
+    registry = ToolRegistry()
+    registry.register(Tool(schema("lookup", {"number": {"type": "string"}, "count": {"type": "integer", "default": 3}},
+                                  required=["number"]), lambda number, count: {}))
+
+    assert registry.parse("lookup", '{"number": 161}')[1] == {"number": "161", "count": 3}
+    for name, arguments in (("lookup", "{}"), ("lookup", '{"number": "161", "count": "x"}'), ("lookup", "{"), ("nope", "{}")):
+        try:
+            registry.parse(name, arguments)
+        except ToolArgumentError:
+            continue
+        raise AssertionError(f"{name} {arguments} accepted")
+
+# Blocking handlers run on a tool thread, so the timeout fires even though the handler never yields
+def test_timeout_fires_for_blocking_handler():
+    def slow():
+        time.sleep(0.5)
+        return {}
+
+    registry = ToolRegistry()
+    tool = registry.register(Tool(schema("slow"), slow, timeout=0.05))
+
+    result, elapsed = asyncio.run(registry.call(tool, {}, [], {}))
+
+    assert "timed out" in result["error"]
+    assert elapsed < 300
+    assert registry.metrics()["slow"]["timeouts"] == 1
+
+def test_session_tools_are_not_abandoned():
+    tool = Tool(schema("plan_session", {"session_id": {"type": "string"}}), lambda session_id: {}, session=True, timeout=1)
+    assert tool.timeout is None
+
+def test_handler_exception_becomes_error_result():
+    def broken():
+        raise RuntimeError("boom")
+
+    registry = ToolRegistry()
+    tool = registry.register(Tool(schema("broken"), broken))
+
+    result, _ = asyncio.run(registry.call(tool, {}, [], {}))
+
+    assert result == {"error": "broken failed: boom"}
+    assert registry.metrics()["broken"]["errors"] == 1
+
+# Handlers overlap on the tool threads instead of running one after another on the loop
+def test_blocking_handlers_run_concurrently():
+    def wait():
+        time.sleep(0.2)
+        return {}
+
+    registry = ToolRegistry(workers=4)
+    tool = registry.register(Tool(schema("wait"), wait))
+
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(*(registry.call(tool, {}, [], {}) for _ in range(4)))
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 0.6
+
+# The audit comes from the request, the model is never asked for it
+def test_audit_arguments_are_not_in_schemas_sent_to_model():
+    audit_tools = {tool.name for tool in agent.tool_registry.tools.values() if tool.uses_audit}
+    assert "rec_degreeworks_courses" in audit_tools
+    for definition in TOOLS:
+        if definition["function"]["name"] in audit_tools:
+            assert not {"completed_courses", "grad_reqs"} & set(definition["function"]["parameters"]["properties"])
+
+    tool, args = agent.tool_registry.parse("rec_degreeworks_courses", '{"completed_courses": ["COMPSCI161"]}')
+    assert args == {}
+    try:
+        Tool(schema("audit", {"grad_reqs": {"type": "object"}}), lambda completed_courses, grad_reqs: {},
+             uses_audit=True)
+    except ValueError:
+        return
+    raise AssertionError("audit arguments accepted in schema")
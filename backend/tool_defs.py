@@ -2,20 +2,10 @@ rec_courses = {
         "type": "function",
         "function": {
             "name": "rec_degreeworks_courses",
-            "description": "Recommends courses based on the classes the user has already taken and classes needed for graduation.",
+            "description": "Recommends courses based on the classes the user has already taken and classes needed for graduation. Returns a table: fields lists the column names, rows has one [code, name, description] per course. Descriptions are shortened, use course_info for full details.",
             "parameters": {
                 "type": "object",
-                "properties": {
-                    "completed_courses": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of course codes the student completed.(format: COMPSCI171 with no spaces)"
-                    },
-                    "grad_reqs": {
-                        "type": "object",
-                        "description": "Keys are unique requirement IDs. Values are objects with 'num_needed' (int) and 'courses' (list of course objects)."
-                    }
-                }
+                "properties": {}
             },
             "required": []
         }
@@ -37,9 +27,9 @@ get_course_info = {
                         "type": "string",
                         "description": "Department code in uppercase without spaces. Examples: 'COMPSCI' (for CS/CompSci), 'I&CSCI' (for ICS), 'IN4MATX' (for Informatics), 'STATS' (for Statistics)"
                     }
-                }
-            },
-            "required": []
+                },
+                "required": ["course_number", "department"]
+            }
         }
     }
 
@@ -71,10 +61,10 @@ next_quarter_plan = {
         "description": """Get all courses student can take next quarter (prerequisites met, offered next quarter).
 
         Returns:
-        - available_courses: Flat list of all valid courses with details
-        - num_available: Number of available courses
-
-        Each course includes: code, name, credits, description, difficulty, satisfies_requirement (unique requirement ID), num_needed (how many courses needed from that requirement).""",
+        - available_courses: Table of all valid courses - fields lists the column names, rows has one list per course
+          Columns: code, name, credits, difficulty, satisfies_requirement (unique requirement ID), description (shortened, use course_info for full details)
+        - num_needed: Requirement ID -> how many courses are needed from that requirement
+        - num_available: Number of available courses""",
         "parameters": {
             "type": "object",
             "properties": {
@@ -248,6 +238,51 @@ finish_graduation_plan_tool = {
     }
 }
 
+plan_full_graduation_tool = {
+    "type": "function",
+    "function": {
+        "name": "plan_full_graduation",
+        "description": """Plan every quarter from now through graduation in a single call.
+
+        Runs the same course selection as get_graduation_plan_for_quarter + add_quarter_to_plan for each quarter,
+        so no session or per-quarter calls are needed. Prefer this for full graduation planning.
+
+        Always ask user:
+        1. "When do you want to graduate?" (e.g., Spring 2027)
+        2. "How many courses do you want to take per quarter?" (typically 3-5)
+        3. "Do you have any specific interests or focus areas?" (optional, e.g., AI, web development,...)
+
+        Returns:
+        - graduation_quarter: Target graduation quarter
+        - quarters_planned: Number of quarters in the plan
+        - total_courses: Total number of courses
+        - total_units: Total units across all quarters
+        - plan: Array of quarters with their courses
+        - requirements_remaining: Boolean indicating if requirements are still unmet
+        - message: Summary of the plan
+
+        IMPORTANT: Check requirements_remaining before claiming success. If true, the plan is incomplete.""",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "graduation_quarter": {
+                    "type": "string",
+                    "description": "Target graduation quarter (e.g., 'Spring 2026', 'Fall 2026')"
+                },
+                "user_interests": {
+                    "type": "string",
+                    "description": "Optional. User's interests or focus areas as comma-separated keywords ('artificial intelligence, machine learning, data science'). If provided, courses matching these interests will be prioritized."
+                },
+                "courses_per_quarter": {
+                    "type": "integer",
+                    "description": "Number of courses to take per quarter. Typically 3-5. Defaults to 3 if not specified."
+                }
+            },
+            "required": ["graduation_quarter"]
+        }
+    }
+}
+
 TOOLS = [
     rec_courses,
     get_course_info,
@@ -256,5 +291,6 @@ TOOLS = [
     start_graduation_planning_tool,
     get_graduation_plan_for_quarter_tool,
     add_quarter_to_plan_tool,
-    finish_graduation_plan_tool
+    finish_graduation_plan_tool,
+    plan_full_graduation_tool
 ]
\ No newline at end of file
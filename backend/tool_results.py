@@ -0,0 +1,74 @@
+import json
+
+# Tool results are stored in conversation history and re-sent with every later completion,
+# so each tool's result is cut down to what the model needs before it is serialized
+# Full course details (description, prerequisites, offerings) are available through course_info
+
+DESCRIPTION_CHARS = 120
+
+# Fields kept for course objects the model may pass back to add_quarter_to_plan
+SELECTED_COURSE_FIELDS = ("code", "name", "credits", "difficulty", "satisfies_requirement", "num_needed")
+
+# Columns of the course table plan_next_quarter returns
+AVAILABLE_COURSE_FIELDS = ("code", "name", "credits", "difficulty", "satisfies_requirement", "description")
+
+# Cut text to limit at a word boundary
+def truncate(text, limit=DESCRIPTION_CHARS):
+    if not text or len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "..."
+
+# Courses as {"fields": [...], "rows": [[...], ...]} so keys aren't repeated per course
+def course_table(courses, fields):
+    rows = []
+    for course in courses:
+        row = [course.get(field) for field in fields]
+        if "description" in fields:
+            i = fields.index("description")
+            row[i] = truncate(row[i])
+        rows.append(row)
+    return {"fields": list(fields), "rows": rows}
+
+# num_needed is the same for every course of a requirement, sent once per requirement
+def project_plan_next_quarter(result):
+    courses = result["available_courses"]
+    num_needed = {}
+    for course in courses:
+        num_needed.setdefault(course["satisfies_requirement"], course["num_needed"])
+    return {
+        "available_courses": course_table(courses, AVAILABLE_COURSE_FIELDS),
+        "num_needed": num_needed,
+        "num_available": result["num_available"]
+    }
+
+# [code, name, description] per requirement course, courses in several requirements are listed once
+def project_rec_degreeworks_courses(result):
+    seen = {}
+    for code, name, description in result:
+        seen.setdefault(code, [code, name, truncate(description)])
+    return {"fields": ["code", "name", "description"], "rows": list(seen.values())}
+
+def project_selected_courses(result):
+    return {
+        **result,
+        "selected_courses": [
+            {k: c[k] for k in SELECTED_COURSE_FIELDS if k in c} for c in result["selected_courses"]
+        ]
+    }
+
+# tool name -> projection, tools not listed (and error results) are sent as is
+TOOL_RESULT_PROJECTIONS = {
+    "plan_next_quarter": project_plan_next_quarter,
+    "rec_degreeworks_courses": project_rec_degreeworks_courses,
+    "get_graduation_plan_for_quarter": project_selected_courses,
+}
+
+def project_tool_result(tool_name, result):
+    projection = TOOL_RESULT_PROJECTIONS.get(tool_name)
+    if projection is None or (isinstance(result, dict) and "error" in result):
+        return result
+    return projection(result)
+
+# Tool message content for result
+def encode_tool_result(tool_name, result):
+    return json.dumps(project_tool_result(tool_name, result), separators=(",", ":"))
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from utils.audit_profiles import compact_audit, expand_audit
+
+# Cache of parsed DegreeWorks audits keyed by upload content + catalog version
+# In memory LRU, optionally backed by a directory of json files so entries survive restarts and are shared by workers
+# Both hold the compact form (requirement courses as catalog codes), expanded against the catalog on each hit
+class AuditCache:
+
+    def __init__(self, max_entries=256, directory=None, max_disk_entries=2000):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # Same pdf parsed against a different catalog can give different requirement courses, so version is part of key
+    @staticmethod
+    def key(pdf_bytes, catalog_version):
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        return f"{digest}-{catalog_version}"
+
+    # Cached DegreeWorksAudit or None, catalog is used to expand course codes
+    def get(self, key, catalog):
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return expand_audit(data, catalog)
+
+        data = self.read_disk(key)
+        if data is not None:
+            self.stats["disk_hits"] += 1
+            self.remember(key, data)
+            return expand_audit(data, catalog)
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key, audit, catalog):
+        data = compact_audit(audit, catalog)
+        self.remember(key, data)
+        self.write_disk(key, data)
+
+    def remember(self, key, data):
+        self.entries[key] = data
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    # Requirements are stored as course codes, key already pins the catalog version they refer to
+    def write_disk(self, key, data):
+        if not self.directory:
+            return
+        tmp_path = self.path(key) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path(key))
+        self.prune_disk()
+
+    def read_disk(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # Drop oldest files once directory holds more than max_disk_entries
+    def prune_disk(self):
+        files = [f for f in os.scandir(self.directory) if f.name.endswith(".json")]
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=lambda f: f.stat().st_mtime)
+        for f in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(f.path)
+            except OSError:
+                pass
+
+    def metrics(self):
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self.entries),
+            "hit_rate": (self.stats["hits"] + self.stats["disk_hits"]) / lookups if lookups else 0.0
+        }
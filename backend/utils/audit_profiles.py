@@ -0,0 +1,50 @@
+import uuid
+from utils.course_catalog import get_catalog
+from utils.parse_degreeworks import DegreeWorksAudit
+from utils.session_store import create_session_store
+
+MAX_AUDIT_PROFILES = 2000               # per worker for the in memory backend, in total for sqlite
+MAX_AUDIT_PROFILE_BYTES = 256 * 1024    # compact json, a parsed audit is a few KiB - larger ones come from /chat payloads
+AUDIT_PROFILE_TTL = 7 * 24 * 60 * 60    # seconds since last use before an uploaded audit is dropped
+
+# Compact json-able audit - requirement courses in the catalog become their code,
+# courses missing from the catalog keep their full object
+def compact_audit(audit, catalog):
+    return {
+        "completed_courses": audit.completed_courses,
+        "requirements": compact_requirements(audit.requirements, catalog)
+    }
+
+def compact_requirements(requirements, catalog):
+    return {
+        req_id: {
+            "num_needed": req["num_needed"],
+            "courses": [c["code"] if c["code"] in catalog else c for c in req["courses"]]
+        } for req_id, req in requirements.items()
+    }
+
+# DegreeWorksAudit from compact_audit output
+def expand_audit(data, catalog):
+    return DegreeWorksAudit(data["completed_courses"], expand_requirements(data["requirements"], catalog))
+
+# Requirement courses as codes or course objects -> course objects, unknown codes are dropped
+def expand_requirements(requirements, catalog):
+    expanded = {}
+    for req_id, req in requirements.items():
+        courses = [catalog.get_course(c) if isinstance(c, str) else c for c in req["courses"]]
+        expanded[req_id] = {"num_needed": req["num_needed"], "courses": [c for c in courses if c is not None]}
+    return expanded
+
+# Parsed audits kept server side under an audit_id so /chat doesnt have to carry them every turn
+# Same backends as graduation sessions (SESSION_STORE), both keep requirement courses as catalog codes and
+# expand them against the current catalog on read - audits from the parse pool carry their own copies of
+# every course dict, stored as is they would cost hundreds of KiB each
+def create_audit_profile_store(max_profiles=MAX_AUDIT_PROFILES, ttl=AUDIT_PROFILE_TTL, max_bytes=MAX_AUDIT_PROFILE_BYTES):
+    return create_session_store(
+        lambda audit: compact_audit(audit, get_catalog()),
+        lambda data: expand_audit(data, get_catalog()),
+        table="audit_profiles", max_sessions=max_profiles, ttl=ttl, serialize_in_memory=True, max_bytes=max_bytes
+    )
+
+def new_audit_id():
+    return uuid.uuid4().hex
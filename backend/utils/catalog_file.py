@@ -0,0 +1,230 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+
+# Compact binary form of courses.json (data/courses.catalog), built with:
+#   python -m utils.catalog_file        (from backend/)
+# Layout - header, section table, then uint32 column arrays and one utf-8 string blob:
+#   header    MAGIC, FORMAT_VERSION, course count, source version (hash of the courses.json it was built from),
+#             size + mtime (ns) of that courses.json so loading can check freshness with a stat instead of hashing it
+#   sections  (offset, item count) for each name in SECTIONS
+# Per-course columns hold ids into the interned string table, non string values (credits, difficulty,
+# prereq_tree) are stored as their json text. List fields use a start column (count + 1 entries) into
+# an items column of string ids.
+# The file is mmapped read-only, so uvicorn workers share the same page cache pages, and nothing past
+# codes/numbers/prereqs is decoded until a course is looked up
+MAGIC = b"CCATALOG"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sII16sQQ")
+SECTION = struct.Struct("<II")
+NONE_ID = 0xFFFFFFFF
+
+SECTIONS = (
+    "department", "code", "course_number", "name", "credits", "description", "prereq_tree", "difficulty",
+    "prerequisites_start", "prerequisites", "offered_quarters_start", "offered_quarters",
+    "string_offsets", "strings"
+)
+STRING_FIELDS = ("department", "code", "name", "description")
+JSON_FIELDS = ("credits", "prereq_tree", "difficulty")
+LIST_FIELDS = ("prerequisites", "offered_quarters")
+
+COMPILED_PATH_SUFFIX = ".catalog"
+MAX_DECODED_COURSES = 1024     # decoded course dicts kept per LazyCourses, the rest are decoded again when looked up
+
+# Path of the compiled catalog for a courses.json path
+def compiled_path(json_path):
+    return os.path.splitext(str(json_path))[0] + COMPILED_PATH_SUFFIX
+
+# Write compiled catalog for courses.json data to path, source_version is the courses.json hash and
+# source_stat its os.stat result (None - freshness can only be checked by hash)
+def build_catalog_file(data, path, source_version, source_stat=None):
+    strings = {}
+    string_list = []
+
+    def intern(value):
+        if value is None:
+            return NONE_ID
+        idx = strings.get(value)
+        if idx is None:
+            idx = len(string_list)
+            strings[value] = idx
+            string_list.append(value)
+        return idx
+
+    columns = {name: array("I") for name in SECTIONS if name not in ("course_number", "strings")}
+    columns["course_number"] = array("i")
+    for name in LIST_FIELDS:
+        columns[f"{name}_start"].append(0)
+
+    count = 0
+    for department, courses in data["courses"].items():
+        for course in courses:
+            count += 1
+            columns["department"].append(intern(department))
+            columns["course_number"].append(course["course_number"])
+            for name in STRING_FIELDS[1:]:
+                columns[name].append(intern(course[name]))
+            for name in JSON_FIELDS:
+                value = course[name]
+                columns[name].append(NONE_ID if value is None else intern(json.dumps(value, separators=(",", ":"))))
+            for name in LIST_FIELDS:
+                columns[name].extend(intern(item) for item in course[name])
+                columns[f"{name}_start"].append(len(columns[name]))
+
+    blob = bytearray()
+    for value in string_list:
+        columns["string_offsets"].append(len(blob))
+        blob += value.encode("utf-8")
+    columns["string_offsets"].append(len(blob))
+
+    sections = []
+    offset = HEADER.size + SECTION.size * len(SECTIONS)
+    payload = bytearray()
+    for name in SECTIONS:
+        raw = bytes(blob) if name == "strings" else columns[name].tobytes()
+        sections.append(SECTION.pack(offset + len(payload), len(raw) if name == "strings" else len(columns[name])))
+        payload += raw
+        payload += b"\0" * (-len(payload) % 4)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        source_size, source_mtime = (source_stat.st_size, source_stat.st_mtime_ns) if source_stat else (0, 0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, count, source_version.encode("ascii"), source_size, source_mtime))
+        f.write(b"".join(sections))
+        f.write(payload)
+    # Replace so running workers keep their mmap of the old file
+    os.replace(tmp_path, path)
+
+# Read-only view of a compiled catalog file
+class CatalogFile:
+
+    # Raises ValueError if path isn't a complete compiled catalog
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        size = len(self.mm)
+        if size < HEADER.size + SECTION.size * len(SECTIONS):
+            raise ValueError(f"{path} is truncated")
+        magic, version, self.count, source_version, self.source_size, self.source_mtime = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a compiled course catalog (format {FORMAT_VERSION})")
+        self.source_version = source_version.decode("ascii")
+
+        view = memoryview(self.mm)
+        self.columns = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(self.mm, HEADER.size + SECTION.size * i)
+            if offset + (length if name == "strings" else 4 * length) > size:
+                raise ValueError(f"{path} is truncated")
+            if name == "strings":
+                self.strings = view[offset:offset + length]
+            else:
+                self.columns[name] = view[offset:offset + 4 * length].cast("i" if name == "course_number" else "I")
+
+        self.string_offsets = self.columns["string_offsets"]
+        self.codes = [self.string(i) for i in self.columns["code"]]
+        self.positions = {code: i for i, code in enumerate(self.codes)}
+
+    def string(self, idx):
+        if idx == NONE_ID:
+            return None
+        return str(self.strings[self.string_offsets[idx]:self.string_offsets[idx + 1]], "utf-8")
+
+    def json_value(self, name, position):
+        idx = self.columns[name][position]
+        return None if idx == NONE_ID else json.loads(self.string(idx))
+
+    def list_value(self, name, position):
+        starts = self.columns[f"{name}_start"]
+        return [self.string(idx) for idx in self.columns[name][starts[position]:starts[position + 1]]]
+
+    # department -> course codes in file order
+    def department_codes(self):
+        departments = {}
+        for position, idx in enumerate(self.columns["department"]):
+            departments.setdefault(self.string(idx), []).append(self.codes[position])
+        return departments
+
+    def course_numbers(self):
+        return dict(zip(self.codes, self.columns["course_number"]))
+
+    # code -> prereq_tree for courses with listed prerequisites
+    def prereq_trees(self):
+        starts = self.columns["prerequisites_start"]
+        return {
+            code: self.json_value("prereq_tree", position)
+            for position, code in enumerate(self.codes)
+            if starts[position + 1] > starts[position]
+        }
+
+    # True if built from the courses.json that stat (os.stat result) describes, without reading it
+    def built_from(self, stat):
+        return self.source_size == stat.st_size and self.source_mtime == stat.st_mtime_ns
+
+    # Full course dict, same shape as a courses.json entry
+    def course(self, position):
+        columns = self.columns
+        return {
+            "code": self.codes[position],
+            "course_number": columns["course_number"][position],
+            "name": self.string(columns["name"][position]),
+            "prerequisites": self.list_value("prerequisites", position),
+            "prereq_tree": self.json_value("prereq_tree", position),
+            "credits": self.json_value("credits", position),
+            "description": self.string(columns["description"][position]),
+            "offered_quarters": self.list_value("offered_quarters", position),
+            "difficulty": self.json_value("difficulty", position),
+        }
+
+# code -> course dict backed by a CatalogFile, courses are decoded on lookup and only the max_decoded most
+# recently used are kept, so private memory stays bounded however many courses requests touch
+# (descriptions and the other large fields stay in the shared mmap for every other course)
+# Looked up from tool threads, the LRU is only changed under the lock
+class LazyCourses(Mapping):
+
+    def __init__(self, catalog_file, max_decoded=MAX_DECODED_COURSES):
+        self.catalog_file = catalog_file
+        self.max_decoded = max_decoded
+        self.decoded = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __getitem__(self, code):
+        with self.lock:
+            course = self.decoded.get(code)
+            if course is not None:
+                self.decoded.move_to_end(code)
+                return course
+
+        course = self.catalog_file.course(self.catalog_file.positions[code])
+        with self.lock:
+            # Another thread may have decoded it meanwhile, keep one object per code
+            course = self.decoded.setdefault(code, course)
+            self.decoded.move_to_end(code)
+            while len(self.decoded) > self.max_decoded:
+                self.decoded.popitem(last=False)
+        return course
+
+    def __contains__(self, code):
+        return code in self.catalog_file.positions
+
+    def __iter__(self):
+        return iter(self.catalog_file.codes)
+
+    def __len__(self):
+        return self.catalog_file.count
+
+
+if __name__ == "__main__":
+    from utils.course_catalog import COURSES_PATH, catalog_version
+
+    with open(COURSES_PATH, "rb") as f:
+        raw = f.read()
+    path = compiled_path(COURSES_PATH)
+    build_catalog_file(json.loads(raw), path, catalog_version(raw), os.stat(COURSES_PATH))
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes, courses.json is {len(raw)} bytes)")
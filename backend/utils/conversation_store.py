@@ -0,0 +1,125 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# Defaults for conversation history limits
+MAX_CONVERSATIONS = 1000        # per worker
+CONVERSATION_TTL = 60 * 60      # seconds since last use before a conversation is dropped
+MAX_MESSAGES = 60               # per conversation
+MAX_TOKENS = 12000              # rough per conversation history budget
+TOOL_RESULT_CHARS = 500         # tool results from earlier turns are cut to this length when history is compacted
+COMPACT_RATIO = 0.5             # compaction shrinks history to this fraction of the message/token limits
+
+# Rough token estimate (~4 chars per token), good enough for budgeting without a tokenizer
+def estimate_tokens(message):
+    content = message.get("content") or ""
+    tokens = len(content) // 4 + 4
+    for tool_call in message.get("tool_calls") or []:
+        tokens += len(tool_call["function"]["arguments"]) // 4 + 4
+    return tokens
+
+# Index of the user message that starts each turn
+def turn_starts(messages):
+    return [i for i, m in enumerate(messages) if m["role"] == "user"]
+
+# Shrink history to fit limits
+# Between compactions history is only appended to, so the prompt the provider cached for the previous
+# request stays a prefix of the next one. Once a limit is exceeded it is compacted in one block - tool
+# results before the latest turn are truncated, then whole turns are dropped from the front (history never
+# starts with an orphaned tool message) until it is under compact_ratio of the limits, so the cached prefix
+# is only lost every few turns instead of on every turn
+def compact_history(messages, max_messages=MAX_MESSAGES, max_tokens=MAX_TOKENS, tool_result_chars=TOOL_RESULT_CHARS,
+                    compact_ratio=COMPACT_RATIO):
+    tokens = sum(estimate_tokens(m) for m in messages)
+    if len(messages) <= max_messages and tokens <= max_tokens:
+        return messages
+
+    starts = turn_starts(messages)
+    last_turn = starts[-1] if starts else 0
+
+    compacted = []
+    for i, message in enumerate(messages):
+        content = message.get("content")
+        if i < last_turn and message["role"] == "tool" and content and len(content) > tool_result_chars:
+            message = {**message, "content": content[:tool_result_chars] + "...(truncated)"}
+        compacted.append(message)
+
+    tokens = sum(estimate_tokens(m) for m in compacted)
+    target_messages = int(max_messages * compact_ratio)
+    target_tokens = int(max_tokens * compact_ratio)
+    start = 0
+    for turn_start in starts[1:]:
+        if len(compacted) - start <= target_messages and tokens <= target_tokens:
+            break
+        tokens -= sum(estimate_tokens(m) for m in compacted[start:turn_start])
+        start = turn_start
+
+    return compacted[start:]
+
+# Interface for storing conversation history, swap in another backend by subclassing
+class ConversationStore(ABC):
+
+    # Returns list of messages for conversation (empty if none), caller may modify it
+    @abstractmethod
+    def get(self, conversation_id):
+        ...
+
+    @abstractmethod
+    def save(self, conversation_id, messages):
+        ...
+
+    @abstractmethod
+    def delete(self, conversation_id):
+        ...
+
+# In process store with LRU + TTL eviction and per conversation history limits
+class InMemoryConversationStore(ConversationStore):
+
+    def __init__(self, max_conversations=MAX_CONVERSATIONS, ttl=CONVERSATION_TTL,
+                 max_messages=MAX_MESSAGES, max_tokens=MAX_TOKENS, tool_result_chars=TOOL_RESULT_CHARS,
+                 compact_ratio=COMPACT_RATIO):
+        self.max_conversations = max_conversations
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.tool_result_chars = tool_result_chars
+        self.compact_ratio = compact_ratio
+        # conversation_id -> (last_used, messages), least recently used first
+        self.conversations = OrderedDict()
+
+    def get(self, conversation_id):
+        self.evict_expired()
+        entry = self.conversations.get(conversation_id)
+        if entry is None:
+            return []
+        self.conversations[conversation_id] = (time.monotonic(), entry[1])
+        self.conversations.move_to_end(conversation_id)
+        return list(entry[1])
+
+    def save(self, conversation_id, messages):
+        messages = compact_history(messages, self.max_messages, self.max_tokens, self.tool_result_chars,
+                                   self.compact_ratio)
+        self.conversations[conversation_id] = (time.monotonic(), messages)
+        self.conversations.move_to_end(conversation_id)
+
+        self.evict_expired()
+        while len(self.conversations) > self.max_conversations:
+            self.conversations.popitem(last=False)
+
+    def delete(self, conversation_id):
+        self.conversations.pop(conversation_id, None)
+
+    # Entries are in last used order, so expired ones are all at the front
+    def evict_expired(self):
+        cutoff = time.monotonic() - self.ttl
+        while self.conversations:
+            conversation_id, (last_used, _) = next(iter(self.conversations.items()))
+            if last_used >= cutoff:
+                break
+            del self.conversations[conversation_id]
+
+    def __contains__(self, conversation_id):
+        return conversation_id in self.conversations
+
+    def __len__(self):
+        return len(self.conversations)
@@ -0,0 +1,217 @@
+import json
+import hashlib
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from utils.prereqs import CourseIndex, compile_prereq_tree, eval_prereq, tree_mask, mask_indexes
+from utils.catalog_file import CatalogFile, LazyCourses, compiled_path
+
+COURSES_PATH = Path(__file__).parent.parent / "data" / "courses.json"
+
+# How often (seconds) get_catalog() is allowed to stat courses.json to look for changes
+RELOAD_CHECK_INTERVAL = 5.0
+
+# Hash of courses.json contents, identifies the catalog for caches and compiled catalog files
+def catalog_version(raw):
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+# Read-only view of courses.json with indexes built once at load time
+# Shared by all tools and the DegreeWorks parser instead of re-parsing the file per call
+# data is either parsed courses.json or a CatalogFile (compiled catalog), with a CatalogFile
+# course objects are only decoded when looked up
+class CourseCatalog:
+
+    def __init__(self, data, version=None, mtime=None):
+        self.version = version
+        self.mtime = mtime
+
+        if isinstance(data, CatalogFile):
+            # code -> course object ("COMPSCI161" -> {...})
+            self.by_code = LazyCourses(data)
+            # department -> list of course codes in file order
+            self.department_codes = data.department_codes()
+            course_numbers = data.course_numbers()
+            prereq_trees = data.prereq_trees()
+        else:
+            self.by_code = {}
+            self.department_codes = {}
+            for department, courses in data["courses"].items():
+                self.department_codes[department] = [course["code"] for course in courses]
+                for course in courses:
+                    self.by_code[course["code"]] = course
+            course_numbers = {code: course["course_number"] for code, course in self.by_code.items()}
+            # Same rule as check_prereq - no listed prerequisites means always eligible
+            prereq_trees = {code: course["prereq_tree"] for code, course in self.by_code.items() if course["prerequisites"]}
+
+        # department -> (sorted course numbers, codes in the same order) for range lookups
+        # codes sorted by (number, suffix, code) so "121:130" is a bisect slice
+        self.by_number = {}
+        for department, codes in self.department_codes.items():
+            ordered = sorted(codes, key=lambda code: (course_numbers[code], code[len(department):], code))
+            self.by_number[department] = ([course_numbers[code] for code in ordered], ordered)
+
+        # Interned course ids + compiled prereq trees, code -> compiled tree
+        self.course_index = CourseIndex()
+        self.prereqs = {}
+        # Reverse index, prereq course code -> catalog courses whose prereq tree mentions it
+        self.unlocks = {}
+
+        for codes in self.department_codes.values():
+            for code in codes:
+                self.course_index.intern(code)
+
+        for codes in self.department_codes.values():
+            for code in codes:
+                if code in prereq_trees:
+                    self.prereqs[code] = compile_prereq_tree(prereq_trees[code], self.course_index)
+                else:
+                    self.prereqs[code] = None
+
+        codes = self.course_index.codes
+        for code, node in self.prereqs.items():
+            for idx in mask_indexes(tree_mask(node)):
+                self.unlocks.setdefault(codes[idx], set()).add(code)
+
+    # Load catalog from json file, version is a hash of the file contents
+    # Uses the compiled catalog next to it instead when it was built from the same contents - checked by the
+    # size + mtime of courses.json recorded in it, so courses.json is only read (and hashed) when those differ
+    @classmethod
+    def load(cls, path=COURSES_PATH, compiled=True):
+        mtime = catalog_mtime(path)
+
+        catalog_file = None
+        if compiled and os.path.exists(compiled_path(path)):
+            try:
+                catalog_file = CatalogFile(compiled_path(path))
+            except (OSError, ValueError) as e:
+                print(f"Failed to open compiled catalog, loading {path}: {e}")
+            else:
+                if catalog_file.built_from(os.stat(path)):
+                    return cls(catalog_file, version=catalog_file.source_version, mtime=mtime)
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        version = catalog_version(raw)
+        if catalog_file is not None:
+            # Same contents with a new mtime (copied, touched)
+            if catalog_file.source_version == version:
+                return cls(catalog_file, version=version, mtime=mtime)
+            print(f"{compiled_path(path)} is out of date, loading {path} (rebuild with python -m utils.catalog_file)")
+
+        return cls(json.loads(raw), version=version, mtime=mtime)
+
+    # Lookup by full course code, None if not in catalog
+    def get_course(self, code):
+        return self.by_code.get(code)
+
+    # Lookup by department + course number ("COMPSCI", "161")
+    def get_by_number(self, department, course_number):
+        return self.by_code.get(f"{department}{course_number}")
+
+    # All courses for a department, empty list if department unknown
+    def department_courses(self, department):
+        return [self.by_code[code] for code in self.department_codes.get(department, [])]
+
+    # Courses in department with numeric part of course number in [low, high], in course number order
+    def courses_in_range(self, department, low, high):
+        entry = self.by_number.get(department)
+        if entry is None:
+            return []
+        numbers, codes = entry
+        return [self.by_code[code] for code in codes[bisect_left(numbers, low):bisect_right(numbers, high)]]
+
+    # Bitmask of completed courses for prereqs_met/eligible_codes
+    # Masks are only valid for the catalog that built them
+    def completed_mask(self, completed_courses):
+        return self.course_index.mask(completed_courses)
+
+    # True/False if course prereqs are satisfied by completed_mask, None if course not in catalog
+    def prereqs_met(self, code, completed_mask):
+        if code not in self.prereqs:
+            return None
+        return eval_prereq(self.prereqs[code], completed_mask)
+
+    # Set of all catalog course codes whose prereqs are satisfied by completed_mask
+    def eligible_codes(self, completed_mask):
+        return {
+            code for code, node in self.prereqs.items()
+            if node is None or eval_prereq(node, completed_mask)
+        }
+
+    # Catalog courses whose prereqs may have become satisfied by completing new_codes
+    def unlocked_by(self, new_codes):
+        candidates = set()
+        for code in new_codes:
+            candidates |= self.unlocks.get(code, set())
+        return candidates
+
+    def __contains__(self, code):
+        return code in self.by_code
+
+    def __len__(self):
+        return len(self.by_code)
+
+
+# Change stamp for reload checks - mtimes of courses.json and its compiled catalog (None if missing)
+def catalog_mtime(path=COURSES_PATH):
+    try:
+        compiled_mtime = os.stat(compiled_path(path)).st_mtime_ns
+    except OSError:
+        compiled_mtime = None
+    return (os.stat(path).st_mtime_ns, compiled_mtime)
+
+
+_catalog = None
+_last_check = 0.0
+_reload_lock = threading.Lock()
+
+# Returns process-wide catalog, loading it on first use
+# Reloads when courses.json changes on disk - new catalog is built on a background thread and swapped in,
+# callers (some of them on the event loop) never wait for it and keep using the old catalog until it is ready
+def get_catalog():
+    global _catalog, _last_check
+
+    if _catalog is None:
+        with _reload_lock:
+            if _catalog is None:
+                _catalog = CourseCatalog.load()
+                _last_check = time.monotonic()
+        return _catalog
+
+    now = time.monotonic()
+    if now - _last_check >= RELOAD_CHECK_INTERVAL:
+        _last_check = now
+        # Only one reload at a time, the lock is released by the reload thread
+        if _reload_lock.acquire(blocking=False):
+            threading.Thread(target=_background_reload, name="catalog-reload", daemon=True).start()
+
+    return _catalog
+
+def _background_reload():
+    try:
+        reload_if_changed()
+    finally:
+        _reload_lock.release()
+
+# Reload catalog if courses.json or compiled catalog mtime changed, returns True if reloaded
+def reload_if_changed(path=COURSES_PATH):
+    global _catalog
+    try:
+        mtime = catalog_mtime(path)
+    except OSError:
+        return False
+
+    if _catalog is not None and mtime == _catalog.mtime:
+        return False
+
+    try:
+        new_catalog = CourseCatalog.load(path)
+    except (OSError, ValueError) as e:
+        # Half written file etc - keep serving old catalog
+        print(f"Failed to reload course catalog: {e}")
+        return False
+
+    _catalog = new_catalog
+    return True
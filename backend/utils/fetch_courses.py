@@ -1,51 +1,123 @@
-import requests
+import argparse
+import asyncio
+import hashlib
 import json
-from collections import defaultdict
+import os
+import random
 import time
+from pathlib import Path
+import httpx
+from utils.catalog_file import build_catalog_file, compiled_path
+from utils.course_catalog import catalog_version
 
 base_url = "https://anteaterapi.com/v2/rest/"
 
-def get_department_courses(department_name):
-    url = f"{base_url}courses?department={department_name}"
+DATA_DIR = Path(__file__).parent.parent / "data"
+COURSES_PATH = DATA_DIR / "courses.json"
+# Courses fetched so far, one json line per course, removed after courses.json is written
+CHECKPOINT_PATH = DATA_DIR / "courses.fetch_checkpoint.jsonl"
+# Per course content hash + grade fetch time from the last run, used by incremental refreshes
+META_PATH = DATA_DIR / "courses.fetch_meta.json"
 
-    response = requests.get(url)
+# api department name -> courses.json department key
+DEPARTMENTS = {"COMPSCI": "COMPSCI", "I&C SCI": "I&CSCI", "IN4MATX": "IN4MATX"}
 
-    if response.status_code == 200:
-        department_data = response.json()
-        return department_data
-    else:
-        print(f"Failed to retrieve data {response.status_code}")
+MAX_CONCURRENCY = 8         # requests in flight at once
+REQUESTS_PER_SECOND = 10    # started requests per second across all tasks
+MAX_RETRIES = 4             # retries for connection errors, 429 and 5xx
+BACKOFF_BASE = 0.5          # seconds, doubled per retry (+ jitter)
+REQUEST_TIMEOUT = 30.0
+GRADE_MAX_AGE = 7 * 24 * 60 * 60   # seconds before an unchanged course's grade data is fetched again
 
-def get_grade_data(department, course):
-    dept_encoded = department.replace("&", "%26").replace(" ", "%20")
-    url = f"{base_url}grades/aggregateByCourse?department={dept_encoded}&courseNumber={course['courseNumber']}"
+class FetchError(Exception):
+    pass
 
-    response = requests.get(url)
+# Spaces request starts at least 1 / rate seconds apart
+class RateLimiter:
 
-    if response.status_code == 200:
-        grade_data = response.json()
+    def __init__(self, rate=REQUESTS_PER_SECOND):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
 
-        if not grade_data.get('data') or len(grade_data['data']) == 0:
-            print(f"No grade data for {department} {course['courseNumber']}")
-            return "unknown"
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
 
-        avg_gpa = grade_data['data'][0]['averageGPA']
+# Shared client + concurrency/rate limits for one fetch run
+class AnteaterClient:
 
-        if avg_gpa is None:
-            return "unknown"
+    def __init__(self, client, concurrency=MAX_CONCURRENCY, rate=REQUESTS_PER_SECOND,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = RateLimiter(rate)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
 
-        if avg_gpa >= 3.5:
-            difficulty = "easy"
-        elif avg_gpa >= 3.0:
-            difficulty = "medium"
-        else:
-            difficulty = "hard"
-        return difficulty
-    else:
-        print(f"Failed to retrieve data {response.status_code}")
+    # GET json from path, None for non-retryable errors (404 etc)
+    # Raises FetchError when retries run out
+    async def get_json(self, path, params=None):
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with self.semaphore:
+                await self.limiter.wait()
+                try:
+                    response = await self.client.get(path, params=params)
+                except httpx.TransportError as e:
+                    error = f"{type(e).__name__}: {e}"
+                else:
+                    if response.status_code == 200:
+                        return response.json()
+                    if response.status_code != 429 and response.status_code < 500:
+                        print(f"Failed to retrieve data {response.status_code} for {path} {params}")
+                        return None
+                    error = f"status {response.status_code}"
+                    retry_after = response.headers.get("Retry-After")
+
+            if attempt == self.max_retries:
+                break
+            delay = self.backoff_base * 2 ** attempt * (1 + random.random())
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            await asyncio.sleep(delay)
+
+        raise FetchError(f"{path} {params} failed after {self.max_retries + 1} attempts ({error})")
+
+    async def get_department_courses(self, department_name):
+        return await self.get_json("courses", params={"department": department_name})
+
+    async def get_grade_data(self, department, course):
+        grade_data = await self.get_json(
+            "grades/aggregateByCourse", params={"department": department, "courseNumber": course['courseNumber']}
+        )
+        if grade_data is None:
+            return None
+        return difficulty_from_grades(grade_data, department, course)
+
+# easy/medium/hard from average gpa, "unknown" when there is no grade data
+def difficulty_from_grades(grade_data, department, course):
+    if not grade_data.get('data') or len(grade_data['data']) == 0:
+        print(f"No grade data for {department} {course['courseNumber']}")
+        return "unknown"
+
+    avg_gpa = grade_data['data'][0]['averageGPA']
+
+    if avg_gpa is None:
+        return "unknown"
+
+    if avg_gpa >= 3.5:
+        return "easy"
+    elif avg_gpa >= 3.0:
+        return "medium"
+    return "hard"
 
 # Extract data from api output to courses.json format
-def transform_course(api_course, department):
+def transform_course(api_course, difficulty):
     course_dict = {}
     course_dict["code"] = api_course['id']
     course_dict["course_number"] = api_course['courseNumeric']
@@ -55,39 +127,169 @@ def transform_course(api_course, department):
     course_dict["credits"] = api_course['minUnits']
     course_dict["description"] = api_course['description']
     course_dict["offered_quarters"] = api_course['terms']
-
-    course_dict["difficulty"] = get_grade_data(department, api_course)
+    course_dict["difficulty"] = difficulty
 
     return course_dict
 
+# Hash of a course as returned by the api, changes when anything about the course changes
+def course_hash(api_course):
+    return hashlib.sha256(json.dumps(api_course, sort_keys=True).encode()).hexdigest()[:16]
 
-if __name__ == "__main__":
-    # Populate courses.json
-    departments = ["COMPSCI", "I%26C%20SCI", "IN4MATX"]
-    department_actual_names = ["COMPSCI", "I&CSCI", "IN4MATX"]
+# Courses already fetched by an interrupted run, code -> {"course", "hash", "fetched_at"}
+# A partly written last line (run killed mid write) is ignored
+def load_checkpoint(path=CHECKPOINT_PATH):
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            done[entry["course"]["code"]] = entry
+    return done
+
+# Catalog + meta from the last run for incremental refresh, (None, {}) if there is no previous run
+def load_previous(path=COURSES_PATH, meta_path=META_PATH):
+    try:
+        with open(path) as f:
+            catalog = json.load(f)
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None, {}
+    return catalog, meta
 
-    all_courses = defaultdict(list)
+# Fetch all departments into courses.json format, returns (courses dict, meta)
+# Grade lookups run concurrently, each finished course is appended to the checkpoint so a rerun
+# only fetches what is missing. Raises FetchError if a department or any course still failed after retries,
+# the checkpoint is kept for the next run
+# With previous (catalog, meta) from load_previous, courses whose api data hash is unchanged and whose
+# grade data is newer than max_age are reused as is, only new/changed/stale courses fetch grades
+async def fetch_catalog(departments=DEPARTMENTS, url=base_url, checkpoint_path=CHECKPOINT_PATH,
+                        concurrency=MAX_CONCURRENCY, rate=REQUESTS_PER_SECOND, max_retries=MAX_RETRIES,
+                        backoff_base=BACKOFF_BASE, previous=None, max_age=GRADE_MAX_AGE):
+    done = load_checkpoint(checkpoint_path)
+    if done:
+        print(f"Resuming, {len(done)} courses already fetched")
 
-    for i, department in enumerate(departments):
-        print(f"Fetching courses for {department}...")
-        dep_data = get_department_courses(department)
+    # Courses that can be reused from the last run, code -> {"course", "hash", "fetched_at"}
+    reusable = {}
+    if previous is not None:
+        previous_catalog, previous_meta = previous
+        cutoff = time.time() - max_age
+        for courses in previous_catalog["courses"].values():
+            for course in courses:
+                entry = previous_meta.get(course["code"])
+                if entry and entry["fetched_at"] >= cutoff:
+                    reusable[course["code"]] = {"course": course, **entry}
+    stats = {"reused": 0, "fetched": 0}
 
-        if dep_data:
-            for course in dep_data["data"]:
-                transformed = transform_course(course, department)
-                all_courses[department_actual_names[i]].append(transformed)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        anteater = AnteaterClient(client, concurrency, rate, max_retries, backoff_base)
 
-                time.sleep(0.1)
-            print(f"Added {len(dep_data['data'])} courses from {department}")
-        else:
-            print(f"Failed to fetch data for {department}")
+        # A department that can't be fetched fails the run - saved as empty it would drop all of its
+        # courses from courses.json (and running servers) and its meta from the next incremental run
+        async def fetch_department(department):
+            print(f"Fetching courses for {department}...")
+            dep_data = await anteater.get_department_courses(department)
+            if not dep_data or "data" not in dep_data:
+                raise FetchError(f"Failed to fetch courses for {department}, courses.json left unchanged")
+            return dep_data["data"]
 
-    courses_dict = {"courses": all_courses}
+        department_data = await asyncio.gather(*(fetch_department(d) for d in departments))
 
-    with open("../data/courses.json", "w") as f:
-        json.dump(courses_dict, f, indent=4)
+        with open(checkpoint_path, "a") as checkpoint:
 
-    print(f"\nTotal courses saved: {len(all_courses)}")
+            async def fetch_course(department, api_course):
+                code = api_course['id']
+                content_hash = course_hash(api_course)
+                if code in done and done[code]["hash"] == content_hash:
+                    return done[code]
+                if code in reusable and reusable[code]["hash"] == content_hash:
+                    stats["reused"] += 1
+                    return reusable[code]
+
+                difficulty = await anteater.get_grade_data(department, api_course)
+                # Failed grade lookup (difficulty None) - fetched_at 0 so the next run looks it up again,
+                # and left out of the checkpoint so a resumed run retries it
+                entry = {
+                    "course": transform_course(api_course, difficulty),
+                    "hash": content_hash,
+                    "fetched_at": time.time() if difficulty is not None else 0
+                }
+                if difficulty is not None:
+                    checkpoint.write(json.dumps(entry) + "\n")
+                    checkpoint.flush()
+                stats["fetched"] += 1
+                return entry
+
+            results = await asyncio.gather(
+                *(fetch_course(department, api_course)
+                  for department, api_courses in zip(departments, department_data)
+                  for api_course in api_courses),
+                return_exceptions=True
+            )
+
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if failures:
+        for failure in failures[:5]:
+            print(f"  {failure}")
+        raise FetchError(f"{len(failures)} courses failed, rerun to resume from checkpoint")
+
+    all_courses = {}
+    meta = {}
+    results = iter(results)
+    for department, api_courses in zip(departments, department_data):
+        entries = [next(results) for _ in api_courses]
+        all_courses[departments[department]] = [entry["course"] for entry in entries]
+        for entry in entries:
+            meta[entry["course"]["code"]] = {"hash": entry["hash"], "fetched_at": entry["fetched_at"]}
+        print(f"Added {len(api_courses)} courses from {department}")
+
+    print(f"Grade data fetched for {stats['fetched']} courses, reused for {stats['reused']}")
+    return {"courses": all_courses}, meta
+
+# Returns the bytes written
+def write_json(data, path, indent=None):
+    raw = json.dumps(data, indent=indent).encode()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(raw)
+    os.replace(tmp_path, path)
+    return raw
+
+# Write courses.json + meta atomically so a running server never reloads a half written catalog
+# courses.json is left untouched when nothing changed, so the server doesn't reload for nothing
+# The compiled catalog is rebuilt with it, otherwise the server loads the json until someone rebuilds it
+# Returns True if courses.json was written
+def save_catalog(courses_dict, meta, path=COURSES_PATH, meta_path=META_PATH, checkpoint_path=CHECKPOINT_PATH,
+                 previous_catalog=None):
+    changed = courses_dict != previous_catalog
+    if changed:
+        raw = write_json(courses_dict, path, indent=4)
+        build_catalog_file(courses_dict, compiled_path(path), catalog_version(raw), os.stat(path))
+    write_json(meta, meta_path)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate data/courses.json from anteaterapi")
+    parser.add_argument("--full", action="store_true", help="refetch grade data for every course")
+    args = parser.parse_args()
 
+    # Incremental refresh unless --full or there is no previous run to start from
+    previous = None if args.full else load_previous()
+    if previous is not None and previous[0] is None:
+        previous = None
 
+    courses_dict, meta = asyncio.run(fetch_catalog(previous=previous))
+    changed = save_catalog(courses_dict, meta, previous_catalog=previous[0] if previous else None)
+    if not changed:
+        print("Catalog unchanged")
 
+    print(f"\nTotal courses saved: {sum(len(c) for c in courses_dict['courses'].values())}")
@@ -1,19 +1,30 @@
 import pdfplumber
+import io
 import re
 from pprint import pprint
 import json
+from collections import namedtuple
+from utils.course_catalog import get_catalog
 
-# returns text from degreeworks pdf
-def extract_degreeworks_text(pdf_path):
-    text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text()
-    return text
+# Completed course line has a grade and a term, either can come first
+COMPLETED_LINE_PATTERN = re.compile(r'(?P<grade>\b(?:[A-D][+-]?|F|IP|T)\b)|(?P<term>FALL|WINTER|SPRING|SS)')
+# Department + course number, optional comma separated second number (COMPSCI 161, 162)
+COURSE_PATTERN = re.compile(r'([A-Za-z&]+)\s+([H]?\d+[A-Za-z]?)(?:,\s*(\d+[A-Za-z]?))?')
+
+# Result of parsing a degreeworks pdf - completed course codes + still needed requirement groups
+DegreeWorksAudit = namedtuple("DegreeWorksAudit", ["completed_courses", "requirements"])
+
+# returns text from degreeworks pdf, pages joined by newline so a page's last line doesnt run into the next page
+# source can be a file path, pdf bytes or a binary file-like object
+def extract_degreeworks_text(source):
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with pdfplumber.open(source) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
 
 # Extract department/codes from line
 # return list with course objects that match the codes
-def course_codes(line, data):
+def course_codes(line, catalog):
     all_courses = []
     department = ""
     dep_and_code = ""
@@ -29,31 +40,19 @@ def course_codes(line, data):
             # only add courses that actually exist in that range
             if ':' in s:
                 ranges = s.split(':')
-
-                # Loop through all courses and keep numbers if an actual course matches
-                # More efficient way? Will have lots more courses when expand to all majors
-                for course in data["courses"][department]:
-                    if department in course['code']:
-                        match = re.search(r'(\d+)([A-Za-z]*)', course['code'])
-                        numeric = int(match.group(1))
-                        full_code = match.group(0)
-
-                        if numeric >= int(ranges[0]) and numeric <= int(ranges[1]):
-                            all_courses.append(course)
+                all_courses.extend(catalog.courses_in_range(department, int(ranges[0]), int(ranges[1])))
             else:
                 s = s.replace('@', 'A')
-                dep_and_code = department + s
                 # Find matching course object
-                for course in data["courses"][department]:
-                    if course['code'] == dep_and_code:
-                        all_courses.append(course)
-                        break
+                course = catalog.get_by_number(department, s)
+                if course:
+                    all_courses.append(course)
 
     return all_courses
 
 
 # Extract course codes from lines
-def clean_lines(lines, data):
+def clean_lines(lines, catalog):
     courses_map = {}
     req_counter = 0  # counter used for unique requirement ids
 
@@ -70,7 +69,7 @@ def clean_lines(lines, data):
             # Update line - only department, 'or', and course codes
             line = department.group(1)
 
-            course_list = course_codes(line, data)
+            course_list = course_codes(line, catalog)
 
             # Create unique requirement id and store with num_needed and courses
             req_id = f"req_{req_counter}"
@@ -118,30 +117,40 @@ def parse_still_needed_lines(text):
             i += 1
     return still_needed
 
+# Parse degreeworks pdf once and return DegreeWorksAudit with completed courses + still needed requirements
+def parse_degreeworks(source):
+    text = extract_degreeworks_text(source)
+    return DegreeWorksAudit(parse_courses_completed(text), parse_courses_needed(text))
+
 # Takes in degreeworks pdf, returns list of course objects user's courses still needed for graduation
 def extract_courses_needed(filepath):
-    with open('data/courses.json', 'r') as f:
-        course_data = json.load(f)
+    return parse_courses_needed(extract_degreeworks_text(filepath))
 
-    text = extract_degreeworks_text(filepath)
+# Takes in degreeworks pdf, returns list of course codes user's completed courses
+def extract_courses_completed(filepath):
+    return parse_courses_completed(extract_degreeworks_text(filepath))
+
+# Still needed requirement groups from degreeworks text
+def parse_courses_needed(text):
     still_needed_lines = parse_still_needed_lines(text)
-    codes_final = clean_lines(still_needed_lines, course_data)
+    codes_final = clean_lines(still_needed_lines, get_catalog())
     
     return codes_final
 
-# Takes in degreeworks pdf, returns list of course codes user's completed courses
-def extract_courses_completed(filepath):
-    text = extract_degreeworks_text(filepath)
-    completed = []
-
-    # Detect completed courses if line has grade + term
-    grade_pattern = r'\b([A-D][+-]?|F|IP|T)\b'# Regex for grade
-    term_pattern = r'(FALL|WINTER|SPRING|SS)'
+# Completed course codes from degreeworks text
+# A line is a completed course if it has a grade + term, both found in one scan with COMPLETED_LINE_PATTERN
+def parse_courses_completed(text):
+    completed = {}  # insertion ordered set
 
-    lines = text.split('\n')
-    for line in lines:
-        has_grade = re.search(grade_pattern, line)
-        has_term = re.search(term_pattern, line)
+    for line in text.split('\n'):
+        has_grade = has_term = False
+        for match in COMPLETED_LINE_PATTERN.finditer(line):
+            if match.lastgroup == "grade":
+                has_grade = True
+            else:
+                has_term = True
+            if has_grade and has_term:
+                break
         
         if has_grade and has_term:
             # If line starts with (T) its transfer course that doesnt satisfy uci requirement - skip
@@ -149,29 +158,20 @@ def extract_courses_completed(filepath):
                 continue
             
             # Find course codes in the line
-            course_pattern = r'([A-Za-z&]+)\s+([H]?\d+[A-Za-z]?)(?:,\s*(\d+[A-Za-z]?))?'
-            matches = re.findall(course_pattern, line)
-            
-            for match in matches:
-                dept = match[0].upper().replace(' ', '')
-                num1 = match[1].upper().replace(' ', '')
-                
-                code_with_space = f"{match[0]} {match[1]}"
+            for dept, num1, num2 in COURSE_PATTERN.findall(line):
                 # If (T) later in line, skip course, add uci equiv
-                if f"(T){code_with_space}" in line:
+                if f"(T){dept} {num1}" in line:
                     continue
+
+                dept = dept.upper()
+                num1 = num1.upper()
                 
                 # validate + add
-                if dept.replace('&', '').isalpha() and (num1[0].isdigit() or num1[0] == 'H') and len(dept) > 1:
-                    code = dept + num1
-                    if code not in completed:
-                        completed.append(code)
+                if len(dept) > 1 and dept.replace('&', '').isalpha():
+                    completed[dept + num1] = None
 
                 # If there's a comma-separated second number, add that course too
-                if match[2]: 
-                    num2 = match[2].upper().replace(' ', '')
-                    code2 = dept + num2
-                    if code2 not in completed:
-                        completed.append(code2)
+                if num2: 
+                    completed[dept + num2.upper()] = None
 
-    return completed
\ No newline at end of file
+    return list(completed)
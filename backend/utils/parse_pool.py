@@ -0,0 +1,80 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+class ParsePoolFull(Exception):
+    pass
+
+# Runs in worker process - returns when the job started/finished so queue wait and parse time can be measured
+def timed_call(fn, *args):
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+# Bounded process pool for CPU heavy parsing (pdfplumber)
+# At most workers + max_pending jobs are queued or running, run() raises ParsePoolFull past that
+class ParsePool:
+
+    def __init__(self, workers, max_pending, timeout):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.max_in_flight = workers + max_pending
+        self.timeout = timeout
+        self.in_flight = 0
+        self.stats = {
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "parse_time_total": 0.0,
+            "parse_time_max": 0.0
+        }
+
+    def release(self):
+        self.in_flight -= 1
+
+    # Run fn(*args) in a worker process and return its result
+    # Raises ParsePoolFull when saturated and asyncio.TimeoutError after timeout seconds
+    async def run(self, fn, *args):
+        if self.in_flight >= self.max_in_flight:
+            self.stats["rejected"] += 1
+            raise ParsePoolFull(f"{self.in_flight} uploads already being parsed")
+
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        future = self.executor.submit(timed_call, fn, *args)
+        # Slot is held until the worker is actually done, even if the caller timed out
+        self.in_flight += 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.release))
+
+        try:
+            started, finished, result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+
+        queue_wait = max(started - submitted, 0.0)
+        parse_time = finished - started
+        self.stats["completed"] += 1
+        self.stats["queue_wait_total"] += queue_wait
+        self.stats["queue_wait_max"] = max(self.stats["queue_wait_max"], queue_wait)
+        self.stats["parse_time_total"] += parse_time
+        self.stats["parse_time_max"] = max(self.stats["parse_time_max"], parse_time)
+        return result
+
+    def metrics(self):
+        completed = self.stats["completed"]
+        return {
+            **self.stats,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_wait_avg": self.stats["queue_wait_total"] / completed if completed else 0.0,
+            "parse_time_avg": self.stats["parse_time_total"] / completed if completed else 0.0
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
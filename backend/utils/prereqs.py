@@ -0,0 +1,115 @@
+# Prereq trees compiled to bitmask form
+# Each course id seen in any prereq tree is interned to an index, a set of completed courses
+# becomes an int with one bit per index. A compiled node is (op, mask, children):
+#   AND - every bit in mask set and every child satisfied
+#   OR  - any bit in mask set or any child satisfied
+# Leaf courses are folded into the parent's mask so most trees evaluate with one or two & ops
+AND = 0
+OR = 1
+
+# Normalize course id's to remove spaces to match course codes
+def normalize_course_id(course_id):
+    return course_id.replace(' ', '').upper()
+
+# Interns course ids to bit indexes
+class CourseIndex:
+
+    def __init__(self):
+        self.index = {}
+        self.codes = []
+
+    # Return index for code, adding it if new
+    def intern(self, code):
+        idx = self.index.get(code)
+        if idx is None:
+            idx = len(self.codes)
+            self.index[code] = idx
+            self.codes.append(code)
+        return idx
+
+    # Bitmask of courses in completed_courses, courses never referenced by a prereq tree are ignored
+    def mask(self, completed_courses):
+        mask = 0
+        index = self.index
+        for code in completed_courses:
+            idx = index.get(code)
+            if idx is not None:
+                mask |= 1 << idx
+        return mask
+
+# Compile prereq_tree json into (op, mask, children), None means always satisfied
+# Matches check_prereq_tree: exams are never satisfied, empty AND/OR lists are unsatisfied
+def compile_prereq_tree(prereq_tree, course_index):
+    if not prereq_tree:
+        return None
+
+    if prereq_tree.get("prereqType") == "course":
+        bit = 1 << course_index.intern(normalize_course_id(prereq_tree["courseId"]))
+        return (AND, bit, ())
+
+    if prereq_tree.get("AND"):
+        op, nodes = AND, prereq_tree["AND"]
+    elif prereq_tree.get("OR"):
+        op, nodes = OR, prereq_tree["OR"]
+    else:
+        # Exam (or unknown node)
+        return (OR, 0, ())
+
+    mask = 0
+    children = []
+    for node in nodes:
+        child = compile_prereq_tree(node, course_index)
+        if child is None:
+            # Always satisfied child - skip in AND, satisfies whole OR
+            if op == OR:
+                return None
+            continue
+
+        child_op, child_mask, child_children = child
+        # Fold single course leaves (and AND-of-courses inside AND) into this node's mask
+        if not child_children and (child_op == op or (child_mask and child_mask & (child_mask - 1) == 0)):
+            mask |= child_mask
+        else:
+            children.append(child)
+
+    if op == AND and not mask and not children:
+        return None
+    return (op, mask, tuple(children))
+
+# Evaluate compiled tree against completed bitmask
+def eval_prereq(node, completed_mask):
+    if node is None:
+        return True
+    op, mask, children = node
+    if op == AND:
+        if completed_mask & mask != mask:
+            return False
+        for child in children:
+            if not eval_prereq(child, completed_mask):
+                return False
+        return True
+
+    if completed_mask & mask:
+        return True
+    for child in children:
+        if eval_prereq(child, completed_mask):
+            return True
+    return False
+
+# Union of every course bit referenced anywhere in compiled tree
+def tree_mask(node):
+    if node is None:
+        return 0
+    op, mask, children = node
+    for child in children:
+        mask |= tree_mask(child)
+    return mask
+
+# Indexes of set bits in mask
+def mask_indexes(mask):
+    indexes = []
+    while mask:
+        low = mask & -mask
+        indexes.append(low.bit_length() - 1)
+        mask ^= low
+    return indexes
@@ -0,0 +1,42 @@
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+# Caps the request body of the given paths before the app reads it
+# A Content-Length over the limit is rejected with 413 before any of the body is received, bodies without one
+# (chunked) are counted as they arrive and rejected as soon as they pass the limit, so a large upload is never
+# fully received, parsed as multipart or spooled anywhere
+class BodySizeLimitMiddleware:
+
+    def __init__(self, app, max_bytes, paths):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths)
+
+    def too_large(self):
+        return f"Request body is larger than the {self.max_bytes} byte upload limit"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and (not content_length.isdigit() or int(content_length) > self.max_bytes):
+            status = 413 if content_length.isdigit() else 400
+            detail = self.too_large() if status == 413 else "Invalid Content-Length"
+            await JSONResponse({"detail": detail}, status_code=status)(scope, receive, send)
+            return
+
+        received = 0
+
+        # Raised from inside the app's body read, FastAPI passes HTTPExceptions through form parsing as is
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=self.too_large())
+            return message
+
+        await self.app(scope, limited_receive, send)
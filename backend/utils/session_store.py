@@ -0,0 +1,180 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import config
+
+MAX_SESSIONS = 500          # per worker for the in memory backend, in total for sqlite
+SESSION_TTL = 2 * 60 * 60   # seconds since last use before an abandoned session is dropped
+
+# Raised by save() when the serialized session is over the store's max_bytes
+class SessionTooLarge(ValueError):
+    pass
+
+def check_size(data, max_bytes):
+    if max_bytes is not None and len(data) > max_bytes:
+        raise SessionTooLarge(f"session is {len(data)} bytes, limit is {max_bytes}")
+
+# Interface for storing graduation planning sessions
+# Sessions are mutated after get(), callers must save() again for the change to be visible to other workers
+class SessionStore(ABC):
+
+    # Returns session or None if missing/expired, counts as use for the TTL
+    @abstractmethod
+    def get(self, session_id):
+        ...
+
+    @abstractmethod
+    def save(self, session_id, session):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id):
+        ...
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+# In process store with LRU + TTL eviction, keeps session objects as is
+# With serialize/deserialize it keeps serialize(session) instead and deserializes on every get - for read only
+# objects whose compact form is much smaller (audit profiles), not for sessions that are mutated after get()
+# max_bytes limits the json size of the serialized form (only checked with serialize)
+# Tool handlers for different sessions run on separate threads, so every access holds the lock
+class InMemorySessionStore(SessionStore):
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL, serialize=None, deserialize=None, max_bytes=None,
+                 clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.max_bytes = max_bytes
+        # session_id -> (last_used, session), least recently used first
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, session_id):
+        with self.lock:
+            self.evict_expired()
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return None
+            self.sessions[session_id] = (self.clock(), entry[1])
+            self.sessions.move_to_end(session_id)
+        return self.deserialize(entry[1]) if self.deserialize else entry[1]
+
+    def save(self, session_id, session):
+        if self.serialize:
+            session = self.serialize(session)
+            if self.max_bytes is not None:
+                check_size(json.dumps(session, separators=(",", ":")), self.max_bytes)
+        with self.lock:
+            self.sessions[session_id] = (self.clock(), session)
+            self.sessions.move_to_end(session_id)
+
+            self.evict_expired()
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+    def delete(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    # Caller holds the lock
+    def evict_expired(self):
+        cutoff = self.clock() - self.ttl
+        while self.sessions:
+            session_id, (last_used, _) = next(iter(self.sessions.items()))
+            if last_used >= cutoff:
+                break
+            del self.sessions[session_id]
+
+    def __len__(self):
+        return len(self.sessions)
+
+# SQLite backed store shared by all worker processes using the same db file
+# Sessions are stored as json from serialize(session), loaded back with deserialize(dict)
+# Different kinds of sessions can share one db file using separate tables
+# Rows are dropped after ttl, and the least recently used beyond max_sessions on each save, sessions whose json
+# is over max_bytes are rejected
+class SQLiteSessionStore(SessionStore):
+
+    # clock is wall time (time.time), updated_at is compared across processes
+    def __init__(self, path, serialize, deserialize, ttl=SESSION_TTL, table="graduation_sessions",
+                 max_sessions=MAX_SESSIONS, max_bytes=None, clock=time.time):
+        self.path = path
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.table = table
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets workers read while another writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_updated ON {table}(updated_at)"
+        )
+
+    # Refreshes updated_at, so a session that is read but not changed doesn't expire while in use
+    def get(self, session_id):
+        now = self.clock()
+        with self.lock:
+            refreshed = self.conn.execute(
+                f"UPDATE {self.table} SET updated_at = ? WHERE session_id = ? AND updated_at >= ?",
+                (now, session_id, now - self.ttl)
+            ).rowcount
+            row = refreshed and self.conn.execute(
+                f"SELECT data FROM {self.table} WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return self.deserialize(json.loads(row[0]))
+
+    def save(self, session_id, session):
+        data = json.dumps(self.serialize(session), separators=(",", ":"))
+        check_size(data, self.max_bytes)
+        now = self.clock()
+        with self.lock:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (session_id, data, updated_at) VALUES (?, ?, ?)",
+                (session_id, data, now)
+            )
+            self.conn.execute(f"DELETE FROM {self.table} WHERE updated_at < ?", (now - self.ttl,))
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE session_id IN "
+                f"(SELECT session_id FROM {self.table} ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+
+    def delete(self, session_id):
+        with self.lock:
+            self.conn.execute(f"DELETE FROM {self.table} WHERE session_id = ?", (session_id,))
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+# Build store from config - SESSION_STORE=sqlite uses SESSION_DB_PATH (default graduation_sessions.db)
+# serialize_in_memory - the in memory backend keeps the serialized form too (see InMemorySessionStore),
+# max_bytes is only enforced by backends that serialize
+def create_session_store(serialize, deserialize, table="graduation_sessions", max_sessions=MAX_SESSIONS, ttl=SESSION_TTL,
+                         serialize_in_memory=False, max_bytes=None):
+    if config.SESSION_STORE == "sqlite":
+        return SQLiteSessionStore(config.SESSION_DB_PATH, serialize, deserialize, ttl=ttl, table=table,
+                                  max_sessions=max_sessions, max_bytes=max_bytes)
+    if serialize_in_memory:
+        return InMemorySessionStore(max_sessions=max_sessions, ttl=ttl, serialize=serialize, deserialize=deserialize,
+                                    max_bytes=max_bytes)
+    return InMemorySessionStore(max_sessions=max_sessions, ttl=ttl)
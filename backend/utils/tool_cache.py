@@ -0,0 +1,63 @@
+import hashlib
+import json
+from collections import OrderedDict
+from utils.audit_profiles import compact_requirements
+
+# Results of deterministic tool calls keyed by a hash of (tool, args, completed courses, requirements, catalog version)
+# In memory LRU per worker, cleared when the catalog version changes so reloaded courses.json is never mixed
+# with results from the old one. Cached results are shared between callers and must not be modified
+class ToolResultCache:
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.catalog_version = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    # Canonical key - completed courses as a sorted set and requirement courses as catalog codes, so the
+    # same audit gives the same key whatever order it came in. Pass completed/grad_reqs as None for tools
+    # that don't depend on the audit
+    @staticmethod
+    def key(tool_name, args, completed_courses, grad_reqs, catalog):
+        state = {
+            "tool": tool_name,
+            "args": args,
+            "completed": sorted(set(completed_courses)) if completed_courses is not None else None,
+            "requirements": compact_requirements(grad_reqs, catalog) if grad_reqs is not None else None,
+            "catalog": catalog.version
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+    # (True, result) on hit, (False, None) on miss
+    def get(self, key, catalog_version):
+        self.check_version(catalog_version)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return True, self.entries[key]
+        self.stats["misses"] += 1
+        return False, None
+
+    def put(self, key, result, catalog_version):
+        self.check_version(catalog_version)
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    # Drop everything cached against an older catalog
+    def check_version(self, catalog_version):
+        if catalog_version != self.catalog_version:
+            if self.entries:
+                self.stats["invalidations"] += 1
+            self.entries.clear()
+            self.catalog_version = catalog_version
+
+    def metrics(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self.entries),
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0
+        }
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+DEFAULT_TOOL_TIMEOUT = 30.0     # seconds
+DEFAULT_TOOL_WORKERS = 4        # threads running tool handlers
+
+logger = logging.getLogger(__name__)
+
+# Handler args filled from the request for uses_audit tools
+AUDIT_ARGS = ("completed_courses", "grad_reqs")
+
+# Bad tool call arguments, returned to the model as an error result so it can retry the call
+class ToolArgumentError(Exception):
+    pass
+
+_MISSING = object()
+
+# Scalar checks per json schema type, return the (possibly coerced) value or raise ToolArgumentError
+# Models sometimes send 3 for "3" or "3" for 3, those are coerced instead of rejected
+def check_string(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ToolArgumentError("expected a string")
+
+def check_integer(value):
+    if isinstance(value, bool):
+        raise ToolArgumentError("expected an integer")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    raise ToolArgumentError("expected an integer")
+
+def check_number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    raise ToolArgumentError("expected a number")
+
+def check_boolean(value):
+    if isinstance(value, bool):
+        return value
+    raise ToolArgumentError("expected true or false")
+
+def check_any(value):
+    return value
+
+SCALAR_CHECKS = {"string": check_string, "integer": check_integer, "number": check_number, "boolean": check_boolean}
+
+# Build value check for a json schema once, checks are plain closures so validating a call does no schema lookups
+def compile_schema(schema):
+    schema_type = schema.get("type")
+
+    if schema_type in SCALAR_CHECKS:
+        return SCALAR_CHECKS[schema_type]
+
+    if schema_type == "array":
+        check_item = compile_schema(schema.get("items", {}))
+
+        def check_array(value):
+            if not isinstance(value, list):
+                raise ToolArgumentError("expected a list")
+            checked = []
+            for i, item in enumerate(value):
+                try:
+                    checked.append(check_item(item))
+                except ToolArgumentError as e:
+                    raise ToolArgumentError(f"item {i}: {e}")
+            return checked
+        return check_array
+
+    if schema_type == "object":
+        return compile_object(schema, keep_unknown=True)
+
+    return check_any
+
+# Object check - required properties must be present, missing optional ones get their schema default
+# Unknown properties are dropped for tool arguments (handlers take them as keyword args) but kept in
+# nested objects such as course objects the model passes back
+def compile_object(schema, keep_unknown=False, required=None):
+    properties = [
+        (name, compile_schema(prop), prop.get("default", _MISSING))
+        for name, prop in schema.get("properties", {}).items()
+    ]
+    required = set(schema.get("required") or required or [])
+
+    def check_object(value):
+        if not isinstance(value, dict):
+            raise ToolArgumentError("expected an object")
+        checked = dict(value) if keep_unknown else {}
+        for name, check, default in properties:
+            item = value.get(name)
+            if item is not None:
+                try:
+                    checked[name] = check(item)
+                except ToolArgumentError as e:
+                    raise ToolArgumentError(f"{name}: {e}")
+            elif name in required:
+                raise ToolArgumentError(f"missing required argument {name}")
+            elif default is not _MISSING:
+                checked[name] = default
+        return checked
+    return check_object
+
+# One registered tool
+#   handler      - function called with validated args as keyword args, plain functions run on the registry's
+#                  thread pool so CPU heavy tools (planners) don't block the event loop, async ones run on the loop
+#   uses_audit   - handler also takes completed_courses + grad_reqs from the request
+#   session      - calls with the same session_id must run in order
+#   cache        - None, "args" (result depends on args + catalog) or "audit" (args + catalog + student audit)
+#   timeout      - seconds before the call returns a timeout error to the model. A thread can't be stopped, so
+#                  a timed out handler keeps running in the background and holds its worker until it returns.
+#                  Session tools have no timeout - a later call on the same session must not start while an
+#                  abandoned one is still changing it
+#   start_message(args) / end_message(args, result) - progress text for the user
+class Tool:
+
+    def __init__(self, schema, handler, uses_audit=False, session=False, cache=None, timeout=DEFAULT_TOOL_TIMEOUT,
+                 start_message=None, end_message=None):
+        function = schema["function"]
+        self.name = function["name"]
+        self.handler = handler
+        self.is_async = asyncio.iscoroutinefunction(handler)
+        self.uses_audit = uses_audit
+        self.session = session
+        self.cache = cache
+        self.timeout = None if session else timeout
+        self.start_message = start_message
+        self.end_message = end_message
+        parameters = function.get("parameters", {})
+        # The audit always comes from the request, so the schema sent to the model must not ask for it.
+        # Anything the model sends anyway is dropped with the other unknown arguments
+        if uses_audit and set(parameters.get("properties", {})) & set(AUDIT_ARGS):
+            raise ValueError(f"{self.name} takes {', '.join(AUDIT_ARGS)} from the request, remove them from its schema")
+        # Some schemas have "required" next to "parameters" instead of inside it
+        self.validate = compile_object(parameters, required=function.get("required"))
+
+        self.stats = {"calls": 0, "errors": 0, "timeouts": 0, "cache_hits": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+    def record(self, elapsed_ms, result, timed_out=False, cache_hit=False):
+        stats = self.stats
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        if timed_out:
+            stats["timeouts"] += 1
+        if cache_hit:
+            stats["cache_hits"] += 1
+        if isinstance(result, dict) and "error" in result:
+            stats["errors"] += 1
+
+# Tool name -> Tool, single place tool calls are parsed, validated, cached, timed and run
+# Handlers run concurrently on up to workers threads, they must only share thread safe state
+# (catalog, session stores). Cache lookups and stats stay on the event loop
+class ToolRegistry:
+
+    def __init__(self, cache=None, get_catalog=None, workers=DEFAULT_TOOL_WORKERS):
+        self.tools = {}
+        self.cache = cache
+        self.get_catalog = get_catalog
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool")
+
+    def register(self, tool):
+        self.tools[tool.name] = tool
+        return tool
+
+    def get(self, name):
+        return self.tools.get(name)
+
+    # (tool, args) for a raw tool call, raises ToolArgumentError for unknown tools or bad arguments
+    def parse(self, name, arguments):
+        tool = self.tools.get(name)
+        if tool is None:
+            raise ToolArgumentError(f"unknown function {name}")
+        try:
+            data = json.loads(arguments or "{}")
+        except ValueError as e:
+            raise ToolArgumentError(f"arguments are not valid json: {e}")
+        return tool, tool.validate(data)
+
+    # Run validated call, returns (result, elapsed ms)
+    # Errors, timeouts and handler exceptions become {"error": ...} results for the model
+    async def call(self, tool, args, completed_courses, grad_reqs):
+        start = time.perf_counter()
+
+        key = None
+        if tool.cache and self.cache is not None:
+            catalog = self.get_catalog()
+            if tool.cache == "audit":
+                key = self.cache.key(tool.name, args, completed_courses, grad_reqs, catalog)
+            else:
+                key = self.cache.key(tool.name, args, None, None, catalog)
+            hit, result = self.cache.get(key, catalog.version)
+            if hit:
+                elapsed = (time.perf_counter() - start) * 1000
+                tool.record(elapsed, result, cache_hit=True)
+                return result, elapsed
+
+        kwargs = dict(args)
+        if tool.uses_audit:
+            kwargs["completed_courses"] = completed_courses
+            kwargs["grad_reqs"] = grad_reqs
+
+        timed_out = False
+        failed = False
+        try:
+            if tool.is_async:
+                work = tool.handler(**kwargs)
+            else:
+                work = asyncio.get_running_loop().run_in_executor(self.executor, partial(tool.handler, **kwargs))
+            result = await asyncio.wait_for(work, tool.timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            logger.warning("Tool %s timed out after %gs, args %s", tool.name, tool.timeout, args)
+            result = {"error": f"{tool.name} timed out after {tool.timeout:g} seconds"}
+        except Exception as e:
+            failed = True
+            logger.exception("Tool %s failed, args %s", tool.name, args)
+            result = {"error": f"{tool.name} failed: {e}"}
+
+        # Only results the handler actually returned are cached
+        if key is not None and not timed_out and not failed:
+            self.cache.put(key, result, catalog.version)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        tool.record(elapsed, result, timed_out=timed_out)
+        return result, elapsed
+
+    def metrics(self):
+        return {
+            name: {**tool.stats, "avg_ms": tool.stats["total_ms"] / tool.stats["calls"] if tool.stats["calls"] else 0.0}
+            for name, tool in self.tools.items()
+        }
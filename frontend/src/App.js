@@ -1,6 +1,5 @@
 import './App.css';
 import { useState, useRef, useEffect } from 'react';
-import axios from 'axios';
 import ReactMarkdown from 'react-markdown';
 
 function App() {
@@ -9,12 +8,9 @@ function App() {
   const [isLoading, setIsLoading] = useState(false);
   const [degreeworksData, setDegreeWorksData] = useState(null);
   const [selectedFile, setSelectedFile] = useState(null)
+  const [uploadError, setUploadError] = useState(null);
   const messagesEndRef = useRef(null);
 
-  const client = axios.create({ 
-    baseURL: 'http://localhost:8000'
-  });
-
   function handleChange(e) {
     setCurrInput(e.target.value)
   }
@@ -31,29 +27,89 @@ function App() {
     const userMessage = currInput;
     setCurrInput("");
 
-    try {
-      // Send user input to backend
-      const response = await client.post('/chat', {
-        message: userMessage, 
+    // Parsed audit is stored on the server, only its id is sent with each message
+    // withAudit also sends the audit itself, for a server worker that doesn't have it (expired or uploaded elsewhere)
+    const sendMessage = (withAudit) => fetch('http://localhost:8000/chat/stream', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        message: userMessage,
         user_id: "1",
-        conversation_id: "1", 
-        completed_courses: degreeworksData?.completed_courses || [],
-        required: degreeworksData?.requirements || {}
-      });
+        conversation_id: "1",
+        audit_id: degreeworksData?.audit_id || null,
+        ...(withAudit ? {
+          completed_courses: degreeworksData.completed_courses,
+          required: degreeworksData.requirements
+        } : {})
+      })
+    });
 
-      setIsLoading(false);
+    try {
+      // Stream response from backend - tool progress replaces the thinking message until text arrives
+      let response = await sendMessage(false);
 
-      // Update messages with user message and assistant response
-      setMessages(prev => [
-        ...prev.slice(0, -1),  // Remove "thinking" message
-        {"role": "assistant", "content": response.data.response}
-      ]);
+      if (response.status === 404 && degreeworksData?.audit_id) {
+        response = await sendMessage(true);
+      }
+      if (response.status === 404 && degreeworksData?.audit_id) {
+        // Stored audit is gone and couldn't be restored - forget it so the next message works without it
+        setDegreeWorksData(null);
+        const expired = new Error("Your DegreeWorks upload expired, please upload it again.");
+        expired.expired = true;
+        throw expired;
+      }
+      if (!response.ok || !response.body) {
+        throw new Error(`Chat request failed: ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let text = "";
+
+      // Replace last (assistant) message content
+      const setAssistantMessage = (content) => {
+        setMessages(prev => [
+          ...prev.slice(0, -1),
+          {"role": "assistant", "content": content}
+        ]);
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Server-sent events are separated by a blank line
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+
+        for (const rawEvent of events) {
+          const dataLine = rawEvent.split("\n").find(line => line.startsWith("data: "));
+          if (!dataLine) continue;
+          const event = JSON.parse(dataLine.slice(6));
+
+          if (event.type === "token") {
+            text += event.content;
+            setAssistantMessage(text);
+          } else if (event.type === "tool_start" || event.type === "tool_end") {
+            if (!text) setAssistantMessage(`_${event.message}..._`);
+          } else if (event.type === "done") {
+            text = event.response;
+            setAssistantMessage(text);
+          } else if (event.type === "error") {
+            throw new Error(event.error);
+          }
+        }
+      }
+
+      setIsLoading(false);
     } catch (error) {
       console.error(`Error occured: ${error}`);
 
       setMessages(prev => [
         ...prev.slice(0, -1),
-        {"role": "assistant", "content": "Sorry, I've encountered an error. Please try again."}
+        {"role": "assistant", "content": error.expired ? error.message : "Sorry, I've encountered an error. Please try again."}
       ]);
 
       setIsLoading(false);
@@ -74,6 +130,7 @@ function App() {
     const formData = new FormData();
     formData.append('file', selectedFile);
 
+    setUploadError(null);
     try {
       // Send form to backend
       const response = await fetch('http://localhost:8000/uploadFile/', {
@@ -81,14 +138,17 @@ function App() {
         body: formData,
       });
 
-      const data = await response.json();
+      // Errors come back as {"detail"} (413 too large, 429 server busy) or {"success": false, "error"} (parse failed)
+      const data = await response.json().catch(() => null);
 
-      if (data) {
-        setDegreeWorksData(data);
+      if (!response.ok || !data?.success) {
+        setUploadError(data?.detail || data?.error || `Upload failed (${response.status})`);
+        return;
       }
+      setDegreeWorksData(data);
     } catch (error) {
       console.error('Upload failed:', error);
-      alert('Upload failed');
+      setUploadError('Upload failed, please check your connection and try again.');
     }
 
   };
@@ -118,11 +178,16 @@ function App() {
             Upload
           </button>
         </div>
-        {degreeworksData && (
+        {degreeworksData && !uploadError && (
           <div className="upload-success">
             ✓ File uploaded successfully!
           </div>
         )}
+        {uploadError && (
+          <div className="upload-error">
+            {uploadError}
+          </div>
+        )}
       </div>
 
       <div className="chatBox">